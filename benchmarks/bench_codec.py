@@ -0,0 +1,57 @@
+# coding=utf-8
+"""
+Compares the installed json codecs on items/get payloads recorded from the offline simulator.
+
+Run with: python3 benchmarks/bench_codec.py [pages] [rounds]
+"""
+import sys
+import time
+
+from pr0gramm import Api, Posts, codec
+from pr0gramm.simulator import Simulator
+
+
+def record(pages):
+    payloads = []
+    with Simulator(posts=pages * 130) as simulator:
+        api = Api(no_login=True, base_url=simulator.base_url)
+        cursor = simulator.dataset.posts[-1]["id"] + 1
+        for _ in range(pages):
+            payload = api.get_items(cursor, flag=31)
+            payloads.append(payload.encode("utf-8"))
+            cursor = Posts(payload).minId()
+    return payloads
+
+
+def measure(func, payloads, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for payload in payloads:
+            func(payload)
+    return (time.perf_counter() - start) / (rounds * len(payloads)) * 1e6
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    payloads = record(pages)
+    size = sum(len(payload) for payload in payloads) / len(payloads)
+    print("%d recorded items/get pages, %.0f bytes per page, %d rounds" % (len(payloads), size, rounds))
+
+    previous = codec.get_codec()
+    print("%-8s %12s %12s %12s %12s" % ("codec", "loads", "str loads", "dumps", "Posts"))
+    for name, json_codec in codec.CODECS.items():
+        codec.set_codec(json_codec)
+        objects = [json_codec.loads(payload) for payload in payloads]
+        loads = measure(json_codec.loads, payloads, rounds)
+        # the old path: bytes -> str -> json
+        str_loads = measure(lambda payload: json_codec.loads(payload.decode("utf-8")), payloads, rounds)
+        dumps = measure(json_codec.dumps_bytes, objects, rounds)
+        posts = measure(Posts, payloads, rounds)
+        print("%-8s %10.1fus %10.1fus %10.1fus %10.1fus" % (name, loads, str_loads, dumps, posts))
+    codec.set_codec(previous)
+
+
+if __name__ == '__main__':
+    main()
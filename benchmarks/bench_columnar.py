@@ -0,0 +1,68 @@
+# coding=utf-8
+"""
+Compares aggregates over :Posts (one dict per post) with the same aggregates over a :PostBatch, with numpy
+if it is installed and with the array module.
+
+Run with: python3 benchmarks/bench_columnar.py [posts]
+"""
+import sys
+import time
+
+from pr0gramm import Posts
+from pr0gramm.columnar import PostBatch, numpy
+from pr0gramm.simulator import Dataset
+
+
+def timed(function, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+
+def group_by_user(posts):
+    groups = {}
+    for post in posts:
+        group = groups.setdefault(post["user"], {"count": 0, "sum": 0})
+        group["count"] += 1
+        group["sum"] += post["up"] - post["down"]
+    return groups
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    posts = Posts(json_obj={"items": Dataset(posts=count).posts})
+    print("%d posts" % count)
+
+    tasks = {
+        "sum points": (lambda: posts.sumPoints(), lambda batch: batch.sum_points()),
+        "flag filter": (lambda: len([post for post in posts if post["flags"] & 1]),
+                        lambda batch: len(batch.filter_flags(1))),
+        "group by user": (lambda: group_by_user(posts), lambda batch: batch.group_by("user")),
+        "top 100": (lambda: [post["up"] - post["down"] for post in
+                             sorted(posts, key=lambda post: post["up"] - post["down"], reverse=True)[:100]],
+                    lambda batch: list(batch.top(100).column("score"))),
+    }
+
+    backends = [("array", False)] + ([("numpy", True)] if numpy is not None else [])
+    batches = {}
+    for name, use_numpy in backends:
+        seconds, batches[name] = timed(lambda: PostBatch(posts, use_numpy), repeat=1)
+        print("build %-6s %8.1f ms" % (name, seconds * 1e3))
+
+    print("%-14s %10s %s" % ("", "Posts", " ".join("%10s" % name for name, _ in backends)))
+    for task, (on_posts, on_batch) in tasks.items():
+        seconds, expected = timed(on_posts)
+        line = "%-14s %7.1f ms" % (task, seconds * 1e3)
+        for name, _ in backends:
+            batch_seconds, result = timed(lambda: on_batch(batches[name]))
+            assert result == expected, task
+            line += " %7.1f ms" % (batch_seconds * 1e3)
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
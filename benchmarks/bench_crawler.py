@@ -0,0 +1,49 @@
+# coding=utf-8
+"""
+Compares the single cursor get_items_iterator with the sharded :Crawler for different numbers of workers
+on the offline simulator, which delays every response to model the network.
+
+Run with: python3 benchmarks/bench_crawler.py [posts] [latency] [requests_per_second]
+"""
+import sys
+import time
+
+from bench_session import start_simulator
+from pr0gramm import Api, Crawler
+
+
+def run(crawl):
+    start = time.perf_counter()
+    posts = pages = 0
+    for page in crawl:
+        posts += len(page)
+        pages += 1
+    return posts, pages, posts / (time.perf_counter() - start)
+
+
+def main():
+    posts = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    rate = float(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    process, base_url = start_simulator(posts=posts, latency=latency)
+    print("%d posts, %.0fms latency per request, rate limit: %s requests/s" % (posts, latency * 1000, rate))
+
+    api = Api(no_login=True, base_url=base_url, pool_maxsize=32, requests_per_second=rate, burst=1)
+    count, pages, speed = run(api.get_items_iterator(flag=31))
+    print("%-22s %6d posts %6d requests %8.0f posts/s" % ("get_items_iterator", count, pages, speed))
+
+    baseline = None
+    for workers in (1, 2, 4, 8, 16):
+        crawler = Crawler(api, flag=31, workers=workers)
+        count, _, speed = run(crawler)
+        baseline = baseline or speed
+        # the pages at the end of a shard overlap with the next one, so there are a few more requests
+        print("%-22s %6d posts %6d requests %8.0f posts/s %6.1fx" % ("Crawler(workers=%d)" % workers, count,
+                                                                      crawler.stats["pages"], speed,
+                                                                      speed / baseline))
+    process.terminate()
+
+
+if __name__ == '__main__':
+    main()
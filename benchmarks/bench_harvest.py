@@ -0,0 +1,48 @@
+# coding=utf-8
+"""
+Compares fetching the comments of all users one after another with get_user_comments_iterator and with
+the :CommentHarvester on the offline simulator, which delays every response to model the network.
+
+Run with: python3 benchmarks/bench_harvest.py [users] [latency] [requests_per_second]
+"""
+import sys
+import time
+
+from bench_session import start_simulator
+from pr0gramm import Api, CommentHarvester
+from pr0gramm.simulator import USERS
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    rate = float(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    process, base_url = start_simulator(posts=users * 100, users=users, latency=latency)
+    print("%d users, %.0fms latency per request, rate limit: %s requests/s" % (users, latency * 1000, rate))
+
+    api = Api(no_login=True, base_url=base_url, pool_maxsize=32, requests_per_second=rate, burst=1)
+    # the names the simulator gives its users
+    names = [USERS[i] if i < len(USERS) else "user%d" % i for i in range(users)]
+
+    start = time.perf_counter()
+    comments = 0
+    for name in names:
+        for page in api.get_user_comments_iterator(name, flag=31):
+            comments += len(page)
+    baseline = time.perf_counter() - start
+    print("%-28s %7d comments %7.2fs" % ("get_user_comments_iterator", comments, baseline))
+
+    for workers in (4, 8, 16, 32):
+        harvester = CommentHarvester(api, names, flag=31, workers=workers)
+        start = time.perf_counter()
+        for _ in harvester:
+            pass
+        seconds = time.perf_counter() - start
+        print("%-28s %7d comments %7.2fs %6.1fx" % ("CommentHarvester(workers=%d)" % workers,
+                                                    harvester.stats["comments"], seconds, baseline / seconds))
+    process.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+# coding=utf-8
+"""
+Measures the overhead of the request instrumentation of :Api on the offline simulator:
+plain session.get, :Api without hooks, :Api with a hook that does nothing and :Api with the logging hook.
+
+Run with: python3 benchmarks/bench_hooks.py [requests] [rounds]
+"""
+import sys
+import time
+
+import requests
+from requests.adapters import BaseAdapter
+
+from bench_session import start_simulator
+from pr0gramm import Api
+from pr0gramm.metrics import log_event
+
+
+class CannedAdapter(BaseAdapter):
+    """
+    Answers every request with the same response without any network, isolates the client side cost
+    """
+    def __init__(self, content):
+        super().__init__()
+        self.content = content
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = self.content
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def measure(fetch, requests_count):
+    """
+    :return: (wall time, cpu time of this process) per request in microseconds
+             the simulator runs in another process, so the cpu time is the client side cost only
+    """
+    start, start_cpu = time.perf_counter(), time.process_time()
+    for _ in range(requests_count):
+        fetch()
+    return ((time.perf_counter() - start) / requests_count * 1e6,
+            (time.process_time() - start_cpu) / requests_count * 1e6)
+
+
+def compare(title, candidates, requests_count, rounds):
+    # rounds are interleaved and the best one is used, so drift of the machine affects all candidates alike
+    results = {name: [] for name, _ in candidates}
+    for _ in range(rounds):
+        for name, fetch in candidates:
+            results[name].append(measure(fetch, requests_count))
+
+    print("%s, %d requests, best of %d rounds, per request:" % (title, requests_count, rounds))
+    print("%-16s %10s %10s %12s" % ("", "wall", "client cpu", "cpu vs first"))
+    baseline = min(cpu for wall, cpu in results[candidates[0][0]])
+    for name, _ in candidates:
+        wall = min(wall for wall, cpu in results[name])
+        cpu = min(cpu for wall, cpu in results[name])
+        print("%-16s %8.1fus %8.1fus %+10.1fus" % (name, wall, cpu, cpu - baseline))
+    print()
+
+
+def main():
+    requests_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    process, base_url = start_simulator()
+    api = Api(no_login=True, coalesce=False, base_url=base_url)
+    item = 500
+    # the same request get_items makes
+    params = {"flags": 1, "promoted": 0, "older": item}
+    api.get_items(item)  # opens the connection
+
+    hooked = Api(no_login=True, coalesce=False, base_url=base_url)
+    hooked.add_hook(lambda event: None)
+    logged = Api(no_login=True, coalesce=False, base_url=base_url)
+    logged.add_hook(log_event)  # the logger is not configured, so nothing is written
+
+    candidates = [("session.get", lambda: api.session.get(api.items_url, params=params).content),
+                  ("no hooks", lambda: api.get_items(item)),
+                  ("noop hook", lambda: hooked.get_items(item)),
+                  ("log_event hook", lambda: logged.get_items(item))]
+
+    compare("simulator in another process", candidates, requests_count, rounds)
+    content = api.session.get(api.items_url, params=params).content
+    process.terminate()
+
+    for client in (api, hooked, logged):
+        client.session.mount(base_url, CannedAdapter(content))
+    compare("canned responses without network", candidates[1:], requests_count * 10, rounds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# coding=utf-8
+"""
+Compares :Posts with :LazyPosts when a page is only used to advance the cursor (minId) and when a few posts
+of every page are used.
+
+The pages are decoded from json like api responses, the decoding is part of the measured time.
+
+Run with: python3 benchmarks/bench_lazy.py [pages]
+"""
+import sys
+import time
+import tracemalloc
+
+from pr0gramm import LazyPosts, Posts, codec
+from pr0gramm.simulator import Dataset, PAGE_SIZE
+
+
+def cursor_only(cls, payloads):
+    cursor = None
+    for payload in payloads:
+        cursor = cls(payload).minId()
+    return cursor
+
+
+def filtered(cls, payloads):
+    found = 0
+    for payload in payloads:
+        posts = cls(payload)
+        if cls is LazyPosts:
+            found += len(posts.filter(lambda item: item["up"] > 1900))
+        else:
+            found += len([post for post in posts if post["up"] > 1900])
+        posts.minId()
+    return found
+
+
+def measure(function, cls, payloads):
+    start = time.perf_counter()
+    result = function(cls, payloads)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    function(cls, payloads[:50])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak, result
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    posts = Dataset(posts=pages * PAGE_SIZE).posts
+    payloads = [codec.dumps_bytes({"items": posts[i:i + PAGE_SIZE]}) for i in range(0, len(posts), PAGE_SIZE)]
+    del posts
+    print("%d pages of %d posts, json codec: %s" % (pages, PAGE_SIZE, codec.get_codec().name))
+
+    for name, function in (("cursor only", cursor_only), ("filter 5%", filtered)):
+        results = []
+        for cls in (Posts, LazyPosts):
+            seconds, peak, result = measure(function, cls, payloads)
+            results.append(result)
+            print("%-12s %-10s %7.1f us/page  peak of 50 pages %6.0f KB" % (name, cls.__name__, seconds / pages * 1e6,
+                                                                            peak / 1e3))
+        assert results[0] == results[1]
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# coding=utf-8
+"""
+Compares the memory used by posts held as dict based :Post objects and as :CompactPost records, and the
+time it takes to read a field of every post.
+
+The pages are encoded and decoded again like an api response, so every post has its own strings.
+
+Run with: python3 benchmarks/bench_memory.py [posts]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+from pr0gramm import Posts, codec
+from pr0gramm.simulator import Dataset, PAGE_SIZE
+
+
+def load(payloads, mode):
+    pages = []
+    for payload in payloads:
+        posts = Posts(payload)
+        if mode == "compact":
+            posts = posts.compact()
+        elif mode == "without json":
+            # Posts keeps the decoded response next to the posts
+            del posts.json
+        pages.append(posts)
+    return pages
+
+
+def measure(payloads, mode):
+    gc.collect()
+    tracemalloc.start()
+    pages = load(payloads, mode)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    points = sum(post["up"] - post["down"] for posts in pages for post in posts)
+    return size, time.perf_counter() - start, points
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    posts = Dataset(posts=count).posts
+    payloads = [codec.dumps_bytes({"items": posts[i:i + PAGE_SIZE]}) for i in range(0, len(posts), PAGE_SIZE)]
+    del posts
+    print("%d posts in %d pages" % (count, len(payloads)))
+
+    baseline = None
+    for name, mode in (("Post", "posts"), ("Post without Posts.json", "without json"), ("CompactPost", "compact")):
+        size, seconds, _ = measure(payloads, mode)
+        baseline = baseline or size
+        print("%-24s %8.1f MB %6.0f bytes/post %5.2fx   read: %6.1f ns/post" %
+              (name, size / 1e6, size / count, baseline / size, seconds / count * 1e9))
+
+
+if __name__ == '__main__':
+    main()
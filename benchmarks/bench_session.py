@@ -0,0 +1,73 @@
+# coding=utf-8
+"""
+Compares requests/sec of the pooled :Api session against the old behaviour
+(a new connection through the module level requests.get for every call) on the offline simulator.
+
+Run with: python3 benchmarks/bench_session.py [requests] [threads]
+"""
+import multiprocessing
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from pr0gramm import Api
+from pr0gramm.simulator import Simulator
+
+
+def serve(port, simulator_kwargs):
+    Simulator(port=port, **simulator_kwargs).start()
+    while True:
+        time.sleep(3600)
+
+
+def start_simulator(**simulator_kwargs):
+    """
+    Runs the simulator in its own process, so it does not compete with the client for the GIL
+
+    :param simulator_kwargs: passed to :Simulator, by default 1000 posts
+    """
+    simulator_kwargs.setdefault("posts", 1000)
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    process = multiprocessing.Process(target=serve, args=(port, simulator_kwargs), daemon=True)
+    process.start()
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port)).close()
+            return process, "http://127.0.0.1:%d/" % port
+        except ConnectionRefusedError:
+            time.sleep(0.05)
+
+
+def run(fetch, requests_count, threads):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(lambda _: fetch(), range(requests_count)))
+    return requests_count / (time.perf_counter() - start)
+
+
+def main():
+    requests_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    process, base_url = start_simulator()
+    # coalescing would merge the identical requests, only the connection reuse is measured here
+    api = Api(no_login=True, pool_maxsize=threads, coalesce=False, base_url=base_url)
+
+    old = run(lambda: requests.get(api.items_url, params={"flags": 1, "promoted": 0}).content.decode("utf-8"),
+              requests_count, threads)
+    pooled = run(lambda: api.get_items(None, older=None), requests_count, threads)
+    process.terminate()
+
+    print("requests: %d, threads: %d" % (requests_count, threads))
+    print("requests.get:   %8.1f req/s" % old)
+    print("pooled session: %8.1f req/s (%.2fx)" % (pooled, pooled / old))
+
+
+if __name__ == '__main__':
+    main()
@@ -3,3 +3,16 @@ __author__ = "itssme https://github.com/itssme"
 
 from .items import *
 from .api import *
+from .throttle import *
+from .cache import *
+from .single_flight import *
+from .async_api import *
+from .metrics import *
+from .prefetch import *
+from .crawler import *
+from .checkpoint import *
+from .seek import *
+from .harvest import *
+from .follow import *
+from .columnar import *
+from .store import *
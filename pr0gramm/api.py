@@ -1,35 +1,174 @@
 import base64
 import io
-import json
 import os
 import tempfile
+import threading
 import time
 import warnings
 import webbrowser
-from typing import List, Union
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, List, Union
 
 import requests
-from requests import get, post, utils
-from pr0gramm.api_exceptions import NotLoggedInException, RateLimitReached
+from requests import utils
+from requests.adapters import HTTPAdapter
+from pr0gramm import codec
+from pr0gramm.api_exceptions import NotLoggedInException, RateLimitReached, TooManyRequests
+from pr0gramm.cache import Cache, MemoryCache, SqliteCache
+from pr0gramm.checkpoint import Checkpoint
 from pr0gramm.items import *
+from pr0gramm.metrics import TIMING_SUPPORTED, LatencyHistogram, RequestEvent, TimingAdapter, connection_timings
+from pr0gramm.prefetch import Prefetcher
+from pr0gramm.single_flight import SingleFlight
+from pr0gramm.throttle import Throttle
 from urllib import parse
 
 
-# TODO: implement logging
+def _parse_response(response: str or ApiItem or ApiList, cls):
+    """
+    Used by the iterators, which work with both json strings and parsed responses
+
+    :param response: str or parsed object
+                     return value of an :Api method
+    :param cls: class of the parsed object, for example :Posts
+    :return: object of type cls
+    """
+    return response if isinstance(response, cls) else cls(response)
 
 
 class Api:
-    def __init__(self, username: str = "", password: str = "", tmp_dir: str = "./", no_login: bool = False):
+    def __init__(self, username: str = "", password: str = "", tmp_dir: str = "./", no_login: bool = False,
+                 pool_connections: int = 10, pool_maxsize: int = 10, pool_block: bool = False,
+                 keep_alive: bool = True, requests_per_second: float = None, burst: int = 1,
+                 max_retries: int = 5, backoff_factor: float = 0.5, throttle: Throttle = None,
+                 cache: Cache or str = None, cache_ttl: dict = None, coalesce: bool = True,
+                 base_url: str = "https://pr0gramm.com/", parsed: bool = False,
+                 timeout: float or tuple = (10, 30), timeouts: dict = None, retry_policies: dict = None,
+                 hedge: bool = False, hedge_percentile: float = 95, hedge_min_samples: int = 20,
+                 lazy: bool = False):
+        """
+        Client for the pr0gramm api
+
+        All requests made by one :Api object go through a single pooled http session, so connections
+        are kept alive and reused between calls. The session can be shared by multiple worker threads.
+
+        Parameters
+        ----------
+        :param username: str
+                         Username used for logging in
+        :param password: str
+                         Password used for logging in
+        :param tmp_dir: str
+                        Directory where the login cookie is stored
+        :param no_login: bool
+                         If set to True the api will not try to log in
+        :param pool_connections: int
+                                 Number of connection pools (one per host) that are cached
+        :param pool_maxsize: int
+                             Maximum number of connections kept open per host
+        :param pool_block: bool
+                           If set to True threads will wait for a free connection when all connections
+                           to a host are in use instead of opening additional ones
+        :param keep_alive: bool
+                           If set to False every connection will be closed after a request
+        :param requests_per_second: float
+                                    Limits the requests of this object (from all threads) with a token bucket
+                                    None for no limit
+        :param burst: int
+                      Number of requests that can be made at once after being idle
+        :param max_retries: int
+                            How often a request answered with 429 or 503 is retried
+                            The retries use a jittered exponential backoff and honour 'Retry-After'
+        :param backoff_factor: float
+                               Base of the exponential backoff in seconds
+        :param throttle: :Throttle
+                         Share the rate limit of another :Api object, overrides the parameters above
+        :param cache: :Cache or str
+                      Caches responses of the endpoints in 'cache_ttl'
+                      'memory' for a :MemoryCache, 'disk' for a :SqliteCache in tmp_dir
+                      or a :MemoryCache or :SqliteCache object
+                      None disables caching
+        :param cache_ttl: dict
+                          Seconds a response is cached for each endpoint
+                          Example: {"items/info": 300, "profile/info": 300, "items/get": 60}
+                                   endpoints which are not in the dict are never cached
+                          Default: {"items/info": 300, "profile/info": 300}, items/get is not cached by
+                                   default because a cached newest page misses new uploads (get_newest_image,
+                                   :Follower, sync_posts)
+        :param coalesce: bool
+                         If set to True identical get requests which are made at the same time (from different
+                         threads) are only sent once and all callers receive the same response
+        :param base_url: str
+                         Url of the pr0gramm website, the api is expected at base_url + 'api/'
+                         Set this to :Simulator.base_url to run against the offline simulator
+        :param parsed: bool
+                       If set to True the methods return parsed objects (:Posts, :Post, :ItemInfo, :User,
+                       :Comments or dict) decoded once from the response bytes instead of json strings
+        :param lazy: bool
+                     If set to True the posts of items/get are :LazyPosts, which create a :Post only when it
+                     is used; this applies to the parsed responses and to the pages of the iterators
+        :param timeout: float or (float, float)
+                        Seconds to wait for the server, or a (connect, read) tuple
+                        None waits forever
+        :param timeouts: dict
+                         Timeouts of single endpoints, overriding 'timeout'
+                         Example: {"items/get": (3.05, 10), "user/login": 60}
+        :param retry_policies: dict
+                               :RetryPolicy of single endpoints, endpoints which are not in the dict use
+                               the policy of the throttle (429 and 503, connection errors and timeouts)
+                               Example: {"items/get": RetryPolicy(3, status_codes=(429, 500, 502, 503, 504))}
+        :param hedge: bool
+                      If set to True a get request that takes longer than the 'hedge_percentile' latency
+                      of its endpoint is sent a second time and the first response is used
+                      The requests are sent from a thread pool that is shut down by :Api.close
+        :param hedge_percentile: float
+                                 Percentile of the latency after which a hedged request is sent
+        :param hedge_min_samples: int
+                                  Requests to an endpoint that are measured before it is hedged
+        """
         self.__password = password
         self.__username = username
         self.__login_cookie = None
         self.__current = -1
 
         self.tmp_dir = tmp_dir
+        self.parsed = parsed
+        self.posts_class = LazyPosts if lazy else Posts
+
+        if cache == "memory":
+            cache = MemoryCache()
+        elif cache == "disk":
+            cache = SqliteCache(os.path.join(tmp_dir, "pr0gramm_cache.db"))
+        self.cache = cache
+        self.cache_ttl = cache_ttl if cache_ttl is not None else {"items/info": 300, "profile/info": 300}
+        self.single_flight = SingleFlight() if coalesce else None
+
+        self.timeout = timeout
+        self.timeouts = timeouts if timeouts is not None else {}
+        self.retry_policies = retry_policies if retry_policies is not None else {}
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.latency = {}
+        self.__latency_lock = threading.Lock()
+        # created by the first hedged request
+        self.__hedge_executor = None
+        self.__hedged = 0
+        self.__hedges_won = 0
+        self.hooks = []
+        self.__pool_args = {"pool_connections": pool_connections, "pool_maxsize": pool_maxsize,
+                            "pool_block": pool_block}
+        self.__timed = False
+
+        self.session = self.__create_session(keep_alive)
+        self.__mount(HTTPAdapter(**self.__pool_args))
+        self.throttle = throttle if throttle is not None else Throttle(requests_per_second, burst, max_retries,
+                                                                       backoff_factor)
 
         self.image_url = "https://img.pr0gramm.com/"
-        self.api_url = "https://pr0gramm.com/api/"
-        self.login_url = "https://pr0gramm.com/api/user/login/"
+        self.api_url = base_url.rstrip("/") + "/api/"
+        self.login_url = self.api_url + "user/login/"
         self.profile_comments = self.api_url + "profile/comments"
         self.profile_user = self.api_url + "profile/info"
         self.items_url = self.api_url + "items/get"
@@ -43,11 +182,11 @@ class Api:
         return
 
     def __iter__(self):
-        self.__current = Post(self.get_newest_image())["id"]
+        self.__current = _parse_response(self.get_newest_image(), Post)["id"]
         return self
 
     def __next__(self):
-        posts = Posts(self.get_items(self.__current))
+        posts = _parse_response(self.get_items(self.__current), self.posts_class)
         try:
             self.__current = posts.minId()
         except IndexError:
@@ -103,9 +242,329 @@ class Api:
         :param r: response returned by a request
         :return: None
         :raises NotLoggedInException if status code is 403 (forbidden)
+        :raises TooManyRequests if status code is 429 or 503 (rate limited)
         """
         if r.status_code == 403:
             raise NotLoggedInException()
+        if r.status_code in (429, 503):
+            raise TooManyRequests()
+
+    @staticmethod
+    def __create_session(keep_alive: bool) -> requests.Session:
+        """
+        Creates the http session that is used for all requests
+
+        :return: requests.Session
+        """
+        session = requests.Session()
+        if not keep_alive:
+            session.headers["Connection"] = "close"
+
+        return session
+
+    def __mount(self, adapter: HTTPAdapter):
+        """
+        Mounts the connection pool of adapter for http and https, the idle connections of the previous
+        pool are closed
+
+        :param adapter: HTTPAdapter
+        :return: None
+        """
+        previous = self.session.get_adapter("https://")
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        previous.close()
+
+    def close(self):
+        """
+        Closes the connections of the session and shuts down the thread pool of the hedged requests,
+        waiting for requests that are still running
+
+        :return: None
+        """
+        with self.__latency_lock:
+            executor, self.__hedge_executor = self.__hedge_executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __get(self, url: str, params: dict = None) -> bytes:
+        """
+        Makes a get request with the pooled session
+        Responses of endpoints in self.cache_ttl are served from and stored in self.cache
+        Identical requests running at the same time are coalesced if self.single_flight is set
+
+        :param url: str
+        :param params: dict
+                       with url parameters
+        :return: bytes
+                 content of the response
+        :raises NotLoggedInException if status code is 403 (forbidden)
+        :raises TooManyRequests if the request is still rate limited after all retries
+        """
+        key = Cache.make_key(url, params)
+        ttl = self.__get_cache_ttl(url)
+        if ttl:
+            start = time.monotonic()
+            content = self.cache.get(key)
+            if content is not None:
+                if self.hooks:
+                    self.__fire(RequestEvent("GET", self.__endpoint(url), url, params, 200, len(content),
+                                             total=time.monotonic() - start, cache_hit=True))
+                return content
+
+        def fetch() -> bytes:
+            if self.hedge:
+                r = self.__hedged_send(url, params)
+            else:
+                r = self.__send(self.session.get, url, params=params)
+
+            self.__raise_possible_exceptions(r)
+
+            if ttl and r.status_code == 200:
+                self.cache.set(key, r.content, ttl)
+
+            return r.content
+
+        if self.single_flight is not None:
+            return self.single_flight.do(key, fetch)
+        return fetch()
+
+    def __get_cache_ttl(self, url: str) -> float:
+        """
+        :param url: str
+        :return: float
+                 seconds a response from the url is cached, 0 if it is not cached
+        """
+        if self.cache is None:
+            return 0
+        return self.cache_ttl.get(self.__endpoint(url), 0)
+
+    def __endpoint(self, url: str) -> str:
+        """
+        :param url: str
+        :return: str
+                 endpoint of an api url, for example 'items/get'
+                 empty if the url does not belong to the api
+        """
+        if not url.startswith(self.api_url):
+            return ""
+        return url[len(self.api_url):].split("?")[0].strip("/")
+
+    def invalidate_cache(self, endpoint: str = None, params: dict = None):
+        """
+        Removes cached responses
+
+        Parameters
+        ----------
+        :param endpoint: str
+                         for example 'items/info'
+                         if None the whole cache is cleared
+        :param params: dict
+                       url parameters of a single request that will be removed
+                       for example {"itemId": 2525097, "flags": 1}
+                       if None all responses of the endpoint are removed
+        :return: None
+        """
+        if self.cache is None:
+            return
+        if endpoint is None:
+            self.cache.invalidate()
+        elif params is None:
+            self.cache.invalidate(prefix=self.api_url + endpoint)
+        else:
+            self.cache.invalidate(key=Cache.make_key(self.api_url + endpoint, params))
+
+    def __post(self, url: str, data: dict = None) -> requests.Response:
+        """
+        Makes a post request with the pooled session
+
+        :param url: str
+        :param data: dict
+                     form data of the request
+        :return: requests.Response
+        """
+        return self.__send(self.session.post, url, data=data)
+
+    def __send(self, method, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a request through the token bucket with the timeout of the endpoint and retries it
+        as the :RetryPolicy of the endpoint allows
+
+        :param method: session.get or session.post
+        :param url: str
+        :return: requests.Response
+        :raises requests.ConnectionError or requests.Timeout if the request still fails after all retries
+        """
+        endpoint = self.__endpoint(url)
+        policy = self.retry_policies.get(endpoint, self.throttle.retry_policy)
+        timeout = self.timeouts.get(endpoint, self.timeout)
+        idempotent = method == self.session.get
+        hooks = bool(self.hooks)
+
+        first_start = time.monotonic()
+        attempt = 0
+        while True:
+            self.throttle.wait()
+            if hooks:
+                connection_timings.dns = connection_timings.connect = None
+            start = time.monotonic()
+            try:
+                r = method(url, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not (idempotent and policy.retry_errors) or attempt >= policy.max_retries:
+                    if hooks:
+                        self.__fire(RequestEvent("GET" if idempotent else "POST", endpoint, url,
+                                                 kwargs.get("params"), total=time.monotonic() - first_start,
+                                                 retries=attempt, error=e))
+                    raise
+                self.throttle.backoff(attempt, policy=policy)
+                attempt += 1
+                continue
+
+            self.__record_latency(endpoint, time.monotonic() - start)
+            if r.status_code not in policy.status_codes or attempt >= policy.max_retries:
+                if hooks:
+                    dns = getattr(connection_timings, "dns", None)
+                    connect = getattr(connection_timings, "connect", None)
+                    self.__fire(RequestEvent(r.request.method, endpoint, url, kwargs.get("params"), r.status_code,
+                                             len(r.content), dns, connect,
+                                             max(r.elapsed.total_seconds() - (dns or 0.0) - (connect or 0.0), 0.0),
+                                             time.monotonic() - first_start, attempt))
+                return r
+            self.throttle.backoff(attempt, r.headers.get("Retry-After"), policy)
+            attempt += 1
+
+    def __hedged_send(self, url: str, params: dict = None) -> requests.Response:
+        """
+        Sends a get request and sends it a second time if there is no response after the
+        'hedge_percentile' latency of the endpoint, the response that arrives first is returned
+
+        The slower request is not cancelled, its connection is returned to the pool when it is done.
+
+        :param url: str
+        :param params: dict
+        :return: requests.Response
+        """
+        histogram = self.latency.get(self.__endpoint(url))
+        if histogram is None or histogram.count < self.hedge_min_samples:
+            return self.__send(self.session.get, url, params=params)
+
+        with self.__latency_lock:
+            if self.__hedge_executor is None:
+                self.__hedge_executor = ThreadPoolExecutor(max_workers=self.__pool_args["pool_maxsize"])
+            executor = self.__hedge_executor
+
+        delay = histogram.percentile(self.hedge_percentile)
+        first = executor.submit(self.__send, self.session.get, url, params=params)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+
+        second = executor.submit(self.__send, self.session.get, url, params=params)
+        with self.__latency_lock:
+            self.__hedged += 1
+
+        pending = {first, second}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        with self.__latency_lock:
+                            self.__hedges_won += 1
+                    return future.result()
+
+        # both requests failed
+        return first.result()
+
+    def __record_latency(self, endpoint: str, seconds: float):
+        """
+        :param endpoint: str
+        :param seconds: float
+                        time until the response was received
+        :return: None
+        """
+        histogram = self.latency.get(endpoint)
+        if histogram is None:
+            with self.__latency_lock:
+                histogram = self.latency.setdefault(endpoint, LatencyHistogram())
+        histogram.record(seconds)
+
+    def add_hook(self, hook):
+        """
+        Registers a function that is called with a :RequestEvent after every request
+
+        The hooks are called in the thread that made the request, exceptions raised by a hook are
+        turned into warnings. See :pr0gramm.metrics.log_event for a hook that logs all requests.
+
+        The dns and connect times are only measured while hooks are registered: the first hook replaces
+        the connection pool with a :TimingAdapter (if the installed urllib3 is supported), so the
+        connections opened before are not reused.
+
+        :param hook: function taking a :RequestEvent
+        :return: None
+        """
+        with self.__latency_lock:
+            if not self.__timed and TIMING_SUPPORTED:
+                self.__timed = True
+                self.__mount(TimingAdapter(**self.__pool_args))
+            self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """
+        :param hook: function registered with :Api.add_hook
+        :return: None
+        """
+        self.hooks.remove(hook)
+
+    def __fire(self, event: RequestEvent):
+        """
+        :param event: :RequestEvent
+        :return: None
+        """
+        for hook in list(self.hooks):
+            try:
+                hook(event)
+            except Exception as e:
+                warnings.warn("hook %r raised %r" % (hook, e))
+
+    @property
+    def latency_stats(self) -> dict:
+        """
+        Latency of the http requests of every endpoint, cached responses are not included
+
+        :return: dict
+                 {endpoint: {"count", "mean", "max", "p50", "p95", "p99"}} with the times in seconds
+        """
+        with self.__latency_lock:
+            histograms = dict(self.latency)
+        return {endpoint: histogram.summary() for endpoint, histogram in histograms.items()}
+
+    @property
+    def hedge_stats(self) -> dict:
+        """
+        hedged: get requests that were sent a second time
+        won: hedged requests where the second request answered first
+        """
+        with self.__latency_lock:
+            return {"hedged": self.__hedged, "won": self.__hedges_won}
+
+    def __set_login_cookie(self, cookie):
+        """
+        Stores the login cookie and attaches it to the session, so it is sent with every request
+
+        :param cookie: dict or requests.cookies.RequestsCookieJar
+        :return: None
+        """
+        self.__login_cookie = cookie
+        self.session.cookies.update(cookie)
 
     @staticmethod
     def __set_older_param(params, older, item):
@@ -116,22 +575,30 @@ class Api:
 
         return params
 
-    def __items_request(self, params) -> str:
+    def __parse(self, content: bytes, parse):
+        """
+        Returns the response as str or, if self.parsed is set, as parsed object
+
+        :param content: bytes
+                        content of the response
+        :param parse: function
+                      creates the parsed object from the json object
+        :return: str or parsed object
+        """
+        if self.parsed:
+            return parse(codec.loads(content))
+        return content.decode('utf-8')
+
+    def __items_request(self, params) -> bytes:
         """
         Makes a request to self.items_url
 
         :param params: dict
                        with url parameters
-        :return: str
+        :return: bytes
                  json reply from api
         """
-        r = get(self.items_url,
-                params=params,
-                cookies=self.__login_cookie)
-
-        self.__raise_possible_exceptions(r)
-
-        return r.content.decode('utf-8')
+        return self.__get(self.items_url, params)
 
     def get_items(self, item: int or str, flag: int or str = 1, promoted: int = 0,
                   older: bool or None = True, user: str = None) -> str:
@@ -165,51 +632,176 @@ class Api:
         if user is not None:
             params["user"] = user
 
-        return self.__items_request(params)
+        return self.__parse(self.__items_request(params), lambda obj: self.posts_class(json_obj=obj))
 
     def get_items_iterator(self, item: int or str = -1, flag: int or str = 1, promoted: int = 0,
-                           older: bool or None = True, user: str = None):
+                           older: bool or None = True, user: str = None, prefetch: int = 0,
+                           checkpoint: Checkpoint = None, checkpoint_name: str = None):
+        """
+        Iterates over the pages of get_items
+
+        Parameters
+        ----------
+        :param prefetch: int
+                         Number of pages that are fetched in a background thread while the current page
+                         is processed, 0 fetches every page when it is requested
+                         Call close() on the iterator to stop prefetching when it is not used until the end
+        :param checkpoint: :Checkpoint
+                           Stores the cursor after every page, an iterator with the same parameters and
+                           checkpoint continues after the last processed page (see :FileCheckpoint and
+                           :SqliteCheckpoint)
+        :param checkpoint_name: str
+                                Name of the crawl in the checkpoint, derived from the parameters if None
+        :return: iterator of :Posts
+        """
         class __items_iterator:
             self.__current = -1
 
-            def __init__(self, api, item, flag=1, promoted=0, older=True, user=None):
+            def __init__(self, api, item, flag=1, promoted=0, older=True, user=None, prefetch=0,
+                         checkpoint=None, checkpoint_name=None):
                 self.item = item
                 self.api = api
                 self.flag = flag
                 self.older = older
                 self.promoted = promoted
                 self.user = user
+                self.prefetch = prefetch
+                self.__prefetcher = None
+                self.checkpoint = checkpoint
+                self.params = {"iterator": "items", "flag": flag, "promoted": promoted, "older": older,
+                               "user": user}
+                self.checkpoint_name = checkpoint_name or Checkpoint.make_name(self.params)
 
             def __iter__(self):
+                self.close()
+                if self.checkpoint is not None:
+                    cursor = self.checkpoint.resume(self.checkpoint_name, self.params)
+                    if cursor is not None:
+                        self.__current = cursor
+                        return self
+
                 if self.item == -1:
-                    self.__current = Post(self.api.get_newest_image(flag=self.flag, promoted=self.promoted,
-                                                                    user=self.user))["id"]
+                    self.__current = _parse_response(self.api.get_newest_image(flag=self.flag,
+                                                                               promoted=self.promoted,
+                                                                               user=self.user), Post)["id"]
                 else:
                     self.__current = self.item
 
                 return self
 
             def __next__(self):
-                posts = Posts(self.api.get_items(self.__current, self.flag, self.promoted, self.older, self.user))
-                if self.older:
-                    try:
-                        if self.promoted == 1:
-                            self.__current = posts.minPromotedId()
-                        else:
-                            self.__current = posts.minId()
-                    except IndexError:
-                        raise StopIteration
+                if self.checkpoint is not None:
+                    # all pages before the current cursor were handed out and processed
+                    self.checkpoint.commit(self.checkpoint_name, self.params, self.__current)
+                if self.prefetch:
+                    if self.__prefetcher is None:
+                        self.__prefetcher = Prefetcher(self.__fetch, self.__current, self.prefetch)
+                    posts, current = self.__prefetcher.get()
                 else:
-                    try:
-                        if self.promoted == 1:
-                            self.__current = posts.maxPromotedId()
-                        else:
-                            self.__current = posts.maxId()
-                    except IndexError:
-                        raise StopIteration
+                    posts, current = self.__fetch(self.__current)
+                if current is None:
+                    raise StopIteration
+                self.__current = current
                 return posts
 
-        return __items_iterator(self, item, flag, promoted, older, user)
+            def close(self):
+                """
+                Stops prefetching pages
+
+                :return: None
+                """
+                if self.__prefetcher is not None:
+                    self.__prefetcher.close()
+                    self.__prefetcher = None
+
+            def __del__(self):
+                self.close()
+
+            def __fetch(self, current) -> tuple:
+                posts = _parse_response(self.api.get_items(current, self.flag, self.promoted, self.older,
+                                                           self.user), self.api.posts_class)
+                try:
+                    if self.older:
+                        return posts, posts.minPromotedId() if self.promoted == 1 else posts.minId()
+                    return posts, posts.maxPromotedId() if self.promoted == 1 else posts.maxId()
+                except IndexError:
+                    return posts, None
+
+        return __items_iterator(self, item, flag, promoted, older, user, prefetch, checkpoint, checkpoint_name)
+
+    def get_posts_stream(self, item: int or str = -1, flag: int or str = 1, promoted: int = 0,
+                         older: bool = True, user: str = None, limit: int = None, until_created: int = None,
+                         until_id: int = None, predicate=None, prefetch: int = 0):
+        """
+        Yields single posts of get_items_iterator and stops fetching pages as soon as a condition is met
+
+        Example: the first 5000 posts since a date with more than 100 benis
+            api.get_posts_stream(until_created=1577836800, limit=5000,
+                                 predicate=lambda post: post["up"] - post["down"] > 100)
+
+        Parameters
+        ----------
+        :param item: int or str
+                     id to start at, -1 for the newest post
+        :param flag: int or str
+                     see api.md for details
+        :param promoted: int (0 or 1)
+        :param older: bool
+                      True to go to older posts, False to go to newer posts
+        :param user: str
+                     only posts of this user
+        :param limit: int
+                      maximum number of posts that are yielded
+        :param until_created: int
+                              timestamp, posts created before it (after it when older is False) are not yielded
+                              and no further pages are fetched once a page reaches it
+        :param until_id: int
+                         id, posts with a lower id (higher when older is False) are not yielded
+                         and no further pages are fetched once a page reaches it
+        :param predicate: function
+                          called with every :Post, only posts for which it returns True are yielded
+                          and counted for 'limit'
+        :param prefetch: int
+                         Number of pages that are fetched in a background thread, see get_items_iterator
+        :return: generator of :Post
+        """
+        bounds = [(attr, bound) for attr, bound in (("created", until_created), ("id", until_id)) if bound is not None]
+        pages = self.get_items_iterator(item, flag, promoted, older, user, prefetch)
+        return self.__stream(pages, older, limit, bounds, predicate)
+
+    @staticmethod
+    def __stream(pages, older: bool, limit: int, bounds: list, predicate):
+        """
+        Flattens the pages of an iterator
+
+        :param pages: iterator of :ApiList
+        :param older: bool
+                      direction of the iterator
+        :param limit: int or None
+        :param bounds: list of (attribute, bound) tuples
+        :param predicate: function or None
+        :return: generator of the items of the pages
+        """
+        count = 0
+        try:
+            if limit is not None and limit <= 0:
+                return
+            for page in pages:
+                for element in page:
+                    if any(element[attr] < bound if older else element[attr] > bound for attr, bound in bounds):
+                        continue
+                    if predicate is not None and not predicate(element):
+                        continue
+                    yield element
+                    count += 1
+                    if limit is not None and count >= limit:
+                        return
+
+                # the next page only contains items beyond the bound
+                if any(page.min(attr) < bound if older else page.max(attr) > bound for attr, bound in bounds):
+                    return
+        finally:
+            pages.close()
 
     # this function will be removed in a future release and __get_items_by_tag will become this function
     def get_items_by_tag(self, *args, **kwargs):
@@ -266,7 +858,7 @@ class Api:
         if user is not None:
             params["user"] = user
 
-        return self.__items_request(params)
+        return self.__parse(self.__items_request(params), lambda obj: self.posts_class(json_obj=obj))
 
     def __get_items_by_tag(self, tags: str, flag: int = 1, item: int = None, older: bool or None = True,
                            promoted: int = 0, user: str = None) -> str:
@@ -306,14 +898,31 @@ class Api:
         if user is not None:
             params["user"] = user
 
-        return self.__items_request(params)
+        return self.__parse(self.__items_request(params), lambda obj: self.posts_class(json_obj=obj))
 
     def get_items_by_tag_iterator(self, tags: str, flag: int or str = 1, older: int = -1, newer: int = -1,
-                                  promoted: int = 0, user: str = None):
+                                  promoted: int = 0, user: str = None, prefetch: int = 0,
+                                  checkpoint: Checkpoint = None, checkpoint_name: str = None):
+        """
+        Iterates over the pages of get_items_by_tag
+
+        Parameters
+        ----------
+        :param prefetch: int
+                         Number of pages that are fetched in a background thread, see get_items_iterator
+        :param checkpoint: :Checkpoint
+                           Stores the cursor after every page, an iterator with the same parameters and
+                           checkpoint continues after the last processed page (see :FileCheckpoint and
+                           :SqliteCheckpoint)
+        :param checkpoint_name: str
+                                Name of the crawl in the checkpoint, derived from the parameters if None
+        :return: iterator of :Posts
+        """
         class __items_tag_iterator:
             self.__current = -1
 
-            def __init__(self, tags, api, flag=1, older=0, promoted=0, user=None):
+            def __init__(self, tags, api, flag=1, older=0, promoted=0, user=None, prefetch=0, checkpoint=None,
+                         checkpoint_name=None):
                 self.tags = tags
                 self.api = api
                 self.flag = flag
@@ -321,41 +930,73 @@ class Api:
                 self.newer = newer
                 self.promoted = promoted
                 self.user = user
+                self.prefetch = prefetch
+                self.__prefetcher = None
+                self.checkpoint = checkpoint
+                self.params = {"iterator": "tags", "tags": tags, "flag": flag, "promoted": promoted,
+                               "older": older != -1, "user": user}
+                self.checkpoint_name = checkpoint_name or Checkpoint.make_name(self.params)
 
             def __iter__(self):
+                self.close()
+                if self.checkpoint is not None:
+                    cursor = self.checkpoint.resume(self.checkpoint_name, self.params)
+                    if cursor is not None:
+                        self.__current = cursor
+                        return self
+
                 if older != -1:
                     self.__current = older
                 elif newer != -1:
                     self.__current = newer
                 else:
-                    self.__current = Post(self.api.get_items_by_tag(self.tags, self.flag, self.older, self.promoted,
-                                                                    self.user))
+                    response = self.api.get_items_by_tag(self.tags, self.flag, self.older, self.promoted, self.user)
+                    self.__current = Post(json_obj=response.json if isinstance(response, Posts)
+                                          else codec.loads(response))
                     self.older = 1
 
                 return self
 
             def __next__(self):
-                posts = Posts(self.api.get_items_by_tag(self.tags, flag=self.flag, newer=self.__current,
-                                                        promoted=self.promoted, user=self.user))
-                if older != -1:
-                    try:
-                        if self.promoted == 1:
-                            self.__current = posts.minPromotedId()
-                        else:
-                            self.__current = posts.minId()
-                    except IndexError:
-                        raise StopIteration
+                if self.checkpoint is not None:
+                    # all pages before the current cursor were handed out and processed
+                    self.checkpoint.commit(self.checkpoint_name, self.params, self.__current)
+                if self.prefetch:
+                    if self.__prefetcher is None:
+                        self.__prefetcher = Prefetcher(self.__fetch, self.__current, self.prefetch)
+                    posts, current = self.__prefetcher.get()
                 else:
-                    try:
-                        if self.promoted == 1:
-                            self.__current = posts.maxPromotedId()
-                        else:
-                            self.__current = posts.maxId()
-                    except IndexError:
-                        raise StopIteration
+                    posts, current = self.__fetch(self.__current)
+                if current is None:
+                    raise StopIteration
+                self.__current = current
                 return posts
 
-        return __items_tag_iterator(tags, self, flag, older, promoted, user)
+            def close(self):
+                """
+                Stops prefetching pages
+
+                :return: None
+                """
+                if self.__prefetcher is not None:
+                    self.__prefetcher.close()
+                    self.__prefetcher = None
+
+            def __del__(self):
+                self.close()
+
+            def __fetch(self, current) -> tuple:
+                posts = _parse_response(self.api.get_items_by_tag(self.tags, flag=self.flag, newer=current,
+                                                                  promoted=self.promoted, user=self.user),
+                                        self.api.posts_class)
+                try:
+                    if older != -1:
+                        return posts, posts.minPromotedId() if self.promoted == 1 else posts.minId()
+                    return posts, posts.maxPromotedId() if self.promoted == 1 else posts.maxId()
+                except IndexError:
+                    return posts, None
+
+        return __items_tag_iterator(tags, self, flag, older, promoted, user, prefetch, checkpoint, checkpoint_name)
 
     def get_item_info(self, item: int or str, flag: int or str = 1) -> str:
         """
@@ -378,13 +1019,67 @@ class Api:
 
         params = {"itemId": item, "flags": flag}
 
-        r = get(self.item_info_url,
-                params=params,
-                cookies=self.__login_cookie)
+        r = self.__get(self.item_info_url, params)
 
-        self.__raise_possible_exceptions(r)
+        return self.__parse(r, lambda obj: ItemInfo(item, json_obj=obj))
 
-        return r.content.decode('utf-8')
+    def get_item_info_many(self, items: Iterable[int] or Posts, flag: int or str = 1, workers: int = 8,
+                           ordered: bool = True):
+        """
+        Gets the item info of many posts at once
+        For example:
+            for info in api.get_item_info_many(Posts(api.get_items(2525097))):
+                print(info.post, len(info.comments), len(info.tags))
+
+        Parameters
+        ----------
+        :param items: iterable of int or :Posts
+                      post ids (or posts) for which the item info is requested
+        :param flag: int or str
+                     see api.md for details
+                     call calculate_flag if you are not sure which flag to use
+        :param workers: int
+                        number of requests made at the same time
+        :param ordered: bool
+                        True yields the results in the order of 'items'
+                        False yields the results as soon as they are available
+        :return: generator of :ItemInfo
+                 if the item info of a post could not be fetched :ItemInfo.error is set
+                 and the other posts are still fetched
+        """
+
+        def fetch(item) -> ItemInfo:
+            try:
+                info = self.get_item_info(item, flag)
+                return info if isinstance(info, ItemInfo) else ItemInfo(item, info)
+            except Exception as e:
+                return ItemInfo(item, error=e)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # only a few requests are queued ahead, so 'items' can be a long running generator
+            pending = deque() if ordered else set()
+            for item in items:
+                if len(pending) >= 2 * workers:
+                    if ordered:
+                        yield pending.popleft().result()
+                    else:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield future.result()
+
+                future = executor.submit(fetch, item["id"] if isinstance(item, dict) else item)
+                if ordered:
+                    pending.append(future)
+                else:
+                    pending.add(future)
+
+            while pending:
+                if ordered:
+                    yield pending.popleft().result()
+                else:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
 
     def get_collection_items(self, collection: str = "favoriten", user: str = None, item: int = None,
                              flag: int or str = 9,
@@ -417,44 +1112,98 @@ class Api:
 
         self.__set_older_param(params, older, item)
 
-        return self.__items_request(params)
+        return self.__parse(self.__items_request(params), lambda obj: self.posts_class(json_obj=obj))
 
     def get_collection_items_iterator(self, collection: str = "favoriten", user: str = "", item: int or str = None,
-                                      flag: int or str = 9, older: bool or None = True):
+                                      flag: int or str = 9, older: bool or None = True, prefetch: int = 0,
+                                      checkpoint: Checkpoint = None, checkpoint_name: str = None):
+        """
+        Iterates over the pages of get_collection_items
+
+        Parameters
+        ----------
+        :param prefetch: int
+                         Number of pages that are fetched in a background thread, see get_items_iterator
+        :param checkpoint: :Checkpoint
+                           Stores the cursor after every page, an iterator with the same parameters and
+                           checkpoint continues after the last processed page (see :FileCheckpoint and
+                           :SqliteCheckpoint)
+        :param checkpoint_name: str
+                                Name of the crawl in the checkpoint, derived from the parameters if None
+        :return: iterator of :Posts
+        """
         class __collection_items_iterator:
             self.__current = -1
 
-            def __init__(self, api, item, collection: str = "favoriten", flag=1, older=True, user=None):
+            def __init__(self, api, item, collection: str = "favoriten", flag=1, older=True, user=None,
+                         prefetch=0, checkpoint=None, checkpoint_name=None):
                 self.item = item
                 self.api = api
                 self.collection = collection
                 self.flag = flag
                 self.older = older
                 self.user = user
+                self.prefetch = prefetch
+                self.__prefetcher = None
+                self.checkpoint = checkpoint
+                self.params = {"iterator": "collection", "collection": collection, "flag": flag, "older": older,
+                               "user": user}
+                self.checkpoint_name = checkpoint_name or Checkpoint.make_name(self.params)
 
             def __iter__(self):
+                self.close()
+                if self.checkpoint is not None:
+                    cursor = self.checkpoint.resume(self.checkpoint_name, self.params)
+                    if cursor is not None:
+                        self.__current = cursor
+                        return self
+
                 if self.item is None:
-                    self.__current = Posts(self.api.get_collection_items(collection, user, item, flag, older)).maxId()
+                    response = self.api.get_collection_items(collection, user, item, flag, older)
+                    self.__current = _parse_response(response, self.api.posts_class).maxId()
                 else:
                     self.__current = self.item
 
                 return self
 
             def __next__(self):
-                posts = Posts(self.api.get_collection_items(collection, user, self.__current, flag, older))
-                if self.older:
-                    try:
-                        self.__current = posts.minId()
-                    except IndexError:
-                        raise StopIteration
+                if self.checkpoint is not None:
+                    # all pages before the current cursor were handed out and processed
+                    self.checkpoint.commit(self.checkpoint_name, self.params, self.__current)
+                if self.prefetch:
+                    if self.__prefetcher is None:
+                        self.__prefetcher = Prefetcher(self.__fetch, self.__current, self.prefetch)
+                    posts, current = self.__prefetcher.get()
                 else:
-                    try:
-                        self.__current = posts.maxId()
-                    except IndexError:
-                        raise StopIteration
+                    posts, current = self.__fetch(self.__current)
+                if current is None:
+                    raise StopIteration
+                self.__current = current
                 return posts
 
-        return __collection_items_iterator(self, item, collection, flag, older, user)
+            def close(self):
+                """
+                Stops prefetching pages
+
+                :return: None
+                """
+                if self.__prefetcher is not None:
+                    self.__prefetcher.close()
+                    self.__prefetcher = None
+
+            def __del__(self):
+                self.close()
+
+            def __fetch(self, current) -> tuple:
+                posts = _parse_response(self.api.get_collection_items(collection, user, current, flag, older),
+                                        self.api.posts_class)
+                try:
+                    return posts, posts.minId() if self.older else posts.maxId()
+                except IndexError:
+                    return posts, None
+
+        return __collection_items_iterator(self, item, collection, flag, older, user, prefetch, checkpoint,
+                                           checkpoint_name)
 
     def get_user_info(self, user: str, flag: int or str = 1) -> str:
         """
@@ -475,13 +1224,9 @@ class Api:
                  json reply from api
         """
 
-        r = get(self.profile_user + "?user=" + user,
-                params={'flags': flag},
-                cookies=self.__login_cookie)
+        r = self.__get(self.profile_user, {"user": user, "flags": flag})
 
-        self.__raise_possible_exceptions(r)
-
-        return r.content.decode("utf-8")
+        return self.__parse(r, lambda obj: User(json_obj=obj))
 
     def get_user_comments(self, user: str, created: int = -1, older: bool = True, flag: int = 1) -> str:
         """
@@ -514,19 +1259,32 @@ class Api:
         elif not older:
             params["after"] = created
 
-        r = get(self.profile_comments,
-                params=params,
-                cookies=self.__login_cookie)
+        r = self.__get(self.profile_comments, params)
 
-        self.__raise_possible_exceptions(r)
+        return self.__parse(r, lambda obj: Comments(json_obj=obj))
 
-        return r.content.decode("utf-8")
+    def get_user_comments_iterator(self, user: str, created: int = -1, older: bool = True, flag: int or str = 1,
+                                   prefetch: int = 0, checkpoint: Checkpoint = None, checkpoint_name: str = None):
+        """
+        Iterates over the pages of get_user_comments
 
-    def get_user_comments_iterator(self, user: str, created: int = -1, older: bool = True, flag: int or str = 1):
+        Parameters
+        ----------
+        :param prefetch: int
+                         Number of pages that are fetched in a background thread, see get_items_iterator
+        :param checkpoint: :Checkpoint
+                           Stores the cursor after every page, an iterator with the same parameters and
+                           checkpoint continues after the last processed page (see :FileCheckpoint and
+                           :SqliteCheckpoint)
+        :param checkpoint_name: str
+                                Name of the crawl in the checkpoint, derived from the parameters if None
+        :return: iterator of :Comments
+        """
         class __user_comments_iterator:
             self.__current = -1
 
-            def __init__(self, api, user, created=-1, older=True, flag=1):
+            def __init__(self, api, user, created=-1, older=True, flag=1, prefetch=0, checkpoint=None,
+                         checkpoint_name=None):
                 self.created = created
                 if self.created == -1 and older:
                     self.created = time.time()
@@ -534,12 +1292,25 @@ class Api:
                 self.older = older
                 self.user = user
                 self.flag = flag
+                self.prefetch = prefetch
+                self.__prefetcher = None
+                self.checkpoint = checkpoint
+                self.params = {"iterator": "comments", "user": user, "older": older, "flag": flag}
+                self.checkpoint_name = checkpoint_name or Checkpoint.make_name(self.params)
 
             def __iter__(self):
+                self.close()
+                if self.checkpoint is not None:
+                    cursor = self.checkpoint.resume(self.checkpoint_name, self.params)
+                    if cursor is not None:
+                        self.__current = cursor
+                        return self
+
                 if self.created == -1:
                     try:
-                        self.__current = Comments(self.api.get_user_comments(self.user, flag=self.flag,
-                                                                             older=None))[0]["created"] + 1
+                        self.__current = _parse_response(self.api.get_user_comments(self.user, flag=self.flag,
+                                                                                    older=None),
+                                                         Comments)[0]["created"] + 1
                     except IndexError:
                         raise NotLoggedInException
                 else:
@@ -548,20 +1319,69 @@ class Api:
                 return self
 
             def __next__(self):
-                comments = Comments(self.api.get_user_comments(self.user, self.__current, self.older, self.flag))
-                if self.older:
-                    try:
-                        self.__current = comments.minDate()
-                    except IndexError:
-                        raise StopIteration
+                if self.checkpoint is not None:
+                    # all pages before the current cursor were handed out and processed
+                    self.checkpoint.commit(self.checkpoint_name, self.params, self.__current)
+                if self.prefetch:
+                    if self.__prefetcher is None:
+                        self.__prefetcher = Prefetcher(self.__fetch, self.__current, self.prefetch)
+                    comments, current = self.__prefetcher.get()
                 else:
-                    try:
-                        self.__current = comments.maxDate()
-                    except IndexError:
-                        raise StopIteration
+                    comments, current = self.__fetch(self.__current)
+                if current is None:
+                    raise StopIteration
+                self.__current = current
                 return comments
 
-        return __user_comments_iterator(self, user, created, older, flag)
+            def close(self):
+                """
+                Stops prefetching pages
+
+                :return: None
+                """
+                if self.__prefetcher is not None:
+                    self.__prefetcher.close()
+                    self.__prefetcher = None
+
+            def __del__(self):
+                self.close()
+
+            def __fetch(self, current) -> tuple:
+                comments = _parse_response(self.api.get_user_comments(self.user, current, self.older, self.flag),
+                                           Comments)
+                try:
+                    return comments, comments.minDate() if self.older else comments.maxDate()
+                except IndexError:
+                    return comments, None
+
+        return __user_comments_iterator(self, user, created, older, flag, prefetch, checkpoint, checkpoint_name)
+
+    def get_user_comments_stream(self, user: str, created: int = -1, older: bool = True, flag: int or str = 1,
+                                 limit: int = None, until_created: int = None, predicate=None, prefetch: int = 0):
+        """
+        Yields single comments of get_user_comments_iterator and stops fetching pages as soon as a
+        condition is met, see get_posts_stream
+
+        Parameters
+        ----------
+        :param user: str
+        :param created: int
+                        timestamp to start at, -1 for now (or the oldest comment when older is False)
+        :param older: bool
+        :param flag: int or str
+        :param limit: int
+                      maximum number of comments that are yielded
+        :param until_created: int
+                              timestamp, comments created before it (after it when older is False) are not
+                              yielded and no further pages are fetched once a page reaches it
+        :param predicate: function
+                          called with every :Comment, only comments for which it returns True are yielded
+        :param prefetch: int
+        :return: generator of :Comment
+        """
+        bounds = [("created", until_created)] if until_created is not None else []
+        pages = self.get_user_comments_iterator(user, created, older, flag, prefetch)
+        return self.__stream(pages, older, limit, bounds, predicate)
 
     def get_newest_image(self, flag: int = 1, promoted: int = 0, user: str = None) -> str:
         """
@@ -586,9 +1406,10 @@ class Api:
         if user is not None:
             params["user"] = user
 
-        r = self.__items_request(params)
-        r = json.dumps(json.loads(r)["items"][0])
-        return r
+        item = codec.loads(self.__items_request(params))["items"][0]
+        if self.parsed:
+            return Post(json_obj=item)
+        return codec.dumps(item)
 
     def get_inbox(self, older: int = -1) -> str:
         """
@@ -608,13 +1429,9 @@ class Api:
         if older != -1:
             params["older"] = older
 
-        r = get(self.inbox_all_url,
-                params=params,
-                cookies=self.__login_cookie)
-
-        self.__raise_possible_exceptions(r)
+        r = self.__get(self.inbox_all_url, params)
 
-        return r.content.decode("utf-8")
+        return self.__parse(r, dict)
 
     def get_messages_with_user(self, user: str, older: int = None) -> str:
         """
@@ -635,13 +1452,9 @@ class Api:
         if older is not None:
             params["older"] = older
 
-        r = get(self.inbox_messages_url,
-                params=params,
-                cookies=self.__login_cookie)
-
-        self.__raise_possible_exceptions(r)
+        r = self.__get(self.inbox_messages_url, params)
 
-        return r.content.decode("utf-8")
+        return self.__parse(r, dict)
 
     def vote_post(self, id: int, vote: int) -> bool:
         """
@@ -663,9 +1476,8 @@ class Api:
         """
         if self.logged_in:
             nonce = self.__get_current_nonce()
-            r = post(self.api_url + "items/vote",
-                     data={"id": id, "vote": vote, '_nonce': nonce},
-                     cookies=self.__login_cookie)
+            r = self.__post(self.api_url + "items/vote",
+                            data={"id": id, "vote": vote, '_nonce': nonce})
             return r.status_code == 200
         else:
             raise NotLoggedInException()
@@ -690,9 +1502,8 @@ class Api:
         """
         if self.logged_in:
             nonce = self.__get_current_nonce()
-            r = post(self.api_url + "comments/vote",
-                     data={"id": id, "vote": vote, '_nonce': nonce},
-                     cookies=self.__login_cookie)
+            r = self.__post(self.api_url + "comments/vote",
+                            data={"id": id, "vote": vote, '_nonce': nonce})
             return r.status_code == 200
         else:
             raise NotLoggedInException()
@@ -716,9 +1527,8 @@ class Api:
         """
         if self.logged_in:
             nonce = self.__get_current_nonce()
-            r = post(self.api_url + "tags/vote",
-                     data={"id": id, "vote": vote, '_nonce': nonce},
-                     cookies=self.__login_cookie)
+            r = self.__post(self.api_url + "tags/vote",
+                            data={"id": id, "vote": vote, '_nonce': nonce})
             return r.status_code == 200
         else:
             raise NotLoggedInException()
@@ -736,9 +1546,9 @@ class Api:
         if os.path.isdir(tmp_path):
             # Directory, append filename
             tmp_path = os.path.join(tmp_path, "pr0gramm_captcha.png")
-        captcha_req = get(self.api_url + "user/captcha")
-        token = captcha_req.json()["token"]
-        image = captcha_req.json()["captcha"].split("base64,")[-1]
+        captcha_req = codec.loads(self.__get(self.api_url + "user/captcha"))
+        token = captcha_req["token"]
+        image = captcha_req["captcha"].split("base64,")[-1]
         write_img = open(tmp_path, "wb") if not isinstance(tmp_path, io.BytesIO) else tmp_path
         write_img.write(base64.b64decode(image))
         write_img.close()
@@ -791,7 +1601,7 @@ class Api:
             print("Already logged in via cookie -> reading file")
             try:
                 with open(cookie_path, "r") as tmp_file:
-                    self.__login_cookie = json.loads(tmp_file.read())
+                    self.__set_login_cookie(codec.loads(tmp_file.read()))
                 self.logged_in = True
             except IOError:
                 print("Could not open cookie file %s", cookie_path)
@@ -814,8 +1624,8 @@ class Api:
                     # Prompt for captcha solving
                     if captcha_content is None or token is None:
                         captcha_content = self._prompt_for_captcha(captcha)
-                    r = post(self.login_url, data={'name': self.__username, 'password': self.__password,
-                                                   'captcha': captcha_content, 'token': token})
+                    r = self.__post(self.login_url, data={'name': self.__username, 'password': self.__password,
+                                                          'captcha': captcha_content, 'token': token})
 
                     if not r.json()["success"]:
                         print("There was an error logging in: " + str(r.json()["error"]))
@@ -834,10 +1644,10 @@ class Api:
                 except IOError:
                     pass
             if r.json()['success']:
-                self.__login_cookie = r.cookies
+                self.__set_login_cookie(r.cookies)
                 try:
                     with open(cookie_path, 'w') as temp_file:
-                        temp_file.write(json.dumps(utils.dict_from_cookiejar(r.cookies)))
+                        temp_file.write(codec.dumps(utils.dict_from_cookiejar(r.cookies)))
                     self.logged_in = True
                 except IOError:
                     print("Could not write cookie file %s", cookie_path)
@@ -854,7 +1664,7 @@ class Api:
         :raises: NotLoggedInException
         """
         try:
-            nonce = json.loads(parse.unquote(self.__login_cookie["me"]))["id"][0:16]
+            nonce = codec.loads(parse.unquote(self.__login_cookie["me"]))["id"][0:16]
         except TypeError:
             raise NotLoggedInException()
         if not self.logged_in or nonce is None or nonce == "":
@@ -880,10 +1690,7 @@ class Api:
             "itemId": item if isinstance(item, int) else item["id"],
             "tags": ",".join(tag) if isinstance(tag, list) else tag
         }
-        r = post(url=self.api_url + "tags/add",
-                 data=data,
-                 cookies=self.__login_cookie
-                 )
+        r = self.__post(self.api_url + "tags/add", data)
         return r.status_code == 200
 
     def delete_item(self, item: int or Post, reason: str, notifyUser: bool = True, days: int = 0, banUser: bool = False):
@@ -912,10 +1719,7 @@ class Api:
             "reason": reason,
             "customReason": ""  # Not used yet
         }
-        r = post(url=self.api_url + "items/delete",
-                 data=data,
-                 cookies=self.__login_cookie
-                 )
+        r = self.__post(self.api_url + "items/delete", data)
         return r.status_code == 200
 
     @property
@@ -926,9 +1730,9 @@ class Api:
         """
         if not self.logged_in:
             raise NotLoggedInException()
-        r = get(url=self.api_url + "items/ratelimited")
+        r = self.__get(self.api_url + "items/ratelimited")
         try:
-            return r.json()["left"]
+            return codec.loads(r)["left"]
         except KeyError:
             raise NotLoggedInException()
         except TypeError:
@@ -6,3 +6,8 @@ class NotLoggedInException(Exception):
 class RateLimitReached(Exception):
     def __init___(self):
         Exception.__init__(self, "You tried to log in too often")
+
+
+class TooManyRequests(Exception):
+    def __init__(self):
+        Exception.__init__(self, "The server is still rate limiting requests after all retries")
@@ -0,0 +1,332 @@
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Union
+
+from pr0gramm.api import Api, _parse_response
+from pr0gramm.api_exceptions import NotLoggedInException
+from pr0gramm.items import *
+
+
+class AsyncApi:
+    def __init__(self, username: str = "", password: str = "", tmp_dir: str = "./", no_login: bool = False,
+                 concurrency: int = 10, api: Api = None, **kwargs):
+        """
+        Asyncio client for the pr0gramm api
+
+        Mirrors the methods of :Api as coroutines and returns the same values, so the results can be passed
+        to :Posts, :Comments, :User, ... just like before (or are already parsed if parsed=True is passed).
+        The requests are made by a wrapped :Api object in a thread pool of 'concurrency' threads, so the
+        number of threads caps the concurrency: at most 'concurrency' requests are in flight at the same
+        time and further calls wait for a free thread.
+
+        This is an asyncio interface to the blocking :Api and not an async http client: every request in
+        flight holds one thread, so it needs as many threads as a thread pool with the same concurrency.
+        It lets coroutines await the requests and caps the requests in flight, it does not lower the
+        number of threads.
+
+        Parameters
+        ----------
+        :param username: str
+                         Username used for logging in
+        :param password: str
+                         Password used for logging in
+        :param tmp_dir: str
+                        Directory where the login cookie is stored
+        :param no_login: bool
+                         If set to True the api will not try to log in
+        :param concurrency: int
+                            Number of threads, the maximum number of requests that are made at the same time
+        :param api: :Api
+                    Use an existing :Api object instead of creating a new one
+        :param kwargs: Passed to :Api, for example pool_maxsize
+        """
+        if api is None:
+            kwargs.setdefault("pool_maxsize", concurrency)
+            api = Api(username, password, tmp_dir, no_login, **kwargs)
+
+        self.api = api
+        self.concurrency = concurrency
+        self.__executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Shuts down the thread pool, waiting for requests that are still running
+
+        :return: None
+        """
+        self.__executor.shutdown(wait=True)
+
+    async def __call(self, func, *args, **kwargs):
+        """
+        Runs a blocking :Api method in the thread pool
+
+        :param func: method of the wrapped :Api object
+        :return: result of the method
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__executor, functools.partial(func, *args, **kwargs))
+
+    @property
+    def logged_in(self) -> bool:
+        return self.api.logged_in
+
+    calculate_flag = staticmethod(Api.calculate_flag)
+
+    async def login(self, cookie_only: bool = False, token: str = None, captcha_content: str = None) -> bool:
+        """
+        See :Api.login
+        """
+        return await self.__call(self.api.login, cookie_only, token, captcha_content)
+
+    async def get_items(self, item: int or str, flag: int or str = 1, promoted: int = 0,
+                        older: bool or None = True, user: str = None) -> str:
+        """
+        See :Api.get_items
+        """
+        return await self.__call(self.api.get_items, item, flag, promoted, older, user)
+
+    async def get_items_by_tag(self, *args, **kwargs) -> str:
+        """
+        See :Api.get_items_by_tag
+        """
+        return await self.__call(self.api.get_items_by_tag, *args, **kwargs)
+
+    async def get_item_info(self, item: int or str, flag: int or str = 1) -> str:
+        """
+        See :Api.get_item_info
+        """
+        return await self.__call(self.api.get_item_info, item, flag)
+
+    async def get_collection_items(self, collection: str = "favoriten", user: str = None, item: int = None,
+                                   flag: int or str = 9, older: bool or None = True) -> str:
+        """
+        See :Api.get_collection_items
+        """
+        return await self.__call(self.api.get_collection_items, collection, user, item, flag, older)
+
+    async def get_user_info(self, user: str, flag: int or str = 1) -> str:
+        """
+        See :Api.get_user_info
+        """
+        return await self.__call(self.api.get_user_info, user, flag)
+
+    async def get_user_comments(self, user: str, created: int = -1, older: bool = True, flag: int = 1) -> str:
+        """
+        See :Api.get_user_comments
+        """
+        return await self.__call(self.api.get_user_comments, user, created, older, flag)
+
+    async def get_newest_image(self, flag: int = 1, promoted: int = 0, user: str = None) -> str:
+        """
+        See :Api.get_newest_image
+        """
+        return await self.__call(self.api.get_newest_image, flag, promoted, user)
+
+    async def get_inbox(self, older: int = -1) -> str:
+        """
+        See :Api.get_inbox
+        """
+        return await self.__call(self.api.get_inbox, older)
+
+    async def get_messages_with_user(self, user: str, older: int = None) -> str:
+        """
+        See :Api.get_messages_with_user
+        """
+        return await self.__call(self.api.get_messages_with_user, user, older)
+
+    async def vote_post(self, id: int, vote: int) -> bool:
+        """
+        See :Api.vote_post
+        """
+        return await self.__call(self.api.vote_post, id, vote)
+
+    async def vote_comment(self, id: int or str, vote: int or str) -> bool:
+        """
+        See :Api.vote_comment
+        """
+        return await self.__call(self.api.vote_comment, id, vote)
+
+    async def vote_tag(self, id: int, vote: int) -> bool:
+        """
+        See :Api.vote_tag
+        """
+        return await self.__call(self.api.vote_tag, id, vote)
+
+    async def add_tag(self, item: int or Post, tag: Union[str, List[str]]) -> bool:
+        """
+        See :Api.add_tag
+        """
+        return await self.__call(self.api.add_tag, item, tag)
+
+    async def get_ratelimit(self) -> int:
+        """
+        See :Api.ratelimit
+        """
+        return await self.__call(lambda: self.api.ratelimit)
+
+    def get_items_iterator(self, item: int or str = -1, flag: int or str = 1, promoted: int = 0,
+                           older: bool or None = True, user: str = None):
+        """
+        Async version of :Api.get_items_iterator, use with 'async for'
+        """
+        class __async_items_iterator:
+            def __init__(self, api, item, flag=1, promoted=0, older=True, user=None):
+                self.item = item
+                self.api = api
+                self.flag = flag
+                self.older = older
+                self.promoted = promoted
+                self.user = user
+                self.__current = None
+
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                if self.__current is None:
+                    if self.item == -1:
+                        response = await self.api.get_newest_image(flag=self.flag, promoted=self.promoted,
+                                                                   user=self.user)
+                        self.__current = _parse_response(response, Post)["id"]
+                    else:
+                        self.__current = self.item
+
+                response = await self.api.get_items(self.__current, self.flag, self.promoted, self.older, self.user)
+                posts = _parse_response(response, self.api.api.posts_class)
+                try:
+                    if self.older:
+                        self.__current = posts.minPromotedId() if self.promoted == 1 else posts.minId()
+                    else:
+                        self.__current = posts.maxPromotedId() if self.promoted == 1 else posts.maxId()
+                except IndexError:
+                    raise StopAsyncIteration
+                return posts
+
+        return __async_items_iterator(self, item, flag, promoted, older, user)
+
+    def get_items_by_tag_iterator(self, tags: str, flag: int or str = 1, older: int = -1, newer: int = -1,
+                                  promoted: int = 0, user: str = None):
+        """
+        Async version of :Api.get_items_by_tag_iterator, use with 'async for'
+
+        Starts at 'older' going to older posts, at 'newer' going to newer posts
+        or at the newest post with the tags going to older posts if neither is given
+        """
+        class __async_items_tag_iterator:
+            def __init__(self, api, tags, flag=1, older=-1, newer=-1, promoted=0, user=None):
+                self.tags = tags
+                self.api = api
+                self.flag = flag
+                self.promoted = promoted
+                self.user = user
+                self.older = newer == -1
+                if older != -1:
+                    self.__current = older
+                elif newer != -1:
+                    self.__current = newer
+                else:
+                    self.__current = None
+
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                response = await self.api.get_items_by_tag(self.tags, self.flag, self.__current,
+                                                           self.older if self.__current is not None else None,
+                                                           self.promoted, self.user)
+                posts = _parse_response(response, self.api.api.posts_class)
+                try:
+                    if self.older:
+                        self.__current = posts.minPromotedId() if self.promoted == 1 else posts.minId()
+                    else:
+                        self.__current = posts.maxPromotedId() if self.promoted == 1 else posts.maxId()
+                except IndexError:
+                    raise StopAsyncIteration
+                return posts
+
+        return __async_items_tag_iterator(self, tags, flag, older, newer, promoted, user)
+
+    def get_collection_items_iterator(self, collection: str = "favoriten", user: str = "", item: int or str = None,
+                                      flag: int or str = 9, older: bool or None = True):
+        """
+        Async version of :Api.get_collection_items_iterator, use with 'async for'
+        """
+        class __async_collection_items_iterator:
+            def __init__(self, api, item, collection="favoriten", flag=9, older=True, user=None):
+                self.item = item
+                self.api = api
+                self.collection = collection
+                self.flag = flag
+                self.older = older
+                self.user = user
+                self.__current = None
+
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                if self.__current is None:
+                    if self.item is None:
+                        response = await self.api.get_collection_items(self.collection, self.user, self.item,
+                                                                       self.flag, self.older)
+                        self.__current = _parse_response(response, self.api.api.posts_class).maxId()
+                    else:
+                        self.__current = self.item
+
+                response = await self.api.get_collection_items(self.collection, self.user, self.__current,
+                                                               self.flag, self.older)
+                posts = _parse_response(response, self.api.api.posts_class)
+                try:
+                    self.__current = posts.minId() if self.older else posts.maxId()
+                except IndexError:
+                    raise StopAsyncIteration
+                return posts
+
+        return __async_collection_items_iterator(self, item, collection, flag, older, user)
+
+    def get_user_comments_iterator(self, user: str, created: int = -1, older: bool = True, flag: int or str = 1):
+        """
+        Async version of :Api.get_user_comments_iterator, use with 'async for'
+        """
+        class __async_user_comments_iterator:
+            def __init__(self, api, user, created=-1, older=True, flag=1):
+                self.created = created
+                if self.created == -1 and older:
+                    self.created = time.time()
+                self.api = api
+                self.older = older
+                self.user = user
+                self.flag = flag
+                self.__current = None
+
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                if self.__current is None:
+                    if self.created == -1:
+                        try:
+                            response = await self.api.get_user_comments(self.user, flag=self.flag, older=None)
+                            self.__current = _parse_response(response, Comments)[0]["created"] + 1
+                        except IndexError:
+                            raise NotLoggedInException
+                    else:
+                        self.__current = self.created
+
+                response = await self.api.get_user_comments(self.user, self.__current, self.older, self.flag)
+                comments = _parse_response(response, Comments)
+                try:
+                    self.__current = comments.minDate() if self.older else comments.maxDate()
+                except IndexError:
+                    raise StopAsyncIteration
+                return comments
+
+        return __async_user_comments_iterator(self, user, created, older, flag)
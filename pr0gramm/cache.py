@@ -0,0 +1,230 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib import parse
+
+
+class Cache:
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Base class of the response caches used by :Api
+
+        Responses are stored as bytes with an expiry time. If there are more than 'max_entries' entries
+        or the stored responses are larger than 'max_bytes' the least recently used entries are evicted.
+
+        Parameters
+        ----------
+        :param max_entries: int
+                            Maximum number of cached responses
+        :param max_bytes: int
+                          Maximum size of all cached responses in bytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def make_key(url: str, params: dict = None) -> str:
+        """
+        Creates the cache key of a request, the order of the parameters does not matter
+
+        :param url: str
+        :param params: dict
+                       with url parameters
+        :return: str
+        """
+        if not params:
+            return url
+        return url + "?" + parse.urlencode(sorted((str(k), str(v)) for k, v in params.items()))
+
+    def get(self, key: str) -> bytes or None:
+        """
+        :param key: str
+        :return: bytes or None
+                 cached response or None if there is no valid entry
+        """
+        value = self._get(key, time.time())
+        with self._lock:
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return value
+
+    def set(self, key: str, value: bytes, ttl: float):
+        """
+        :param key: str
+        :param value: bytes
+        :param ttl: float
+                    seconds the entry is valid
+        :return: None
+        """
+        if len(value) > self.max_bytes:
+            return
+        self._set(key, value, time.time() + ttl)
+
+    def invalidate(self, key: str = None, prefix: str = None):
+        """
+        Removes entries from the cache
+
+        :param key: str
+                    removes the entry with this key
+        :param prefix: str
+                       removes all entries with keys starting with the prefix
+                       if neither key nor prefix are given all entries are removed
+        :return: None
+        """
+        raise NotImplementedError
+
+    @property
+    def stats(self) -> dict:
+        """
+        hits, misses and evictions since the cache was created, current number of entries and size in bytes
+        """
+        entries, size = self._size()
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses, "evictions": self._evictions,
+                    "entries": entries, "bytes": size}
+
+    def _get(self, key: str, now: float) -> bytes or None:
+        raise NotImplementedError
+
+    def _set(self, key: str, value: bytes, expires: float):
+        raise NotImplementedError
+
+    def _size(self) -> tuple:
+        raise NotImplementedError
+
+
+class MemoryCache(Cache):
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 64 * 1024 * 1024):
+        """
+        In process LRU cache
+
+        Parameters
+        ----------
+        :param max_entries: int
+                            Maximum number of cached responses
+        :param max_bytes: int
+                          Maximum size of all cached responses in bytes
+        """
+        super(MemoryCache, self).__init__(max_entries, max_bytes)
+        self.__entries = OrderedDict()
+        self.__bytes = 0
+
+    def _get(self, key, now):
+        with self._lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < now:
+                self.__remove(key)
+                return None
+            self.__entries.move_to_end(key)
+            return value
+
+    def _set(self, key, value, expires):
+        with self._lock:
+            if key in self.__entries:
+                self.__remove(key)
+            self.__entries[key] = (value, expires)
+            self.__bytes += len(key) + len(value)
+
+            while len(self.__entries) > self.max_entries or self.__bytes > self.max_bytes:
+                self.__remove(next(iter(self.__entries)))
+                self._evictions += 1
+
+    def invalidate(self, key: str = None, prefix: str = None):
+        with self._lock:
+            if key is not None:
+                if key in self.__entries:
+                    self.__remove(key)
+            elif prefix is not None:
+                for cached_key in [k for k in self.__entries if k.startswith(prefix)]:
+                    self.__remove(cached_key)
+            else:
+                self.__entries.clear()
+                self.__bytes = 0
+
+    def _size(self):
+        with self._lock:
+            return len(self.__entries), self.__bytes
+
+    def __remove(self, key):
+        value, _ = self.__entries.pop(key)
+        self.__bytes -= len(key) + len(value)
+
+
+class SqliteCache(Cache):
+    def __init__(self, file_name: str, max_entries: int = 65536, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Persistent LRU cache stored in a sqlite database
+
+        Parameters
+        ----------
+        :param file_name: str
+                          Path of the database, it is created if it does not exist
+        :param max_entries: int
+                            Maximum number of cached responses
+        :param max_bytes: int
+                          Maximum size of all cached responses in bytes
+        """
+        super(SqliteCache, self).__init__(max_entries, max_bytes)
+        self.file_name = file_name
+        self.__connection = sqlite3.connect(file_name, check_same_thread=False, isolation_level=None)
+        self.__connection.execute("create table if not exists cache (key text primary key, value blob, "
+                                  "expires real, accessed real, size int)")
+        self.__connection.execute("create index if not exists cache_accessed on cache(accessed)")
+
+    def _get(self, key, now):
+        with self._lock:
+            row = self.__connection.execute("select value, expires from cache where key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self.__connection.execute("delete from cache where key = ?", (key,))
+                return None
+            self.__connection.execute("update cache set accessed = ? where key = ?", (now, key))
+            return bytes(row[0])
+
+    def _set(self, key, value, expires):
+        with self._lock:
+            self.__connection.execute("insert or replace into cache values (?, ?, ?, ?, ?)",
+                                      (key, sqlite3.Binary(value), expires, time.time(), len(key) + len(value)))
+            entries, size = self.__connection.execute("select count(*), coalesce(sum(size), 0) "
+                                                      "from cache").fetchone()
+            while entries > self.max_entries or size > self.max_bytes:
+                oldest = self.__connection.execute("select key, size from cache "
+                                                   "order by accessed limit 1").fetchone()
+                self.__connection.execute("delete from cache where key = ?", (oldest[0],))
+                entries -= 1
+                size -= oldest[1]
+                self._evictions += 1
+
+    def invalidate(self, key: str = None, prefix: str = None):
+        with self._lock:
+            if key is not None:
+                self.__connection.execute("delete from cache where key = ?", (key,))
+            elif prefix is not None:
+                self.__connection.execute("delete from cache where substr(key, 1, ?) = ?", (len(prefix), prefix))
+            else:
+                self.__connection.execute("delete from cache")
+
+    def _size(self):
+        with self._lock:
+            entries, size = self.__connection.execute("select count(*), coalesce(sum(size), 0) "
+                                                      "from cache").fetchone()
+            return entries, size
+
+    def close(self):
+        """
+        Closes the database connection
+
+        :return: None
+        """
+        self.__connection.close()
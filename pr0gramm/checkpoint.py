@@ -0,0 +1,174 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from pr0gramm import codec
+
+
+class Checkpoint:
+    def __init__(self):
+        """
+        Base class of the checkpoint stores used by the iterators of :Api
+
+        A checkpoint stores the cursor of an iterator together with the parameters of the crawl
+        (iterator, direction, flags, promoted, tags, user). The cursor is stored when the next page is
+        requested, so a page that was handed out counts as processed once the following page is
+        requested. An iterator created with the same parameters and the same checkpoint resumes after
+        the last processed page.
+
+        Example:
+            checkpoint = SqliteCheckpoint("crawl.db")
+            for posts in api.get_items_iterator(flag=31, checkpoint=checkpoint):
+                ...
+        """
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_name(params: dict) -> str:
+        """
+        :param params: dict
+                       parameters of the crawl
+        :return: str
+                 name under which the crawl is stored, for example 'items flag=31 older=True promoted=0 user=None'
+        """
+        return " ".join([params["iterator"]] + ["%s=%s" % (key, params[key]) for key in sorted(params)
+                                                if key != "iterator"])
+
+    def resume(self, name: str, params: dict):
+        """
+        :param name: str
+        :param params: dict
+                       parameters of the crawl
+        :return: cursor of the crawl, None if there is no checkpoint with this name
+        :raises ValueError if the checkpoint was stored for a crawl with different parameters
+        """
+        state = self.load(name)
+        if state is None:
+            return None
+        if state["params"] != params:
+            raise ValueError("checkpoint '%s' belongs to a crawl with the parameters %s" % (name, state["params"]))
+        return state["cursor"]
+
+    def commit(self, name: str, params: dict, cursor):
+        """
+        Stores the cursor of a crawl
+
+        :param name: str
+        :param params: dict
+                       parameters of the crawl
+        :param cursor: next cursor of the crawl
+        :return: None
+        """
+        self.save(name, {"params": params, "cursor": cursor, "updated": time.time()})
+
+    def load(self, name: str) -> dict or None:
+        """
+        :param name: str
+        :return: dict or None
+                 stored state, None if there is none
+        """
+        raise NotImplementedError
+
+    def save(self, name: str, state: dict):
+        """
+        Replaces the stored state atomically
+
+        :param name: str
+        :param state: dict
+        :return: None
+        """
+        raise NotImplementedError
+
+    def delete(self, name: str):
+        """
+        :param name: str
+        :return: None
+        """
+        raise NotImplementedError
+
+
+class FileCheckpoint(Checkpoint):
+    def __init__(self, file_name: str):
+        """
+        Checkpoints stored in a json file
+
+        The file is replaced atomically on every save, so it is never left half written.
+
+        Parameters
+        ----------
+        :param file_name: str
+                          Path of the file, it is created if it does not exist
+        """
+        super(FileCheckpoint, self).__init__()
+        self.file_name = file_name
+        self.__states = {}
+        if os.path.exists(file_name):
+            with open(file_name, "rb") as file:
+                self.__states = codec.loads(file.read())
+
+    def load(self, name):
+        with self._lock:
+            return self.__states.get(name)
+
+    def save(self, name, state):
+        with self._lock:
+            self.__states[name] = state
+            self.__write()
+
+    def delete(self, name):
+        with self._lock:
+            if self.__states.pop(name, None) is not None:
+                self.__write()
+
+    def __write(self):
+        directory = os.path.dirname(os.path.abspath(self.file_name))
+        fd, tmp_name = tempfile.mkstemp(dir=directory, prefix=".checkpoint")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(codec.dumps_bytes(self.__states))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_name, self.file_name)
+        except BaseException:
+            os.remove(tmp_name)
+            raise
+
+
+class SqliteCheckpoint(Checkpoint):
+    def __init__(self, file_name: str):
+        """
+        Checkpoints stored in a sqlite database
+
+        Parameters
+        ----------
+        :param file_name: str
+                          Path of the database, it is created if it does not exist
+                          can be the same database as the one of :SqliteCache or :Manager
+        """
+        super(SqliteCheckpoint, self).__init__()
+        self.file_name = file_name
+        self.__connection = sqlite3.connect(file_name, check_same_thread=False, isolation_level=None)
+        self.__connection.execute("create table if not exists checkpoints (name text primary key, state text)")
+
+    def load(self, name):
+        with self._lock:
+            row = self.__connection.execute("select state from checkpoints where name = ?", (name,)).fetchone()
+            return codec.loads(row[0]) if row is not None else None
+
+    def save(self, name, state):
+        with self._lock:
+            self.__connection.execute("insert or replace into checkpoints values (?, ?)", (name, codec.dumps(state)))
+
+    def delete(self, name):
+        with self._lock:
+            self.__connection.execute("delete from checkpoints where name = ?", (name,))
+
+    def close(self):
+        """
+        Closes the database connection
+
+        :return: None
+        """
+        self.__connection.close()
@@ -0,0 +1,125 @@
+"""
+Json codec used by the whole package
+
+The fastest installed backend is used automatically (orjson, then ujson, then the json module of the
+standard library). dumps returns the same str as json.dumps with every backend, so the output of
+:ApiItem.to_json does not change when a backend is installed. dumps_bytes returns compact utf-8 json
+without whitespace and is the fast path used internally. Use set_codec to pick a backend explicitly:
+
+    from pr0gramm import codec
+    codec.set_codec("json")
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+class JsonCodec:
+    """
+    Codec using the json module of the standard library
+    """
+    name = "json"
+
+    @staticmethod
+    def loads(data: bytes or str):
+        """
+        :param data: bytes or str
+                     json encoded as utf-8 bytes or str
+        :return: parsed object
+        """
+        return json.loads(data)
+
+    @staticmethod
+    def dumps(obj) -> str:
+        """
+        :param obj: object to encode
+        :return: str
+                 json as returned by json.dumps with the default arguments, the same for all backends
+        """
+        return json.dumps(obj)
+
+    def dumps_bytes(self, obj) -> bytes:
+        """
+        :param obj: object to encode
+        :return: bytes
+                 compact utf-8 encoded json
+        """
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    Codec using orjson, which works on bytes natively
+    """
+    name = "orjson"
+
+    @staticmethod
+    def loads(data: bytes or str):
+        return orjson.loads(data)
+
+    def dumps_bytes(self, obj) -> bytes:
+        return orjson.dumps(obj)
+
+
+class UjsonCodec(JsonCodec):
+    """
+    Codec using ujson
+    """
+    name = "ujson"
+
+    @staticmethod
+    def loads(data: bytes or str):
+        return ujson.loads(data)
+
+    def dumps_bytes(self, obj) -> bytes:
+        return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False).encode("utf-8")
+
+
+CODECS = {"json": JsonCodec()}
+if ujson is not None:
+    CODECS["ujson"] = UjsonCodec()
+if orjson is not None:
+    CODECS["orjson"] = OrjsonCodec()
+
+_codec = CODECS.get("orjson", CODECS.get("ujson", CODECS["json"]))
+
+
+def get_codec() -> JsonCodec:
+    """
+    :return: :JsonCodec
+             codec that is currently used
+    """
+    return _codec
+
+
+def set_codec(codec: JsonCodec or str):
+    """
+    Changes the codec used by the package
+
+    :param codec: :JsonCodec or str
+                  codec object or name of an installed codec ('json', 'ujson' or 'orjson')
+    :return: None
+    :raises KeyError if a codec with this name is not installed
+    """
+    global _codec
+    _codec = CODECS[codec] if isinstance(codec, str) else codec
+
+
+def loads(data: bytes or str):
+    return _codec.loads(data)
+
+
+def dumps(obj) -> str:
+    return _codec.dumps(obj)
+
+
+def dumps_bytes(obj) -> bytes:
+    return _codec.dumps_bytes(obj)
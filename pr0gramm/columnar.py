@@ -0,0 +1,353 @@
+"""
+Columnar batches of posts and comments
+
+A batch stores every numeric field of the items in one typed contiguous array and every string field as
+an array of codes into a dictionary of the distinct strings. Aggregates (sums, scores, flag filters,
+group by user, top-k) run over the columns instead of over one dict per item.
+
+The columns are numpy arrays if numpy is installed and arrays of the array module otherwise, the
+results are the same with both:
+
+    batch = api.get_items(...).columns()
+    batch.filter_flags(1).group_by("user")
+"""
+import heapq
+import operator
+from array import array
+from itertools import compress
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class ColumnBatch:
+    # name of every numeric column and the typecode of its array
+    NUMBERS = {}
+    # dictionary encoded string columns
+    STRINGS = ()
+
+    def __init__(self, items=None, use_numpy: bool = None):
+        """
+        Base class of the columnar batches
+
+        Items are added with extend, which only appends to the arrays, so a batch can be filled page by
+        page. Missing numeric fields are stored as 0.
+
+        Parameters
+        ----------
+        :param items: iterable of dicts
+                      items to add, for example :Posts, :Comments or lists of compact records
+        :param use_numpy: bool
+                          True to return numpy arrays, False for arrays of the array module, by default numpy
+                          is used if it is installed
+        :raises ImportError if use_numpy is True and numpy is not installed
+        """
+        if use_numpy is None:
+            use_numpy = numpy is not None
+        elif use_numpy and numpy is None:
+            raise ImportError("numpy is not installed")
+        self.use_numpy = use_numpy
+
+        self.__columns = {name: array(typecode) for name, typecode in self.NUMBERS.items()}
+        self.__columns.update((name, array("i")) for name in self.STRINGS)
+        self.__dictionaries = {name: [] for name in self.STRINGS}
+        self.__codes = {name: {} for name in self.STRINGS}
+        self.__views = {}
+        self.__length = 0
+
+        if items is not None:
+            self.extend(items)
+
+    def __len__(self):
+        return self.__length
+
+    def __repr__(self):
+        return "%s(%d rows, %s)" % (type(self).__name__, self.__length, "numpy" if self.use_numpy else "array")
+
+    def extend(self, items):
+        """
+        Appends items to the batch
+
+        :param items: iterable of dicts
+        :return: None
+        """
+        items = items if isinstance(items, list) else list(items)
+        self.__views = {}
+        for name in self.NUMBERS:
+            self.__append(name, [item.get(name) or 0 for item in items])
+
+        for name in self.STRINGS:
+            dictionary = self.__dictionaries[name]
+            codes = self.__codes[name]
+            values = []
+            for item in items:
+                value = item.get(name)
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(dictionary)
+                    dictionary.append(value)
+                values.append(code)
+            self.__append(name, values)
+        self.__length += len(items)
+
+    def __append(self, name: str, values: list):
+        column = self.__columns[name]
+        if not isinstance(column, array):
+            # numpy column of a filtered batch
+            column = self.__columns[name] = array(self.__typecode(name), column.tobytes())
+        try:
+            column.extend(values)
+        except BufferError:
+            # a numpy view returned earlier still uses the buffer, it keeps the old values
+            column = self.__columns[name] = array(column.typecode, column)
+            column.extend(values)
+
+    def __typecode(self, name: str) -> str:
+        return self.NUMBERS.get(name, "i")
+
+    def column(self, name: str):
+        """
+        :param name: str
+                     name of a numeric column, of a string column or 'score'
+        :return: numpy.ndarray or array.array
+                 values of the column, codes into :ColumnBatch.dictionary for string columns; numpy
+                 arrays are read only and keep their length when the batch is extended, arrays of the
+                 array module are the columns of the batch itself and must not be changed
+        :raises KeyError if the batch has no such column
+        """
+        if name == "score" and name not in self.__columns:
+            return self.score()
+        if not self.use_numpy:
+            return self.__columns[name]
+        view = self.__views.get(name)
+        if view is None:
+            column = self.__columns[name]
+            if not isinstance(column, array):
+                return column
+            if column:
+                view = numpy.frombuffer(column, dtype=column.typecode)
+            else:
+                view = numpy.zeros(0, dtype=column.typecode)
+            view.flags.writeable = False
+            self.__views[name] = view
+        return view
+
+    def dictionary(self, name: str) -> list:
+        """
+        :param name: str
+                     name of a string column
+        :return: list
+                 distinct strings of the column, the codes of :ColumnBatch.column are indices into it
+        """
+        return list(self.__dictionaries[name])
+
+    def row(self, index: int) -> dict:
+        """
+        :param index: int
+        :return: dict
+                 the stored fields of one item
+        """
+        if index < 0:
+            index += self.__length
+        if not 0 <= index < self.__length:
+            raise IndexError("row index out of range")
+        row = {}
+        for name in self.NUMBERS:
+            value = self.column(name)[index]
+            row[name] = value.item() if self.use_numpy else value
+        for name in self.STRINGS:
+            row[name] = self.__dictionaries[name][int(self.column(name)[index])]
+        return row
+
+    def rows(self):
+        """
+        :return: generator of dicts
+                 see :ColumnBatch.row
+        """
+        for index in range(self.__length):
+            yield self.row(index)
+
+    def score(self):
+        """
+        :return: numpy.ndarray or array.array
+                 up - down of every item
+        """
+        if self.use_numpy:
+            return self.column("up") - self.column("down")
+        return array("q", map(operator.sub, self.__columns["up"], self.__columns["down"]))
+
+    def sum(self, name: str) -> int or float:
+        """
+        :param name: str
+                     name of a numeric column or 'score'
+        :return: int or float
+        """
+        values = self.column(name)
+        if self.use_numpy:
+            return values.sum().item()
+        return sum(values)
+
+    def sum_points(self) -> int:
+        """
+        :return: int
+                 sum of up - down of all items, like :Posts.sumPoints
+        """
+        return self.sum("up") - self.sum("down")
+
+    def min(self, name: str) -> int or float:
+        values = self.column(name)
+        return values.min().item() if self.use_numpy else min(values)
+
+    def max(self, name: str) -> int or float:
+        values = self.column(name)
+        return values.max().item() if self.use_numpy else max(values)
+
+    def filter(self, mask):
+        """
+        :param mask: sequence of bool
+                     one value per row, for example batch.column("up") > 100 with numpy
+        :return: batch of the same type with the rows where mask is True
+        """
+        if self.use_numpy:
+            # one index array is cheaper than applying the mask to every column
+            return self.take(numpy.flatnonzero(numpy.asarray(mask, dtype=bool)))
+        return self.__select(lambda name, values: compress(values, mask))
+
+    def take(self, indices):
+        """
+        :param indices: sequence of int
+        :return: batch of the same type with the rows at the indices, in the order of the indices
+        """
+        if self.use_numpy:
+            indices = numpy.asarray(indices, dtype=numpy.intp)
+            return self.__select(lambda name, values: values[indices])
+        return self.__select(lambda name, values: map(values.__getitem__, indices))
+
+    def __select(self, select):
+        """
+        :param select: function
+                       called with the name and the values of every column, returns the selected values
+        :return: batch of the same type that shares the dictionaries of this batch
+        """
+        batch = type(self)(use_numpy=self.use_numpy)
+        for name in self.__columns:
+            if self.use_numpy:
+                # the selected values are a copy, they are converted to an array when the batch is extended
+                values = select(name, self.column(name))
+                values.flags.writeable = False
+                batch.__columns[name] = values
+            else:
+                batch.__columns[name] = array(self.__typecode(name), select(name, self.__columns[name]))
+        batch.__dictionaries = {name: list(dictionary) for name, dictionary in self.__dictionaries.items()}
+        batch.__codes = {name: dict(codes) for name, codes in self.__codes.items()}
+        batch.__length = len(next(iter(batch.__columns.values())))
+        return batch
+
+    def group_by(self, key: str, value: str = "score") -> dict:
+        """
+        Counts the rows and sums a column per string
+
+        Example:
+            batch.group_by("user") -> {"itssme": {"count": 12, "sum": 3478}, ...}
+
+        :param key: str
+                    name of a string column
+        :param value: str
+                      name of a numeric column or 'score'
+        :return: dict
+                 every string of the column that occurs in the batch mapped to a dict with the number of
+                 rows ('count') and the sum of the values ('sum')
+        """
+        dictionary = self.__dictionaries[key]
+        codes = self.column(key)
+        values = self.column(value)
+        if self.use_numpy:
+            counts = numpy.bincount(codes, minlength=len(dictionary))
+            sums = numpy.bincount(codes, weights=values, minlength=len(dictionary))
+            if values.dtype.kind != "f":
+                sums = numpy.rint(sums).astype(numpy.int64)
+            counts, sums = counts.tolist(), sums.tolist()
+        else:
+            counts = [0] * len(dictionary)
+            sums = [0] * len(dictionary)
+            for code, number in zip(codes, values):
+                counts[code] += 1
+                sums[code] += number
+        return {dictionary[code]: {"count": count, "sum": sums[code]}
+                for code, count in enumerate(counts) if count}
+
+    def top(self, k: int, value: str = "score"):
+        """
+        :param k: int
+        :param value: str
+                      name of a numeric column or 'score'
+        :return: batch of the same type with the k rows that have the highest values, highest first;
+                 rows with equal values are not in a particular order
+        """
+        values = self.column(value)
+        k = min(k, self.__length)
+        if self.use_numpy:
+            if k <= 0:
+                return self.take([])
+            indices = numpy.argpartition(-values, k - 1)[:k] if k < self.__length else numpy.arange(k)
+            return self.take(indices[numpy.argsort(-values[indices], kind="stable")])
+        return self.take(heapq.nlargest(k, range(self.__length), key=values.__getitem__))
+
+
+class PostBatch(ColumnBatch):
+    NUMBERS = {"id": "q", "promoted": "q", "up": "q", "down": "q", "created": "q", "width": "i", "height": "i",
+               "flags": "i"}
+    STRINGS = ("user",)
+
+    def __init__(self, items=None, use_numpy: bool = None):
+        """
+        Columnar batch of posts, see :ColumnBatch
+
+        Example:
+            batch = PostBatch(use_numpy=False)
+            for posts in api.get_items_iterator(flag=31):
+                batch.extend(posts)
+            batch.filter_flags(1).top(10)
+
+        Parameters
+        ----------
+        :param items: iterable of :Post or :CompactPost
+        :param use_numpy: bool
+                          see :ColumnBatch
+        """
+        super(PostBatch, self).__init__(items, use_numpy)
+
+    def filter_flags(self, flags: int):
+        """
+        :param flags: int
+                      bit mask of flags (1 sfw, 2 nsfw, 4 nsfl, 8 nsfp, 16 pol)
+        :return: :PostBatch
+                 the posts that have one of the flags
+        """
+        column = self.column("flags")
+        if self.use_numpy:
+            return self.filter(column & flags != 0)
+        return self.filter([value & flags != 0 for value in column])
+
+
+class CommentBatch(ColumnBatch):
+    NUMBERS = {"id": "q", "parent": "q", "itemId": "q", "up": "q", "down": "q", "created": "q", "confidence": "d",
+               "mark": "i"}
+    STRINGS = ("name",)
+
+    def __init__(self, items=None, use_numpy: bool = None):
+        """
+        Columnar batch of comments, see :ColumnBatch
+
+        Comments of items/info have no 'itemId' and comments of profile/comments no 'name', the missing
+        column is 0 or None.
+
+        Parameters
+        ----------
+        :param items: iterable of :Comment or :CompactComment
+        :param use_numpy: bool
+                          see :ColumnBatch
+        """
+        super(CommentBatch, self).__init__(items, use_numpy)
@@ -0,0 +1,176 @@
+import math
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from pr0gramm.api import Api, _parse_response
+from pr0gramm.items import Post, Posts
+
+_DONE = object()
+
+
+class Crawler:
+    def __init__(self, api: Api, flag: int or str = 1, promoted: int = 0, user: str = None, newest: int = None,
+                 oldest: int = 1, workers: int = 4, shards: int = None):
+        """
+        Crawls items/get in parallel by splitting an id range into shards
+
+        Every shard is a range of ids [lower, upper) that is crawled by one worker with its own 'older'
+        cursor. Posts outside the range of a shard are dropped, so every post is delivered exactly once
+        even where the pages of two shards overlap.
+
+        All workers share the :Api object, so its rate limit applies to the whole crawl: the crawl
+        gets faster with more workers until the rate limit (or the server) is the bottleneck.
+
+        Example:
+            for posts in Crawler(api, flag=31, workers=8):
+                ...
+
+        Parameters
+        ----------
+        :param api: :Api
+        :param flag: int or str
+                     see api.md for details
+        :param promoted: int (0 or 1)
+                         if set to 1 the range is over the promoted ids of /top
+        :param user: str
+                     only crawl the uploads of this user
+        :param newest: int
+                       upper end of the range (exclusive), None for the newest post
+        :param oldest: int
+                       lower end of the range (inclusive)
+        :param workers: int
+                        number of threads making requests
+        :param shards: int
+                       number of shards, more shards than workers keep all workers busy when the posts are
+                       not evenly distributed over the ids; defaults to 4 shards per worker
+        """
+        self.api = api
+        self.flag = flag
+        self.promoted = promoted
+        self.user = user
+        self.newest = newest
+        self.oldest = oldest
+        self.workers = workers
+        self.shard_count = shards if shards is not None else workers * 4
+        self.key = "promoted" if promoted == 1 else "id"
+
+        self.__lock = threading.Lock()
+        self.__pages = 0
+        self.__posts = 0
+        self.__shards_done = 0
+
+    def shards(self) -> list:
+        """
+        :return: list of (upper, lower) tuples
+                 id ranges [lower, upper) of the shards, newest first
+        """
+        newest = self.newest
+        if newest is None:
+            newest = _parse_response(self.api.get_newest_image(self.flag, self.promoted, self.user),
+                                     Post)[self.key] + 1
+        size = max(1, math.ceil((newest - self.oldest) / self.shard_count))
+        return [(upper, max(self.oldest, upper - size)) for upper in range(newest, self.oldest, -size)]
+
+    def __iter__(self):
+        return self.crawl()
+
+    def crawl(self):
+        """
+        Crawls all shards
+
+        Pages are yielded in the order in which they arrive, not sorted by id. When the consumer
+        stops early the workers stop after their current request.
+
+        :return: generator of :Posts
+        :raises the exception of a worker if a request failed
+        """
+        shards = queue.Queue()
+        for shard in self.shards():
+            shards.put(shard)
+
+        # bounded, so the workers wait for a slow consumer instead of filling the memory
+        results = queue.Queue(maxsize=self.workers * 2)
+        stop = threading.Event()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def worker():
+            try:
+                while not stop.is_set():
+                    try:
+                        upper, lower = shards.get_nowait()
+                    except queue.Empty:
+                        break
+                    self.__crawl_shard(upper, lower, put, stop)
+            except Exception as e:
+                put(e)
+            put(_DONE)
+
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        for _ in range(self.workers):
+            executor.submit(worker)
+
+        running = self.workers
+        try:
+            while running:
+                item = results.get()
+                if item is _DONE:
+                    running -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            stop.set()
+            executor.shutdown(wait=False)
+
+    def __crawl_shard(self, upper: int, lower: int, put, stop: threading.Event):
+        """
+        :param upper: int
+                      first cursor, the shard contains the ids below it
+        :param lower: int
+                      smallest id of the shard
+        :param put: function
+                    delivers a page, returns False if the crawl was stopped
+        :param stop: threading.Event
+        :return: None
+        """
+        cursor = upper
+        while not stop.is_set():
+            page = _parse_response(self.api.get_items(cursor, self.flag, self.promoted, True, self.user),
+                                   self.api.posts_class)
+            if len(page) == 0:
+                break
+
+            posts = Posts()
+            posts.extend(post for post in page if lower <= post[self.key] < upper)
+            with self.__lock:
+                self.__pages += 1
+                self.__posts += len(posts)
+            if posts and not put(posts):
+                return
+
+            cursor = page.min(self.key)
+            if cursor <= lower:
+                break
+
+        with self.__lock:
+            self.__shards_done += 1
+
+    @property
+    def stats(self) -> dict:
+        """
+        pages: pages fetched
+        posts: posts delivered
+        shards: shards that were crawled completely
+        """
+        with self.__lock:
+            return {"pages": self.__pages, "posts": self.__posts, "shards": self.__shards_done}
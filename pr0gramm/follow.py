@@ -0,0 +1,164 @@
+import threading
+import time
+
+from pr0gramm.api import Api, _parse_response
+from pr0gramm.items import Post
+
+
+class Follower:
+    def __init__(self, api: Api, item: int = None, flag: int or str = 1, promoted: int = 0, user: str = None,
+                 min_interval: float = 1.0, max_interval: float = 60.0, posts_per_poll: float = 5.0,
+                 smoothing: float = 0.3):
+        """
+        Follows /new (or /top) and yields the posts that are newer than the last seen post
+
+        Every poll pages with 'newer' from the last seen post until the newest post is reached, so no
+        post is missed after a pause or a burst of uploads. Between the polls it waits long enough for
+        about 'posts_per_poll' new posts: the wait is derived from a moving average of the observed
+        upload rate and is doubled after every poll without posts, within [min_interval, max_interval].
+
+        Example:
+            follower = Follower(api, flag=31)
+            for posts in follower.follow():
+                ...
+
+        Parameters
+        ----------
+        :param api: :Api
+        :param item: int
+                     id (or promoted id) of the last seen post, None starts after the newest post
+        :param flag: int or str
+                     see api.md for details
+        :param promoted: int (0 or 1)
+                         if set to 1 the promoted posts of /top are followed
+        :param user: str
+                     only follow the uploads of this user
+        :param min_interval: float
+                             shortest wait between two polls in seconds
+        :param max_interval: float
+                             longest wait between two polls in seconds
+        :param posts_per_poll: float
+                               number of new posts a poll should find, fewer means lower lag and more requests
+        :param smoothing: float
+                          weight of the newest observation in the moving average of the upload rate
+        """
+        self.api = api
+        self.item = item
+        self.flag = flag
+        self.promoted = promoted
+        self.user = user
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.posts_per_poll = posts_per_poll
+        self.smoothing = smoothing
+        self.key = "promoted" if promoted == 1 else "id"
+
+        self.__stop = threading.Event()
+        self.__lock = threading.Lock()
+        self.__interval = min_interval
+        self.__rate = 0.0
+        self.__requests = 0
+        self.__polls = 0
+        self.__empty_polls = 0
+        self.__posts = 0
+
+    def __iter__(self):
+        return self.follow()
+
+    def follow(self):
+        """
+        Polls until :Follower.stop is called
+
+        The pages of one poll are yielded as they arrive, the posts of a page are sorted from new to old
+        like the pages of get_items_iterator. :Follower.item is the last seen post after every page.
+
+        :return: generator of :Posts (:LazyPosts if the api was created with lazy=True)
+        """
+        self.__stop.clear()
+        if self.item is None:
+            self.item = _parse_response(self.api.get_newest_image(self.flag, self.promoted, self.user), Post)[self.key]
+            self.__count(requests=1)
+
+        last_poll = time.monotonic()
+        while not self.__stop.is_set():
+            found = 0
+            while not self.__stop.is_set():
+                posts = _parse_response(self.api.get_items(self.item, self.flag, self.promoted, False, self.user),
+                                        self.api.posts_class)
+                self.__count(requests=1, posts=len(posts))
+                if not posts:
+                    break
+                self.item = posts.max(self.key)
+                found += len(posts)
+                yield posts
+                # the newest post was reached, otherwise the gap is closed without waiting
+                if getattr(posts, "json", {}).get("atStart", True):
+                    break
+
+            now = time.monotonic()
+            self.__adapt(found, now - last_poll)
+            last_poll = now
+            self.__stop.wait(self.interval)
+
+    def __adapt(self, found: int, seconds: float):
+        """
+        Updates the upload rate and the wait until the next poll
+
+        :param found: int
+                      posts found by the last poll
+        :param seconds: float
+                        time since the poll before
+        :return: None
+        """
+        with self.__lock:
+            self.__polls += 1
+            observed = found / seconds if seconds > 0 else 0.0
+            if self.__polls == 1:
+                self.__rate = observed
+            else:
+                self.__rate = self.smoothing * observed + (1 - self.smoothing) * self.__rate
+
+            if found == 0:
+                self.__empty_polls += 1
+                interval = self.__interval * 2
+            elif self.__rate > 0:
+                interval = self.posts_per_poll / self.__rate
+            else:
+                interval = self.min_interval
+            self.__interval = min(max(interval, self.min_interval), self.max_interval)
+
+    def __count(self, requests: int = 0, posts: int = 0):
+        with self.__lock:
+            self.__requests += requests
+            self.__posts += posts
+
+    def stop(self):
+        """
+        Stops following after the current request, can be called from another thread
+
+        :return: None
+        """
+        self.__stop.set()
+
+    @property
+    def interval(self) -> float:
+        """
+        :return: float
+                 current wait between two polls in seconds
+        """
+        with self.__lock:
+            return self.__interval
+
+    @property
+    def stats(self) -> dict:
+        """
+        requests: requests to items/get
+        polls: finished polls
+        empty_polls: polls without new posts
+        posts: new posts
+        rate: moving average of the upload rate in posts per second
+        interval: current wait between two polls in seconds
+        """
+        with self.__lock:
+            return {"requests": self.__requests, "polls": self.__polls, "empty_polls": self.__empty_polls,
+                    "posts": self.__posts, "rate": self.__rate, "interval": self.__interval}
@@ -0,0 +1,148 @@
+import heapq
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable
+
+from pr0gramm.api import Api, _parse_response
+from pr0gramm.items import Comments, UserComments
+
+
+class CommentHarvester:
+    def __init__(self, api: Api, users: Iterable[str] or dict, flag: int or str = 1, workers: int = 8,
+                 since: int or dict = None):
+        """
+        Fetches the comments of many users with concurrent profile/comments cursors
+
+        Every user has its own 'before' cursor. The cursors wait in a priority queue ordered by the
+        creation time of the comments they will return next, so the first pages of all users are
+        fetched first and then the users that were active most recently. Up to 'workers' pages are
+        requested at the same time; all of them share the :Api object and with it its rate limit.
+
+        Example:
+            harvester = CommentHarvester(api, ["itssme", "cha0s"], flag=31, since=last_run)
+            for page in harvester:
+                manager.insert_comment_assignments(page.comment_assignments)
+            last_run = harvester.newest
+
+        Parameters
+        ----------
+        :param api: :Api
+        :param users: iterable of str or dict
+                      names of the users, a dict maps every name to the time of its last known comment
+                      (for example :CommentHarvester.newest of an earlier harvest), users that were active
+                      more recently are fetched first
+        :param flag: int or str
+                     see api.md for details
+        :param workers: int
+                        number of requests made at the same time
+        :param since: int or dict
+                      only fetch the comments created after this timestamp, a dict sets it per user
+                      (users that are missing in the dict are fetched completely)
+        """
+        self.api = api
+        self.users = users if isinstance(users, dict) else dict.fromkeys(users)
+        self.flag = flag
+        self.workers = workers
+        self.since = since
+
+        self.__lock = threading.Lock()
+        self.__newest = {}
+        self.__pages = 0
+        self.__comments = 0
+        self.__errors = 0
+        self.__users_done = 0
+
+    def __since(self, user: str) -> int:
+        if isinstance(self.since, dict):
+            return self.since.get(user) or 0
+        return self.since or 0
+
+    def __iter__(self):
+        return self.harvest()
+
+    def harvest(self):
+        """
+        Fetches the comments of all users
+
+        Pages are yielded as they arrive, so the pages of different users are interleaved. The pages
+        of one user are yielded from new to old. A user whose comments could not be fetched is yielded
+        once with :UserComments.error set and the other users are still fetched.
+
+        :return: generator of :UserComments
+        """
+        now = time.time() + 1
+        # (-created of the next comments, order, user, cursor)
+        queue = [(-(last or now), order, user, now) for order, (user, last) in enumerate(self.users.items())]
+        heapq.heapify(queue)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = {}
+            try:
+                while queue or pending:
+                    while queue and len(pending) < self.workers:
+                        _, order, user, cursor = heapq.heappop(queue)
+                        pending[executor.submit(self.__fetch, user, cursor)] = (order, user)
+
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        order, user = pending.pop(future)
+                        page, cursor = future.result()
+                        if cursor is not None:
+                            heapq.heappush(queue, (-cursor, order, user, cursor))
+                        elif page.error is None:
+                            with self.__lock:
+                                self.__users_done += 1
+                        if page.error is not None or page.comments:
+                            yield page
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def __fetch(self, user: str, cursor: float) -> tuple:
+        """
+        :param user: str
+        :param cursor: float
+                       the page contains the comments created before it
+        :return: tuple (:UserComments, next cursor or None if the user is done)
+        """
+        since = self.__since(user)
+        try:
+            comments = _parse_response(self.api.get_user_comments(user, cursor, True, self.flag), Comments)
+        except Exception as e:
+            with self.__lock:
+                self.__errors += 1
+            return UserComments(user, error=e), None
+
+        page = UserComments(user, [comment for comment in comments if comment["created"] > since])
+        with self.__lock:
+            self.__pages += 1
+            self.__comments += len(page.comments)
+            if page.comments:
+                self.__newest[user] = max(self.__newest.get(user) or 0, page.comments.maxDate())
+
+        if not comments or len(page.comments) < len(comments) or not comments.json.get("hasOlder", True):
+            return page, None
+        return page, comments.minDate()
+
+    @property
+    def newest(self) -> dict:
+        """
+        :return: dict
+                 name of every user that has comments mapped to the creation time of its newest fetched
+                 comment, can be passed as 'users' and 'since' of the next harvest
+        """
+        with self.__lock:
+            return dict(self.__newest)
+
+    @property
+    def stats(self) -> dict:
+        """
+        pages: pages fetched
+        comments: comments delivered
+        users: users that were fetched completely
+        errors: users whose comments could not be fetched
+        """
+        with self.__lock:
+            return {"pages": self.__pages, "comments": self.__comments, "users": self.__users_done,
+                    "errors": self.__errors}
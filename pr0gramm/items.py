@@ -1,12 +1,16 @@
 # encoding: utf-8
 
-import json
+import bisect
+import sys
+
+from pr0gramm import codec
+from pr0gramm.columnar import CommentBatch, PostBatch
 
 
 class ApiItem(dict):
-    def __init__(self, json_str: str = "", json_obj: dict = None):
+    def __init__(self, json_str: str or bytes = "", json_obj: dict = None):
         if json_str:
-            super(ApiItem, self).__init__(json.loads(json_str))
+            super(ApiItem, self).__init__(codec.loads(json_str))
 
         elif json_obj is not None:
             super(ApiItem, self).__init__(json_obj)
@@ -18,8 +22,11 @@ class ApiItem(dict):
     def __str__(self):
         return self.to_json()
 
-    def to_json(self):
-        return json.dumps(self)
+    def to_json(self) -> str:
+        return codec.dumps(self)
+
+    def to_json_bytes(self) -> bytes:
+        return codec.dumps_bytes(self)
 
 
 class Post(ApiItem):
@@ -52,7 +59,7 @@ class User(ApiItem):
         super(User, self).__init__()
 
         if json_str:
-            json_obj = json.loads(json_str)
+            json_obj = codec.loads(json_str)
             json_obj_user = json_obj["user"]
 
             for key, item in json_obj_user.items():
@@ -141,10 +148,251 @@ class TagAssignment:
         self.confidence = confidence
 
 
+_MISSING = object()
+# marks a stored path that is the stem of 'image' followed by the rest of the string
+_STEM = "\x00"
+
+
+class CompactItem:
+    FIELDS = ()
+    INTERNED = ()
+    PATHS = ()
+    __slots__ = ("_extra",)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # set lookups, the tuples are scanned linearly
+        cls._fields = frozenset(cls.FIELDS)
+        cls._interned = frozenset(cls.INTERNED)
+        cls._paths = frozenset(cls.PATHS)
+
+    def __init__(self, json_str: str or bytes = "", json_obj: dict = None):
+        """
+        Base class of the compact records, a memory saving alternative to the dict based :ApiItem
+
+        The known keys of an item (FIELDS) are stored in __slots__ instead of a hash table per item,
+        unknown keys go to an overflow dict that only exists if there are any. Strings that repeat over
+        many items (INTERNED, for example user names) are interned, so all items share one copy, and the
+        paths in PATHS are stored as a suffix of the stem of 'image' when they share it, so the
+        'YYYY/MM/DD/name' part is stored once per post instead of three times.
+
+        The records are read and written like a dict (post["id"], get, keys, items, in) and to_json
+        returns the same json as the :ApiItem, but item access is slower than on a dict.
+
+        Parameters
+        ----------
+        :param json_str: str or bytes
+                         Json str as returned by api
+        :param json_obj: dict
+                         Json object, parsed dictionary from json api response or an :ApiItem
+        """
+        self._extra = None
+        if json_str:
+            json_obj = codec.loads(json_str)
+        if json_obj is not None:
+            for key, value in json_obj.items():
+                self[key] = value
+
+    def __getitem__(self, key):
+        if key in self._fields:
+            value = getattr(self, key, _MISSING)
+            if value is _MISSING:
+                raise KeyError(key)
+            if key in self._paths and type(value) is str and value.startswith(_STEM):
+                return self.image.rsplit(".", 1)[0] + value[1:]
+            return value
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        if key in self._fields:
+            if key == "image":
+                # the paths stored relative to the old image are stored in full
+                for path in self.PATHS:
+                    if path in self:
+                        setattr(self, path, self[path])
+            if type(value) is str:
+                if key in self._interned:
+                    value = sys.intern(value)
+                elif key in self._paths:
+                    value = self.__compact_path(value)
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __compact_path(self, value: str) -> str:
+        image = getattr(self, "image", None)
+        if image is None:
+            return value
+        stem = image.rsplit(".", 1)[0]
+        if value.startswith(stem) and "." in image:
+            # the rest is mostly the file extension, which is shared by all posts
+            return sys.intern(_STEM + value[len(stem):])
+        return value
+
+    def __delitem__(self, key):
+        if key in self._fields and hasattr(self, key):
+            delattr(self, key)
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        if key in self._fields:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __eq__(self, other):
+        if isinstance(other, (CompactItem, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> list:
+        keys = [key for key in self.FIELDS if hasattr(self, key)]
+        if self._extra:
+            keys.extend(self._extra)
+        return keys
+
+    def values(self) -> list:
+        return [self[key] for key in self.keys()]
+
+    def items(self) -> list:
+        return [(key, self[key]) for key in self.keys()]
+
+    def to_dict(self) -> dict:
+        """
+        :return: dict
+                 the item as dict with the keys in the order of FIELDS, followed by the unknown keys
+        """
+        return dict(self.items())
+
+    def __repr__(self):
+        return self.to_json()
+
+    def __str__(self):
+        return self.to_json()
+
+    def to_json(self) -> str:
+        return codec.dumps(self.to_dict())
+
+    def to_json_bytes(self) -> bytes:
+        return codec.dumps_bytes(self.to_dict())
+
+
+class CompactPost(CompactItem):
+    FIELDS = ("id", "promoted", "up", "down", "created", "image", "thumb", "fullsize", "width", "height", "audio",
+              "source", "flags", "user", "mark", "userId", "gift")
+    INTERNED = ("user", "source")
+    PATHS = ("thumb", "fullsize")
+    __slots__ = FIELDS
+
+    def __init__(self, json_str: str or bytes = "", json_obj: dict = None):
+        """
+        A post in pr0gramm.com stored as :CompactItem, see :Post
+
+        Parameters
+        ----------
+        :param json_str: str or bytes
+                         Json str as returned by api
+        :param json_obj: dict
+                         Json object, parsed dictionary from json api response or a :Post
+        """
+        # 'image' has to be set before the paths that are stored relative to it
+        if json_obj is None and json_str:
+            json_obj = codec.loads(json_str)
+        if json_obj is not None and "image" in json_obj:
+            self.image = json_obj["image"]
+        super(CompactPost, self).__init__(json_obj=json_obj)
+
+
+class CompactComment(CompactItem):
+    FIELDS = ("id", "parent", "content", "created", "up", "down", "confidence", "name", "mark", "itemId", "thumb")
+    INTERNED = ("name",)
+    __slots__ = FIELDS + ("comment_assignment",)
+
+    def __init__(self, json_str: str or bytes = "", json_obj: dict = None,
+                 comment_assignment: CommentAssignment = None):
+        """
+        A comment stored as :CompactItem, see :Comment
+
+        Parameters
+        ----------
+        :param json_str: str or bytes
+                         Json str as returned by api
+        :param json_obj: dict
+                         Json object, parsed dictionary from json api response or a :Comment
+        :param comment_assignment: :CommentAssignment
+                                   Assigns this comment to a post
+        """
+        super(CompactComment, self).__init__(json_str, json_obj)
+        self.comment_assignment = comment_assignment
+
+
+class CompactTag(CompactItem):
+    FIELDS = ("id", "confidence", "tag")
+    INTERNED = ("tag",)
+    __slots__ = FIELDS
+
+    def __init__(self, json_str: str or bytes = "", json_obj: dict = None):
+        """
+        A tag stored as :CompactItem, see :Tag
+
+        Parameters
+        ----------
+        :param json_str: str or bytes
+                         Json str as returned by api
+        :param json_obj: dict
+                         Json object, parsed dictionary from json api response or a :Tag
+        """
+        super(CompactTag, self).__init__(json_str, json_obj)
+
+
 class ApiList(list):
+    compact_class = None
+    batch_class = None
+
     def __init__(self):
         super(ApiList, self).__init__()
 
+    def compact(self):
+        """
+        Converts the items to compact records, see :CompactItem
+
+        :return: list of the same type with the compact records, without the json of the response
+        """
+        compact = type(self)()
+        compact.extend(self.compact_class(json_obj=item) for item in self)
+        return compact
+
+    def columns(self, use_numpy: bool = None):
+        """
+        Converts the items to a columnar batch, see :ColumnBatch
+
+        :param use_numpy: bool
+                          see :ColumnBatch
+        :return: :PostBatch or :CommentBatch
+        :raises TypeError if there is no columnar batch for the items of the list (for example :Tags)
+        """
+        if self.batch_class is None:
+            raise TypeError("%s has no columnar batch" % type(self).__name__)
+        return self.batch_class(self, use_numpy)
+
     def min(self, attr):
         min = self[0][attr]
         for elem in self:
@@ -173,7 +421,10 @@ class ApiList(list):
 
 
 class Posts(ApiList):
-    def __init__(self, json_str: str = ""):
+    compact_class = CompactPost
+    batch_class = PostBatch
+
+    def __init__(self, json_str: str = "", json_obj: dict = None):
         """
         A list of multiple :Post objects
 
@@ -183,11 +434,16 @@ class Posts(ApiList):
                          Json str containing multiple posts
                          Example:
                             api.get_items_iterator(...) returns a :Posts object
+        :param json_obj: dict
+                         Json object, parsed dictionary from json api response
         """
         super(Posts, self).__init__()
 
         if json_str != "":
-            self.json = json.loads(json_str)
+            json_obj = codec.loads(json_str)
+
+        if json_obj is not None:
+            self.json = json_obj
             items = self.json["items"]
 
             for i in range(0, len(items)):
@@ -206,8 +462,383 @@ class Posts(ApiList):
         return sum
 
 
+class IndexedPosts(Posts):
+    TRACKED = ("id", "promoted", "created")
+
+    def __init__(self, json_str: str = "", json_obj: dict = None, posts: list = None):
+        """
+        :Posts with an index for large collections
+
+        min and max of id, promoted and created are kept up to date when posts are added, so they
+        take O(1) instead of a scan of the list. Posts are found by id in O(1) with get_by_id and
+        range returns the posts with an id, promoted id or creation time in a range in O(log n + k).
+
+        Every post is contained once: adding a post whose id is already in the list replaces the
+        stored post, so overlapping pages can be added as they are.
+
+        Removing or replacing posts through list methods other than append, extend and insert
+        rebuilds the index on the next query.
+
+        Example:
+            posts = IndexedPosts()
+            for page in api.get_items_iterator(flag=31):
+                posts.extend(page)
+            posts.range("created", 1514764800, 1546300800)
+
+        Parameters
+        ----------
+        :param json_str: str
+                         Json str containing multiple posts
+        :param json_obj: dict
+                         Json object, parsed dictionary from json api response
+        :param posts: list of :Post
+                      posts that are added after the posts of the json
+        """
+        self.__positions = {}
+        self.__bounds = {}
+        self.__views = {}
+        self.__pending = {}
+        self.__dirty = False
+        super(IndexedPosts, self).__init__(json_str, json_obj)
+        if posts is not None:
+            self.extend(posts)
+
+    def append(self, post):
+        self.__rebuild()
+        position = self.__positions.get(post["id"])
+        if position is not None:
+            old = self[position]
+            list.__setitem__(self, position, post)
+            if any(old.get(key) != post.get(key) for key in self.TRACKED):
+                # a replaced post can have been the minimum or maximum
+                self.__dirty = True
+                return
+            for key in list(self.__views):
+                self.__replace_in_view(key, old, post)
+            return
+
+        self.__positions[post["id"]] = len(self)
+        list.append(self, post)
+        for key in self.TRACKED:
+            value = post.get(key)
+            if value is None:
+                continue
+            bounds = self.__bounds.get(key)
+            if bounds is None:
+                self.__bounds[key] = [value, value]
+            elif value < bounds[0]:
+                bounds[0] = value
+            elif value > bounds[1]:
+                bounds[1] = value
+        for key in self.__views:
+            self.__pending[key].append(post)
+
+    def extend(self, posts):
+        for post in posts:
+            self.append(post)
+
+    def __iadd__(self, posts):
+        self.extend(posts)
+        return self
+
+    def insert(self, index, post):
+        length = len(self)
+        self.append(post)
+        if len(self) > length:
+            # move the new post to the requested position
+            list.insert(self, index, list.pop(self))
+            self.__dirty = True
+
+    def __setitem__(self, index, post):
+        list.__setitem__(self, index, post)
+        self.__dirty = True
+
+    def __delitem__(self, index):
+        list.__delitem__(self, index)
+        self.__dirty = True
+
+    def pop(self, index=-1):
+        self.__dirty = True
+        return list.pop(self, index)
+
+    def remove(self, post):
+        list.remove(self, post)
+        self.__dirty = True
+
+    def clear(self):
+        list.clear(self)
+        self.__dirty = True
+
+    def sort(self, *args, **kwargs):
+        list.sort(self, *args, **kwargs)
+        self.__dirty = True
+
+    def reverse(self):
+        list.reverse(self)
+        self.__dirty = True
+
+    def __rebuild(self):
+        """
+        Rebuilds the index after the list was changed by other methods than append and extend
+
+        :return: None
+        """
+        if not self.__dirty:
+            return
+        self.__dirty = False
+        posts = list(self)
+        list.clear(self)
+        self.__positions = {}
+        self.__bounds = {}
+        self.__views = {}
+        self.__pending = {}
+        self.extend(posts)
+
+    def __replace_in_view(self, attr: str, old, post):
+        """
+        Puts a post that replaced 'old' into the sorted view of attr
+
+        :return: None
+        """
+        if old.get(attr) != post.get(attr):
+            del self.__views[attr]
+            del self.__pending[attr]
+            return
+        if old.get(attr) is None:
+            return
+        keys, posts = self.__views[attr]
+        for i in range(bisect.bisect_left(keys, old[attr]), bisect.bisect_right(keys, old[attr])):
+            if posts[i] is old:
+                posts[i] = post
+                return
+        # not merged into the view yet
+        pending = self.__pending[attr]
+        pending[pending.index(old)] = post
+
+    def __view(self, attr: str) -> tuple:
+        """
+        :param attr: str
+        :return: tuple (list of keys, list of posts)
+                 the posts that have attr, sorted by it
+        """
+        self.__rebuild()
+        view = self.__views.get(attr)
+        if view is None:
+            posts = sorted((post for post in self if post.get(attr) is not None), key=lambda post: post[attr])
+            view = ([post[attr] for post in posts], posts)
+            self.__views[attr] = view
+            self.__pending[attr] = []
+            return view
+
+        pending = self.__pending[attr]
+        if pending:
+            pending = sorted((post for post in pending if post.get(attr) is not None), key=lambda post: post[attr])
+            pending_keys = [post[attr] for post in pending]
+            keys, posts = view
+            if not keys or not pending_keys or pending_keys[0] >= keys[-1]:
+                keys.extend(pending_keys)
+                posts.extend(pending)
+            elif pending_keys[-1] <= keys[0]:
+                # pages of older posts are added in front
+                keys[:0] = pending_keys
+                posts[:0] = pending
+            else:
+                # timsort merges the two sorted runs in linear time
+                posts = sorted(posts + pending, key=lambda post: post[attr])
+                view = ([post[attr] for post in posts], posts)
+                self.__views[attr] = view
+            self.__pending[attr] = []
+        return view
+
+    def min(self, attr):
+        self.__rebuild()
+        if attr in self.TRACKED and attr in self.__bounds:
+            return self.__bounds[attr][0]
+        return super(IndexedPosts, self).min(attr)
+
+    def max(self, attr):
+        self.__rebuild()
+        if attr in self.TRACKED and attr in self.__bounds:
+            return self.__bounds[attr][1]
+        return super(IndexedPosts, self).max(attr)
+
+    def get_by_id(self, item: int, default=None):
+        """
+        :param item: int
+                     id of a post
+        :return: :Post or default if there is no post with this id
+        """
+        self.__rebuild()
+        position = self.__positions.get(item)
+        return self[position] if position is not None else default
+
+    def __contains__(self, post):
+        """
+        :param post: :Post or int
+                     a post or the id of a post
+        """
+        if isinstance(post, int):
+            return self.get_by_id(post) is not None
+        return self.get_by_id(post["id"]) == post
+
+    def range(self, attr: str, lower=None, upper=None) -> Posts:
+        """
+        :param attr: str
+                     for example 'id', 'promoted' or 'created'
+        :param lower: lowest value (inclusive), None for no lower bound
+        :param upper: highest value (exclusive), None for no upper bound
+        :return: :Posts
+                 the posts with lower <= post[attr] < upper, sorted by attr
+        """
+        keys, posts = self.__view(attr)
+        start = bisect.bisect_left(keys, lower) if lower is not None else 0
+        end = bisect.bisect_left(keys, upper) if upper is not None else len(keys)
+        result = Posts()
+        result.extend(posts[start:end])
+        return result
+
+    def sorted_by(self, attr: str, reverse: bool = False) -> Posts:
+        """
+        :param attr: str
+        :param reverse: bool
+                        True sorts from the highest to the lowest value
+        :return: :Posts
+                 the posts that have attr, sorted by it
+        """
+        posts = self.__view(attr)[1]
+        result = Posts()
+        result.extend(reversed(posts) if reverse else posts)
+        return result
+
+
+class LazyPosts(Posts):
+    def __init__(self, json_str: str = "", json_obj: dict = None):
+        """
+        :Posts that create the :Post of an item only when it is used
+
+        The response is decoded once and the list holds its decoded items (dicts) until they are used. A
+        :Post replaces an item the first time its index is accessed or it is reached by an iteration. The
+        cursor helpers (minId, maxId, minPromotedId, maxPromotedId, minDate, maxDate), sumPoints, filter,
+        compact and columns read the items as they are, so paging through posts that are only partly used
+        creates no :Post objects for the rest. An item that was not replaced yet is equal to its :Post, so
+        comparisons, sorting and json.dumps give the same results as for :Posts.
+
+        Example:
+            api = Api(lazy=True)
+            for posts in api.get_items_iterator(flag=31):
+                for post in posts.filter(lambda item: item["up"] > 1000):
+                    ...
+
+        Parameters
+        ----------
+        :param json_str: str
+                         Json str containing multiple posts
+        :param json_obj: dict
+                         Json object, parsed dictionary from json api response
+        """
+        super(LazyPosts, self).__init__()
+
+        if json_str != "":
+            json_obj = codec.loads(json_str)
+
+        if json_obj is not None:
+            self.json = json_obj
+            list.extend(self, self.json["items"])
+
+    def __post(self, index: int, item: dict) -> Post:
+        """
+        :param index: int
+                      non negative index of item
+        :param item: dict
+        :return: :Post
+                 the :Post of the item, it replaces the item in the list
+        """
+        if type(item) is dict:
+            item = Post(json_obj=item)
+            list.__setitem__(self, index, item)
+        return item
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        item = list.__getitem__(self, index)
+        return self.__post(index + len(self) if index < 0 else index, item)
+
+    def __iter__(self):
+        for index, item in enumerate(list.__iter__(self)):
+            yield self.__post(index, item)
+
+    def __reversed__(self):
+        for index in range(len(self) - 1, -1, -1):
+            yield self[index]
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __add__(self, other):
+        return list(self) + other
+
+    def __radd__(self, other):
+        # also used for Posts() + lazy_posts, list.__add__ would copy the decoded items
+        return other + list(self)
+
+    def __mul__(self, count):
+        return list(self) * count
+
+    __rmul__ = __mul__
+
+    def __imul__(self, count):
+        # the copies share the :Post of an item like in :Posts
+        self[:] = list(self)
+        return list.__imul__(self, count)
+
+    def pop(self, index=-1):
+        item = list.pop(self, index)
+        return Post(json_obj=item) if type(item) is dict else item
+
+    def copy(self):
+        return list(self)
+
+    def min(self, attr):
+        if not len(self):
+            raise IndexError("list index out of range")
+        return min(item[attr] for item in list.__iter__(self))
+
+    def max(self, attr):
+        if not len(self):
+            raise IndexError("list index out of range")
+        return max(item[attr] for item in list.__iter__(self))
+
+    def sumPoints(self):
+        return sum(item["up"] - item["down"] for item in list.__iter__(self))
+
+    def filter(self, predicate) -> Posts:
+        """
+        :param predicate: function
+                          called with the decoded item (a dict) or the :Post of every post
+        :return: :Posts
+                 the posts for which predicate returns True, only these posts are created
+        """
+        posts = Posts()
+        for index, item in enumerate(list.__iter__(self)):
+            if predicate(item):
+                posts.append(self.__post(index, item))
+        return posts
+
+    def compact(self):
+        compact = type(self)()
+        compact.extend(self.compact_class(json_obj=item) for item in list.__iter__(self))
+        return compact
+
+    def columns(self, use_numpy: bool = None):
+        return self.batch_class(list(list.__iter__(self)), use_numpy)
+
+
 class Comments(ApiList):
-    def __init__(self, json_str=""):
+    compact_class = CompactComment
+    batch_class = CommentBatch
+
+    def __init__(self, json_str="", json_obj: dict = None):
         """
         A list of multiple :Comment objects
 
@@ -217,16 +848,27 @@ class Comments(ApiList):
                          Json str containing multiple comments
                          Example:
                             api.get_user_comments_iterator(...) returns a :Comments object
+        :param json_obj: dict
+                         Json object, parsed dictionary from json api response
         """
         super(Comments, self).__init__()
 
         if json_str != "":
-            self.json = json.loads(json_str)
+            json_obj = codec.loads(json_str)
+
+        if json_obj is not None:
+            self.json = json_obj
             items = self.json["comments"]
 
             for i in range(0, len(items)):
                 self.append(Comment(json_obj=items[i]))
 
+    def compact(self):
+        compact = super(Comments, self).compact()
+        for record, comment in zip(compact, self):
+            record.comment_assignment = getattr(comment, "comment_assignment", None)
+        return compact
+
 
 class CommentAssignments(list):
     def __init__(self):
@@ -237,7 +879,9 @@ class CommentAssignments(list):
 
 
 class Tags(ApiList):
-    def __init__(self, json_str=""):
+    compact_class = CompactTag
+
+    def __init__(self, json_str="", json_obj: dict = None):
         """
         A list of multiple :Tag objects
 
@@ -245,11 +889,16 @@ class Tags(ApiList):
         ----------
         :param json_str: str
                          Json str containing multiple tags
+        :param json_obj: dict
+                         Json object, parsed dictionary from json api response
         """
         super(Tags, self).__init__()
 
         if json_str != "":
-            self.json = json.loads(json_str)
+            json_obj = codec.loads(json_str)
+
+        if json_obj is not None:
+            self.json = json_obj
             items = self.json["tags"]
 
             for i in range(0, len(items)):
@@ -262,3 +911,65 @@ class TagAssignments(list):
         A list of multiple :TagAssignment objects
         """
         super(TagAssignments, self).__init__()
+
+
+class ItemInfo:
+    def __init__(self, post: int, json_str: str = "", json_obj: dict = None, error: Exception = None):
+        """
+        Comments and tags of a post as returned by items/info
+
+        Parameters
+        ----------
+        :param post: int
+                     id of the post
+        :param json_str: str
+                         Json str as returned by api
+        :param json_obj: dict
+                         Json object, parsed dictionary from json api response
+        :param error: Exception
+                      Set if the item info could not be fetched, comments and tags are empty then
+        """
+        self.post = post
+        self.error = error
+        self.comments = Comments()
+        self.tags = Tags()
+        self.comment_assignments = CommentAssignments()
+        self.tag_assignments = TagAssignments()
+
+        if json_str:
+            json_obj = codec.loads(json_str)
+
+        if json_obj is not None:
+            for comment in json_obj["comments"]:
+                comment_assignment = CommentAssignment(post, comment["id"])
+                self.comments.append(Comment(json_obj=comment, comment_assignment=comment_assignment))
+                self.comment_assignments.append(comment_assignment)
+
+            for tag in json_obj["tags"]:
+                self.tags.append(Tag(json_obj=tag))
+                self.tag_assignments.append(TagAssignment(post, tag["id"], None, tag["confidence"]))
+
+
+class UserComments:
+    def __init__(self, user: str, comments: Comments = None, error: Exception = None):
+        """
+        A page of the comments of a user as returned by profile/comments
+
+        Parameters
+        ----------
+        :param user: str
+                     name of the user
+        :param comments: :Comments
+                         comments of the page, the :CommentAssignment of every comment is set from its itemId
+        :param error: Exception
+                      Set if the comments could not be fetched, comments is empty then
+        """
+        self.user = user
+        self.error = error
+        self.comments = Comments()
+        self.comment_assignments = CommentAssignments()
+
+        for comment in comments or []:
+            comment.comment_assignment = CommentAssignment(comment["itemId"], comment["id"])
+            self.comments.append(comment)
+            self.comment_assignments.append(comment.comment_assignment)
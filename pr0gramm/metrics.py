@@ -0,0 +1,236 @@
+import logging
+import math
+import socket
+import threading
+import time
+
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+logger = logging.getLogger("pr0gramm")
+
+# dns and connect time of the connection opened by the last request of the current thread
+connection_timings = threading.local()
+
+# the :TimingAdapter overrides internals of urllib3 (HTTPConnection._new_conn and _dns_host and the pool classes
+# of the PoolManager) that are only known to work with these versions
+TIMING_SUPPORTED = (1, 26) <= tuple(int(part) for part in urllib3.__version__.split(".")[:2]) < (3, 0)
+
+
+class LatencyHistogram:
+    def __init__(self, min_value: float = 0.0001, growth: float = 1.05):
+        """
+        Thread safe histogram with logarithmic buckets
+
+        Percentiles are accurate to about (growth - 1) / 2 of the value, memory does not grow with the number
+        of recorded values.
+
+        Parameters
+        ----------
+        :param min_value: float
+                          values (seconds) below this are put into the first bucket
+        :param growth: float
+                       ratio between the upper bounds of two neighbouring buckets
+        """
+        self.min_value = min_value
+        self.growth = growth
+        self.__log_growth = math.log(growth)
+        self.__buckets = {}
+        self.__count = 0
+        self.__sum = 0.0
+        self.__max = 0.0
+        self.__lock = threading.Lock()
+
+    def record(self, value: float):
+        """
+        :param value: float
+                      latency in seconds
+        :return: None
+        """
+        index = 0 if value <= self.min_value else int(math.log(value / self.min_value) / self.__log_growth) + 1
+        with self.__lock:
+            self.__buckets[index] = self.__buckets.get(index, 0) + 1
+            self.__count += 1
+            self.__sum += value
+            if value > self.__max:
+                self.__max = value
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    def percentile(self, percent: float) -> float or None:
+        """
+        :param percent: float
+                        for example 95 for the p95 latency
+        :return: float or None
+                 latency in seconds, None if nothing was recorded yet
+        """
+        with self.__lock:
+            if self.__count == 0:
+                return None
+            rank = max(1, math.ceil(self.__count * percent / 100))
+            if rank >= self.__count:
+                return self.__max
+            seen = 0
+            for index in sorted(self.__buckets):
+                seen += self.__buckets[index]
+                if seen >= rank:
+                    # middle of the bucket, never more than the largest recorded value
+                    upper = self.min_value * self.growth ** index
+                    lower = upper / self.growth if index > 0 else 0.0
+                    return min((lower + upper) / 2, self.__max)
+            return self.__max
+
+    def summary(self) -> dict:
+        """
+        :return: dict
+                 count, mean, max, p50, p95 and p99 in seconds
+        """
+        with self.__lock:
+            count, total, maximum = self.__count, self.__sum, self.__max
+        return {"count": count, "mean": total / count if count else None, "max": maximum if count else None,
+                "p50": self.percentile(50), "p95": self.percentile(95), "p99": self.percentile(99)}
+
+
+class RequestEvent:
+    def __init__(self, method: str, endpoint: str, url: str, params: dict = None, status: int = None,
+                 bytes: int = 0, dns: float = None, connect: float = None, wait: float = None,
+                 total: float = 0.0, retries: int = 0, cache_hit: bool = False, error: Exception = None):
+        """
+        Describes one request of an :Api object, passed to the hooks registered with :Api.add_hook
+
+        Parameters
+        ----------
+        :param method: str
+                       'GET' or 'POST'
+        :param endpoint: str
+                         for example 'items/get'
+        :param url: str
+        :param params: dict
+                       url parameters (the form data of post requests is not included)
+        :param status: int
+                       status code of the last response, None if the request failed
+        :param bytes: int
+                      size of the response body
+        :param dns: float
+                    seconds spent resolving the host, None if a pooled connection was reused or the
+                    installed urllib3 is not supported (see :TIMING_SUPPORTED)
+        :param connect: float
+                        seconds spent connecting (including tls), None like dns
+        :param wait: float
+                     seconds from handing the request to the connection pool until the response headers
+                     arrived (Response.elapsed) without dns and connect, so it includes sending the request
+        :param total: float
+                      seconds the request took including retries and the token bucket
+        :param retries: int
+                        number of retries
+        :param cache_hit: bool
+                          True if the response was served from the cache without a http request
+        :param error: Exception
+                      exception raised by the last attempt, None if there was a response
+        """
+        self.method = method
+        self.endpoint = endpoint
+        self.url = url
+        self.params = params
+        self.status = status
+        self.bytes = bytes
+        self.dns = dns
+        self.connect = connect
+        self.wait = wait
+        self.total = total
+        self.retries = retries
+        self.cache_hit = cache_hit
+        self.error = error
+
+    def __repr__(self):
+        return "RequestEvent(%s)" % ", ".join("%s=%r" % item for item in vars(self).items())
+
+
+def log_event(event: RequestEvent):
+    """
+    Hook writing every request to the 'pr0gramm' logger
+
+    Example: api.add_hook(log_event)
+
+    :param event: :RequestEvent
+    :return: None
+    """
+    if event.error is not None:
+        logger.warning("%s %s %s failed after %d retries: %r", event.method, event.endpoint, event.params,
+                       event.retries, event.error)
+    else:
+        logger.debug("%s %s %s -> %s, %d bytes, %.1fms%s", event.method, event.endpoint, event.params,
+                     event.status, event.bytes, event.total * 1000, " (cached)" if event.cache_hit else "")
+
+
+class _TimedConnectionMixin:
+    """
+    Records the dns and connect time of new connections in :connection_timings
+    """
+    def connect(self):
+        connection_timings.dns = None
+        start = time.perf_counter()
+        super().connect()
+        connection_timings.connect = time.perf_counter() - start - (connection_timings.dns or 0.0)
+
+    def _new_conn(self):
+        host = getattr(self, "_dns_host", None)
+        if host is None:
+            return super()._new_conn()
+        start = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(host.strip("[]"), self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except OSError:
+            # urllib3 resolves the host again and raises its own exception
+            return super()._new_conn()
+        connection_timings.dns = time.perf_counter() - start
+
+        error = None
+        try:
+            # connect to the resolved addresses one after another, like urllib3 does
+            for address in addresses:
+                self._dns_host = address[4][0]
+                try:
+                    return super()._new_conn()
+                except (ConnectTimeoutError, NewConnectionError) as e:
+                    error = e
+        finally:
+            self._dns_host = host
+        if error is None:
+            return super()._new_conn()
+        raise error
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimingAdapter(HTTPAdapter):
+    """
+    :HTTPAdapter that measures the dns and connect time of the connections it opens
+
+    The host is resolved before urllib3 connects to the resolved address, only use it if
+    :TIMING_SUPPORTED is True. :Api mounts it when the first hook is added.
+    """
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPConnectionPool,
+                                                   "https": _TimedHTTPSConnectionPool}
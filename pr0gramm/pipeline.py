@@ -0,0 +1,346 @@
+import queue
+import threading
+import time
+from collections import deque
+
+from pr0gramm.api import Api
+from pr0gramm.checkpoint import Checkpoint
+from pr0gramm.crawler import Crawler
+from pr0gramm.items import ItemInfo
+from pr0gramm.sql_manager import Manager
+
+_DONE = object()
+
+STAGES = ("listing", "hydration", "parsing", "writing")
+
+
+class Pipeline:
+    def __init__(self, api: Api, item: int or str = -1, flag: int or str = 1, promoted: int = 0,
+                 older: bool = True, user: str = None, prefetch: int = 0, checkpoint: Checkpoint = None,
+                 checkpoint_name: str = None, manager: Manager = None, listing: int = 1, hydration: int = 8,
+                 parsing: int = 1, writing: int = 1, queue_size: int = 256, commit_every: int = 120):
+        """
+        Fetches posts with items/get, their comments and tags with items/info and writes them to a database
+
+        The work is split into four stages that run at the same time and are connected by bounded
+        queues; a stage that is faster than the next one blocks when the queue is full, so a slow
+        database slows the requests down instead of filling the memory.
+
+            listing:   pages of items/get, single posts are passed on
+            hydration: items/info of every post
+            parsing:   :ItemInfo with the :Comments, :Tags, :CommentAssignments and :TagAssignments
+            writing:   :Manager.insert of the post and its item info, committed every 'commit_every' posts
+
+        The item, flag, promoted, older, user, prefetch, checkpoint and checkpoint_name arguments are the
+        ones of :Api.get_items_iterator, a checkpoint of the iterator can be resumed by the pipeline and the
+        other way round. The cursor after a page is only stored when all posts of the page and of the pages
+        before it passed the writing stage and the manager committed them, so posts that were listed but
+        not written when the process stops are listed again after a resume. Posts of a partly written page
+        are written a second time then.
+
+        Example:
+            pipeline = Pipeline(api, flag=31, manager=Manager("pr0gramm.db"), hydration=16)
+            pipeline.run()
+            print(pipeline.stats)
+
+        Parameters
+        ----------
+        :param api: :Api
+        :param manager: :Manager
+                        database the posts are written to, None to only yield them
+        :param listing: int
+                        number of items/get cursors; more than one splits the ids into shards that are
+                        crawled by a :Crawler with 'listing' threads, only for older posts and without
+                        checkpoint. The pages are always passed on by one thread, so workers["listing"]
+                        is 1 and the busy time of the listing in :Pipeline.stats is the one of that thread
+        :param hydration: int
+                          number of items/info requests made at the same time
+        :param parsing: int
+                        number of threads that parse the item info
+        :param writing: int
+                        number of threads that pass the posts to the manager
+        :param queue_size: int
+                           maximum number of posts waiting between two stages
+        :param commit_every: int
+                             number of written posts after which the manager commits
+        :raises ValueError if listing is less than 1 or more than 1 for newer posts or with a checkpoint
+        """
+        if listing < 1:
+            raise ValueError("listing needs at least one items/get cursor")
+        if listing > 1 and (not older or checkpoint is not None):
+            raise ValueError("more than one listing cursor only works for older posts without checkpoint")
+
+        self.api = api
+        self.item = item
+        self.flag = flag
+        self.promoted = promoted
+        self.older = older
+        self.user = user
+        self.prefetch = prefetch
+        self.checkpoint = checkpoint
+        # the parameters and name of :Api.get_items_iterator
+        self.checkpoint_params = {"iterator": "items", "flag": flag, "promoted": promoted, "older": older,
+                                  "user": user}
+        self.checkpoint_name = checkpoint_name or Checkpoint.make_name(self.checkpoint_params)
+        self.manager = manager
+        # listing is the number of threads of the crawler, one thread passes the pages on
+        self.workers = {"listing": 1, "hydration": hydration, "parsing": parsing, "writing": writing}
+        self.listing = listing
+        self.queue_size = queue_size
+        self.commit_every = commit_every
+
+        self.__lock = threading.Lock()
+        self.__counts = dict.fromkeys(STAGES, 0)
+        self.__busy = dict.fromkeys(STAGES, 0.0)
+        self.__queues = {}
+        self.__written = 0
+        self.__errors = 0
+        self.__started = None
+        self.__finished = None
+        # [posts not written yet, cursor after the page] of the listed pages that are not in the checkpoint
+        self.__pages_open = deque()
+        # id of a listed post -> its entry in __pages_open
+        self.__page_of = {}
+        self.__checkpoint_lock = threading.Lock()
+
+    def __iter__(self):
+        return self.records()
+
+    def run(self) -> dict:
+        """
+        Runs the pipeline until all posts are written
+
+        :return: dict
+                 see :Pipeline.stats
+        """
+        for _ in self.records():
+            pass
+        return self.stats
+
+    def records(self):
+        """
+        Runs the pipeline
+
+        Posts are yielded after they were written, not in the order of the listing. If the item info
+        of a post could not be fetched :ItemInfo.error is set and the post is written without comments
+        and tags. When the consumer stops early the stages stop after their current post.
+
+        :return: generator of (:Post, :ItemInfo) tuples
+        :raises the exception of a stage other than a failed items/info request
+        """
+        stop = threading.Event()
+        errors = []
+        queues = {stage: queue.Queue(maxsize=self.queue_size) for stage in STAGES[1:] + ("output",)}
+        with self.__lock:
+            self.__queues = queues
+            self.__started = time.perf_counter()
+            self.__finished = None
+
+        def put(target: queue.Queue, item) -> bool:
+            while not stop.is_set():
+                try:
+                    target.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def get(source: queue.Queue):
+            while not stop.is_set():
+                try:
+                    return source.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            return _DONE
+
+        functions = {"hydration": self.__hydrate, "parsing": self.__parse, "writing": self.__write}
+        targets = dict(zip(STAGES, STAGES[1:] + ("output",)))
+        running = {stage: self.workers[stage] for stage in STAGES}
+
+        def finish(stage: str):
+            with self.__lock:
+                running[stage] -= 1
+                last = running[stage] == 0
+            if last:
+                put(queues[targets[stage]], _DONE)
+
+        def lister():
+            pages = None
+            try:
+                pages = iter(self.__pages())
+                while not stop.is_set():
+                    start = time.perf_counter()
+                    posts = next(pages, None)
+                    if posts is None:
+                        break
+                    self.__count("listing", len(posts), time.perf_counter() - start)
+                    if self.checkpoint is not None:
+                        self.__open_page(posts)
+                    for post in posts:
+                        if not put(queues["hydration"], post):
+                            return
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                if pages is not None:
+                    pages.close()
+                finish("listing")
+
+        def worker(stage: str):
+            function = functions[stage]
+            try:
+                while True:
+                    item = get(queues[stage])
+                    if item is _DONE:
+                        # the other workers of the stage stop at the same marker
+                        put(queues[stage], _DONE)
+                        break
+                    start = time.perf_counter()
+                    result = function(*item) if isinstance(item, tuple) else function(item)
+                    self.__count(stage, 1, time.perf_counter() - start)
+                    if not put(queues[targets[stage]], result):
+                        break
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                finish(stage)
+
+        threads = [threading.Thread(target=lister, daemon=True)]
+        for stage in STAGES[1:]:
+            threads += [threading.Thread(target=worker, args=(stage,), daemon=True)
+                        for _ in range(self.workers[stage])]
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                record = get(queues["output"])
+                if record is _DONE:
+                    break
+                yield record
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            if self.checkpoint is not None:
+                self.__commit()
+            elif self.manager is not None:
+                self.manager.manual_command("commit")
+            with self.__lock:
+                self.__queues = {}
+                self.__finished = time.perf_counter()
+        if errors:
+            raise errors[0]
+
+    def __pages(self):
+        """
+        :return: iterable of :Posts
+        """
+        if self.listing > 1:
+            newest = None if self.item == -1 else int(self.item)
+            return Crawler(self.api, self.flag, self.promoted, self.user, newest=newest, workers=self.listing)
+
+        item = self.item
+        if self.checkpoint is not None:
+            cursor = self.checkpoint.resume(self.checkpoint_name, self.checkpoint_params)
+            if cursor is not None:
+                item = cursor
+            with self.__lock:
+                self.__pages_open.clear()
+                self.__page_of.clear()
+        # the checkpoint is stored by the pipeline, not when the iterator lists the next page
+        return self.api.get_items_iterator(item, self.flag, self.promoted, self.older, self.user, self.prefetch)
+
+    def __open_page(self, posts):
+        """
+        Remembers a listed page until all its posts are written
+
+        :param posts: :Posts
+        :return: None
+        """
+        key = "promoted" if self.promoted == 1 else "id"
+        page = [len(posts), posts.min(key) if self.older else posts.max(key)]
+        with self.__lock:
+            self.__pages_open.append(page)
+            for post in posts:
+                self.__page_of[post["id"]] = page
+
+    def __commit(self):
+        """
+        Commits the manager and stores the cursor after the last page whose posts and the posts of all
+        pages before it were written
+
+        :return: None
+        """
+        with self.__checkpoint_lock:
+            # the pages are taken before the commit, so all their inserts are committed by it
+            cursor = None
+            with self.__lock:
+                while self.__pages_open and self.__pages_open[0][0] == 0:
+                    cursor = self.__pages_open.popleft()[1]
+            if self.manager is not None:
+                self.manager.manual_command("commit", wait=True)
+            if cursor is not None:
+                self.checkpoint.commit(self.checkpoint_name, self.checkpoint_params, cursor)
+
+    def __hydrate(self, post) -> tuple:
+        try:
+            return post, self.api.get_item_info(post["id"], self.flag)
+        except Exception as e:
+            with self.__lock:
+                self.__errors += 1
+            return post, ItemInfo(post["id"], error=e)
+
+    @staticmethod
+    def __parse(post, info) -> tuple:
+        return post, info if isinstance(info, ItemInfo) else ItemInfo(post["id"], info)
+
+    def __write(self, post, info: ItemInfo) -> tuple:
+        commit = False
+        if self.manager is not None:
+            self.manager.insert(post, info.comments, info.comment_assignments, info.tags, info.tag_assignments)
+            with self.__lock:
+                self.__written += 1
+                commit = self.__written % self.commit_every == 0
+        if self.checkpoint is not None:
+            with self.__lock:
+                page = self.__page_of.pop(post["id"], None)
+                if page is not None:
+                    page[0] -= 1
+                    # without a manager a page is done when it passed the writing stage
+                    commit = commit or (self.manager is None and page[0] == 0)
+            if commit:
+                self.__commit()
+        elif commit:
+            self.manager.manual_command("commit")
+        return post, info
+
+    def __count(self, stage: str, items: int, seconds: float):
+        with self.__lock:
+            self.__counts[stage] += items
+            self.__busy[stage] += seconds
+
+    @property
+    def stats(self) -> dict:
+        """
+        For every stage (listing, hydration, parsing, writing):
+            items: posts that passed the stage
+            per_second: posts per second since the start (until the end) of the pipeline
+            busy: seconds the workers of the stage spent working, per worker
+            queued: posts waiting for the stage
+        errors: items/info requests that failed
+        """
+        with self.__lock:
+            elapsed = 0
+            if self.__started is not None:
+                elapsed = (self.__finished or time.perf_counter()) - self.__started
+            stats = {}
+            for stage in STAGES:
+                stats[stage] = {"items": self.__counts[stage],
+                                "per_second": self.__counts[stage] / elapsed if elapsed else 0.0,
+                                "busy": self.__busy[stage] / self.workers[stage],
+                                "queued": self.__queues[stage].qsize() if stage in self.__queues else 0}
+            stats["errors"] = self.__errors
+            return stats
@@ -0,0 +1,87 @@
+import inspect
+import queue
+import threading
+import weakref
+
+
+class Prefetcher:
+    def __init__(self, fetch, cursor, depth: int):
+        """
+        Fetches the pages of an iterator in a background thread
+
+        At most 'depth' pages are fetched ahead of the consumer (including the page that is being fetched).
+        The requests are made one after another by a single thread through the same :Api object,
+        so the rate limit of the api still applies.
+
+        If 'fetch' is a method, only a weak reference to its object is kept: the thread stops when the
+        iterator is closed or garbage collected, for example when a for loop over it ends early.
+
+        Parameters
+        ----------
+        :param fetch: function
+                      called with a cursor, returns (page, next cursor)
+                      the next cursor is None after the last page
+        :param cursor: first cursor
+        :param depth: int
+                      number of pages fetched in advance
+        """
+        if inspect.ismethod(fetch):
+            self.__fetch = weakref.WeakMethod(fetch)
+        else:
+            self.__fetch = lambda: fetch
+
+        self.__pages = queue.Queue()
+        self.__slots = threading.Semaphore(max(1, depth))
+        self.__stop = threading.Event()
+        self.__done = False
+        self.__thread = threading.Thread(target=self.__run, args=(cursor,), daemon=True)
+        self.__thread.start()
+
+    def __run(self, cursor):
+        while True:
+            # wait until the consumer took a page, checking regularly if it is still there
+            while not self.__slots.acquire(timeout=0.1):
+                if self.__stop.is_set() or self.__fetch() is None:
+                    return
+            fetch = self.__fetch()
+            if self.__stop.is_set() or fetch is None:
+                return
+
+            try:
+                page, cursor = fetch(cursor)
+            except Exception as e:
+                self.__pages.put((None, None, e))
+                return
+            finally:
+                del fetch
+
+            self.__pages.put((page, cursor, None))
+            if cursor is None:
+                return
+
+    def get(self) -> tuple:
+        """
+        Returns the next page, waiting for it if it was not fetched yet
+
+        :return: (page, next cursor)
+                 the next cursor is None after the last page
+        :raises StopIteration if the prefetcher was closed or the last page was already returned
+        :raises the exception of the request if fetching the page failed
+        """
+        if self.__done or self.__stop.is_set():
+            raise StopIteration
+        page, cursor, error = self.__pages.get()
+        self.__slots.release()
+        if error is not None or cursor is None:
+            self.__done = True
+        if error is not None:
+            raise error
+        return page, cursor
+
+    def close(self):
+        """
+        Stops fetching pages, a request that is already running is finished in the background
+
+        :return: None
+        """
+        self.__stop.set()
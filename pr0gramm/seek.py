@@ -0,0 +1,259 @@
+import bisect
+import threading
+
+from pr0gramm.api import Api, _parse_response
+
+
+class Seeker:
+    def __init__(self, api: Api, flag: int or str = 1, promoted: int = 0, user: str = None):
+        """
+        Finds the post id (or promoted id) that belongs to a timestamp
+
+        items/get only accepts an id as cursor, so a crawl that should start at a date needs the id of
+        the first post of that date. The seeker probes items/get with 'older' cursors and narrows the id
+        range by interpolating between the probed (id, created) pairs, falling back to bisection when an
+        interpolation does not halve the range. A seek takes O(log n) requests instead of paging from
+        the newest post.
+
+        Every post of every probed page is kept in an index, together with the id ranges in which all
+        posts are known. Later seeks start with the index and often need no request at all.
+
+        The created timestamps have to grow with the ids, which is the case for the ids of pr0gramm.
+
+        The promoted ids of /top follow the time of the promotion and not the time of the upload, so the
+        created timestamps only roughly grow with them. With promoted=1 the id of the oldest post created
+        at or after the timestamp is seeked first; a post was created before the timestamp if its id is
+        lower. Then the promoted ids are bisected for the lowest cursor after which the next page of /top
+        has no such post, the result is the first promoted id of that page. This assumes that the order
+        of the promotions differs from the order of the uploads by less than one page (120 posts). The
+        pages of /top are not kept in the index.
+
+        Example:
+            seeker = Seeker(api, flag=31)
+            for posts in api.get_items_iterator(item=seeker.seek(1514764800), flag=31):
+                ... # posts created before 2018-01-01
+
+        Parameters
+        ----------
+        :param api: :Api
+        :param flag: int or str
+                     see api.md for details
+        :param promoted: int (0 or 1)
+                         if set to 1 the promoted ids of /top are searched, see above
+        :param user: str
+                     only search the uploads of this user
+        """
+        self.api = api
+        self.flag = flag
+        self.promoted = promoted
+        self.user = user
+
+        self.__lock = threading.Lock()
+        self.__keys = []
+        self.__created = []
+        # merged [start, end) id ranges in which every post is in the index
+        self.__covered = []
+        self.__probes = 0
+        self.__seeks = 0
+
+    def seek(self, created: int) -> int or None:
+        """
+        :param created: int
+                        unix timestamp
+        :return: int or None
+                 id of the oldest post created at or after 'created', None if all posts are older; passed
+                 as 'item' to get_items_iterator it returns the posts created before 'created'. With
+                 promoted=1 the promoted id above which no post was created before 'created', passed as
+                 'item' to get_items_iterator with promoted=1 it returns the promoted posts created before
+                 'created' and the few that were created after it but promoted earlier
+        """
+        with self.__lock:
+            self.__seeks += 1
+            if self.promoted == 1:
+                return self.__seek_promoted(created)
+            return self.__seek(created)
+
+    def __seek_promoted(self, created: int) -> int or None:
+        """
+        :param created: int
+        :return: int or None
+                 see :Seeker.seek
+        """
+        boundary = self.__seek(created)
+        if boundary is None:
+            return None
+
+        def clean(page) -> bool:
+            return all(post["id"] >= boundary for post in page)
+
+        newest = self.__probe_promoted(None)
+        if not newest or not clean(newest):
+            return None
+
+        # the page after upper has no post created before 'created', the one after lower has
+        lower, upper, page = -1, newest.min("promoted") - 1, newest
+        while upper - lower > 1:
+            middle = (lower + upper) // 2
+            probed = self.__probe_promoted(middle)
+            if clean(probed):
+                upper, page = middle, probed
+            else:
+                lower = middle
+        return page.min("promoted") if page else None
+
+    def __probe_promoted(self, cursor: int or None):
+        """
+        Requests the page of /top after a promoted id
+
+        :param cursor: int or None
+                       None for the newest page
+        :return: :Posts
+        """
+        self.__probes += 1
+        return _parse_response(self.api.get_items(cursor, self.flag, 1, False if cursor is not None else None,
+                                                  self.user), self.api.posts_class)
+
+    def __seek(self, created: int) -> int or None:
+        """
+        :param created: int
+        :return: int or None
+                 see :Seeker.seek
+        """
+        if not self.__keys:
+            self.__probe(None)
+            if not self.__keys:
+                return None
+
+        bisection = False
+        while True:
+            index = bisect.bisect_left(self.__created, created)
+            if index == len(self.__keys):
+                # the newest page is always probed first, there is no newer post
+                return None
+            upper = self.__keys[index]
+            if index == 0:
+                if self.__is_covered(1, upper):
+                    return upper
+                # the oldest page gives the lower end for the interpolation
+                self.__probe(0, older=False)
+                continue
+
+            lower = self.__keys[index - 1]
+            if self.__is_covered(lower + 1, upper):
+                return upper
+
+            if bisection:
+                estimate = (lower + upper) // 2
+            else:
+                lower_created = self.__created[index - 1]
+                estimate = lower + int((created - lower_created) / (self.__created[index] - lower_created) *
+                                       (upper - lower))
+            cursor = self.__uncovered(min(max(estimate, lower + 1), upper - 1), lower, upper) + 1
+            self.__probe(cursor)
+
+            index = bisect.bisect_left(self.__created, created)
+            width = self.__keys[min(index, len(self.__keys) - 1)] - self.__keys[max(index - 1, 0)]
+            bisection = width > (upper - lower) // 2
+
+    def __probe(self, cursor: int or None, older: bool = True):
+        """
+        Requests one page and adds its posts to the index
+
+        :param cursor: int or None
+                       None for the newest page
+        :param older: bool
+        :return: None
+        """
+        self.__probes += 1
+        posts = _parse_response(self.api.get_items(cursor, self.flag, 0,
+                                                   older if cursor is not None else None, self.user),
+                                self.api.posts_class)
+        for post in posts:
+            key = post["id"]
+            index = bisect.bisect_left(self.__keys, key)
+            if index == len(self.__keys) or self.__keys[index] != key:
+                self.__keys.insert(index, key)
+                self.__created.insert(index, post["created"])
+
+        keys = [post["id"] for post in posts]
+        if cursor is None:
+            self.__cover(min(keys, default=0), float("inf"))
+        elif older:
+            self.__cover(min(keys, default=0), cursor)
+        else:
+            self.__cover(cursor + 1, max(keys) + 1 if keys else float("inf"))
+
+    def __cover(self, start: int, end: int or float):
+        """
+        Marks [start, end) as a range in which every post is known
+
+        :param start: int
+        :param end: int or float
+        :return: None
+        """
+        index = bisect.bisect_left(self.__covered, [start, start])
+        if index > 0 and self.__covered[index - 1][1] >= start:
+            index -= 1
+            start = self.__covered[index][0]
+        last = index
+        while last < len(self.__covered) and self.__covered[last][0] <= end:
+            end = max(end, self.__covered[last][1])
+            last += 1
+        self.__covered[index:last] = [[start, end]]
+
+    def __covering(self, key: int) -> list or None:
+        """
+        :param key: int
+        :return: list or None
+                 the covered range [start, end) that contains key
+        """
+        index = bisect.bisect_right(self.__covered, [key, float("inf")]) - 1
+        if index >= 0 and self.__covered[index][1] > key:
+            return self.__covered[index]
+        return None
+
+    def __is_covered(self, start: int, end: int) -> bool:
+        """
+        :return: bool
+                 True if all posts in [start, end) are known
+        """
+        if start >= end:
+            return True
+        covering = self.__covering(start)
+        return covering is not None and covering[1] >= end
+
+    def __uncovered(self, key: int, lower: int, upper: int) -> int:
+        """
+        Moves key out of a covered range, so the next probe adds at least one unknown id to the index
+
+        :param key: int
+        :param lower: int
+        :param upper: int
+                      the range (lower, upper) contains an id that is not covered
+        :return: int
+        """
+        covering = self.__covering(key)
+        if covering is None:
+            return key
+        if covering[1] < upper:
+            return covering[1]
+        return covering[0] - 1
+
+    @property
+    def index(self) -> list:
+        """
+        :return: list of (id, created) tuples
+                 all posts of the probed pages, sorted by id
+        """
+        with self.__lock:
+            return list(zip(self.__keys, self.__created))
+
+    @property
+    def stats(self) -> dict:
+        """
+        seeks: calls of seek
+        probes: requests to items/get
+        indexed: posts in the index
+        """
+        with self.__lock:
+            return {"seeks": self.__seeks, "probes": self.__probes, "indexed": len(self.__keys)}
@@ -0,0 +1,604 @@
+"""
+Offline stand-in for the pr0gramm api
+
+Serves a generated synthetic dataset over http, so tests and benchmarks can run without network access.
+Start it from python:
+
+    with Simulator(posts=10000, latency=0.01) as simulator:
+        api = Api(no_login=True, base_url=simulator.base_url)
+
+or from the command line:
+
+    python3 -m pr0gramm.simulator --port 8000 --posts 100000
+"""
+import argparse
+import bisect
+import heapq
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import parse
+
+from pr0gramm import codec
+
+TAGS = ["schmuserkadser", "sfc", "kadse", "blus", "repost", "text", "meme", "video", "gif", "hund",
+        "natur", "auto", "essen", "politik", "wissen", "spiel", "musik", "sport", "kunst", "oc", "arbeit", "wetter",
+        "geschichte", "technik", "computer", "programmieren", "deutschland", "fail", "win", "comic", "film"]
+
+USERS = ["itssme", "froschler", "cha0s", "Doryani", "JoWo", "virtuel", "kadsenfreund", "blussmann", "pr0gramm",
+         "schmuser"]
+
+FLAGS = [1] * 70 + [8] * 10 + [2] * 12 + [4] * 5 + [16] * 3
+
+PAGE_SIZE = 120
+COMMENTS_PAGE_SIZE = 50
+
+# 1x1 transparent png
+CAPTCHA = "data:image/png;base64," \
+          "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+
+
+class Dataset:
+    def __init__(self, posts: int = 10000, users: int = 50, seed: int = 0, start_created: int = 1600000000):
+        """
+        Synthetic posts, tags, comments, users and messages
+
+        The dataset only depends on the parameters, so two datasets created with the same parameters are equal.
+
+        Parameters
+        ----------
+        :param posts: int
+                      number of posts
+        :param users: int
+                      number of users, the first users are always the names in USERS
+        :param seed: int
+                     seed of the random generator
+        :param start_created: int
+                              'created' timestamp of the first post
+        """
+        rand = random.Random(seed)
+
+        self.users = []
+        for i in range(max(users, 1)):
+            name = USERS[i] if i < len(USERS) else "user%d" % i
+            self.users.append({"id": 315478 + i, "name": name, "registered": start_created - rand.randint(0, 10 ** 8),
+                               "score": rand.randint(0, 100000), "mark": rand.randint(0, 10), "admin": 0,
+                               "banned": 0, "bannedUntil": None})
+        self.users_by_name = {user["name"].lower(): user for user in self.users}
+
+        self.posts = []
+        self.tags = {}
+        self.comments = {}
+        self.user_posts = {user["name"]: [] for user in self.users}
+        self.user_comments = {user["name"]: [] for user in self.users}
+
+        self.__rand = rand
+        # upload changes the posts while requests are answered
+        self.__lock = threading.RLock()
+        self.__post_id = 0
+        self.__promoted_id = 0
+        # (due, id, post) of the posts that will be promoted once the dataset has 'due' posts
+        self.__pending = []
+        # separate generator, so the posts only differ from older versions in their promoted ids
+        self.__promote_rand = random.Random(seed + 1)
+        self.__tag_id = 0
+        self.__comment_id = 0
+        self.__created = start_created
+        self.promoted_posts = []
+        self.__promoted_ids = []
+        for _ in range(posts):
+            self.__generate_post()
+
+        self.__ids = [post["id"] for post in self.posts]
+
+        for comments in self.user_comments.values():
+            comments.sort(key=lambda c: c["created"])
+
+        self.collections = {}
+        for user in self.users:
+            user_rand = random.Random(seed * 1000003 + user["id"])
+            self.collections[user["name"]] = sorted(user_rand.sample(self.posts, min(len(self.posts), 200)),
+                                                    key=lambda p: p["id"])
+
+        self.messages = []
+        for i in range(30):
+            sender = rand.choice(self.users)
+            self.messages.append({"id": i + 1, "created": start_created + i * 3600, "name": sender["name"],
+                                  "mark": sender["mark"], "senderId": sender["id"], "message": "Nachricht %d" % i,
+                                  "type": "message", "read": 1, "thumb": None, "itemId": 0, "score": 0})
+
+    def __generate_post(self) -> dict:
+        """
+        Creates the next post with its tags and comments
+
+        :return: dict
+        """
+        rand = self.__rand
+        self.__post_id += 1 + (rand.randint(1, 3) if rand.random() < 0.05 else 0)  # gaps of deleted posts
+        self.__created += int(rand.expovariate(1 / 60)) + 1
+        post_id = self.__post_id
+        created = self.__created
+        user = rand.choice(self.users)
+        promote = rand.random() < 0.15
+
+        day = time.strftime("%Y/%m/%d/", time.gmtime(created))
+        name = "%016x" % rand.getrandbits(64)
+        video = rand.random() < 0.2
+        post = {"id": post_id, "promoted": 0, "up": rand.randint(0, 2000), "down": rand.randint(0, 300),
+                "created": created, "image": day + name + (".mp4" if video else ".jpg"),
+                "thumb": day + name + ".jpg", "fullsize": day + name + ".png" if rand.random() < 0.3 else "",
+                "width": rand.randint(100, 2000), "height": rand.randint(100, 2000),
+                "audio": video and rand.random() < 0.5, "source": "", "flags": rand.choice(FLAGS),
+                "user": user["name"], "mark": user["mark"], "userId": user["id"], "gift": 0}
+        self.posts.append(post)
+        self.user_posts[user["name"]].append(post)
+        if promote:
+            # posts are promoted some time after their upload, so the promoted ids are not in the order of the ids
+            due = len(self.posts) + self.__promote_rand.randint(0, 300)
+            heapq.heappush(self.__pending, (due, post_id, post))
+        self.__promote()
+
+        names = set(rand.sample(TAGS[2:], rand.randint(1, 6)))
+        if rand.random() < 0.15:
+            names.add("schmuserkadser")
+        if rand.random() < 0.1:
+            names.add("sfc")
+        tags = []
+        for tag in sorted(names):
+            self.__tag_id += 1
+            tags.append({"id": self.__tag_id, "confidence": round(rand.uniform(0.1, 0.9), 6), "tag": tag})
+        self.tags[post_id] = tags
+
+        comments = []
+        comment_created = created
+        for _ in range(rand.randint(0, 8)):
+            self.__comment_id += 1
+            comment_id = self.__comment_id
+            comment_created += int(rand.expovariate(1 / 600)) + 1
+            author = rand.choice(self.users)
+            comment = {"id": comment_id, "parent": rand.choice([0] + [c["id"] for c in comments]),
+                       "content": "Kommentar %d" % comment_id, "created": comment_created,
+                       "up": rand.randint(0, 200), "down": rand.randint(0, 20),
+                       "confidence": round(rand.uniform(0.1, 0.9), 6), "name": author["name"],
+                       "mark": author["mark"]}
+            comments.append(comment)
+            self.user_comments[author["name"]].append(
+                {"id": comment_id, "up": comment["up"], "down": comment["down"], "content": comment["content"],
+                 "created": comment_created, "itemId": post_id, "thumb": post["thumb"]})
+        self.comments[post_id] = comments
+        return post
+
+    def __promote(self):
+        """
+        Gives the next promoted ids to the pending posts that are due
+
+        :return: None
+        """
+        while self.__pending and self.__pending[0][0] <= len(self.posts):
+            post = heapq.heappop(self.__pending)[2]
+            self.__promoted_id += 1
+            post["promoted"] = self.__promoted_id
+            self.promoted_posts.append(post)
+            self.__promoted_ids.append(post["promoted"])
+
+    def upload(self, count: int = 1) -> list:
+        """
+        Adds new posts after the newest post, as if they were uploaded while the simulator is running
+
+        :param count: int
+                      number of posts
+        :return: list of dict
+                 the new posts
+        """
+        with self.__lock:
+            return self.__upload(count)
+
+    def __upload(self, count: int) -> list:
+        posts = [self.__generate_post() for _ in range(count)]
+        for post in posts:
+            self.__ids.append(post["id"])
+        for comments in self.user_comments.values():
+            comments.sort(key=lambda c: c["created"])
+        return posts
+
+    def get_post(self, post_id: int) -> dict or None:
+        with self.__lock:
+            return self.__get_post(post_id)
+
+    def __get_post(self, post_id: int) -> dict or None:
+        index = bisect.bisect_left(self.__ids, post_id)
+        if index < len(self.__ids) and self.__ids[index] == post_id:
+            return self.posts[index]
+        return None
+
+    def get_items(self, params: dict) -> dict:
+        """
+        Answers an items/get request
+
+        :param params: dict
+                       url parameters, every value is a str
+        :return: dict
+        """
+        with self.__lock:
+            return self.__get_items(params)
+
+    def __get_items(self, params: dict) -> dict:
+        flags = _to_int(params.get("flags"), 1)
+        promoted = _to_int(params.get("promoted"), 0) == 1
+        tags = [tag for tag in params.get("tags", "").lower().replace("+", " ").split() if tag]
+        user = params.get("user")
+
+        key = "promoted" if promoted else "id"
+        if user is not None and params.get("collection"):
+            posts = self.collections.get(user, [])
+            keys = [post["id"] for post in posts]
+        elif user is not None:
+            posts = [post for post in self.user_posts.get(user, []) if post["promoted"] or not promoted]
+            if promoted:
+                posts.sort(key=lambda post: post["promoted"])
+            keys = [post[key] for post in posts]
+        elif promoted:
+            posts = self.promoted_posts
+            keys = self.__promoted_ids
+        else:
+            posts = self.posts
+            keys = self.__ids
+
+        def matches(post):
+            if not post["flags"] & flags or (promoted and not post["promoted"]):
+                return False
+            if tags:
+                post_tags = [tag["tag"] for tag in self.tags[post["id"]]]
+                return all(tag in post_tags for tag in tags)
+            return True
+
+        older = _to_int(params.get("older"))
+        newer = _to_int(params.get("newer"))
+        around = _to_int(params.get("id"))
+
+        items = []
+        if older is not None:
+            index = bisect.bisect_left(keys, older) - 1
+            while index >= 0 and len(items) <= PAGE_SIZE:
+                if matches(posts[index]):
+                    items.append(posts[index])
+                index -= 1
+            at_end = len(items) <= PAGE_SIZE
+            at_start = False
+        elif newer is not None or around is not None:
+            if newer is not None:
+                index = bisect.bisect_right(keys, newer)
+            else:
+                index = bisect.bisect_left(keys, around)
+            while index < len(posts) and len(items) <= PAGE_SIZE:
+                if matches(posts[index]):
+                    items.append(posts[index])
+                index += 1
+            at_start = len(items) <= PAGE_SIZE
+            at_end = False
+            items = items[:PAGE_SIZE]
+            items.reverse()
+        else:
+            index = len(posts) - 1
+            while index >= 0 and len(items) <= PAGE_SIZE:
+                if matches(posts[index]):
+                    items.append(posts[index])
+                index -= 1
+            at_end = len(items) <= PAGE_SIZE
+            at_start = True
+
+        return {"atEnd": at_end, "atStart": at_start, "error": None, "items": items[:PAGE_SIZE]}
+
+    def get_item_info(self, params: dict) -> dict or None:
+        item = _to_int(params.get("itemId"))
+        if item not in self.tags:
+            return None
+        return {"tags": self.tags[item], "comments": self.comments[item]}
+
+    def get_user(self, params: dict) -> dict or None:
+        user = self.users_by_name.get(params.get("name", params.get("user", "")).lower())
+        if user is None:
+            return None
+        comments = self.user_comments[user["name"]]
+        uploads = self.user_posts[user["name"]]
+        return {"user": user, "comments": list(reversed(comments[-10:])), "commentCount": len(comments),
+                "comments_likes": [], "commentLikesCount": 0,
+                "uploads": [{"id": post["id"], "thumb": post["thumb"]} for post in reversed(uploads[-10:])],
+                "uploadCount": len(uploads), "likesArePublic": True, "likes": [],
+                "likeCount": len(self.collections[user["name"]]), "tagCount": len(uploads) * 3, "badges": [],
+                "followCount": 0, "following": False}
+
+    def get_user_comments(self, params: dict) -> dict or None:
+        with self.__lock:
+            return self.__get_user_comments(params)
+
+    def __get_user_comments(self, params: dict) -> dict or None:
+        user = self.users_by_name.get(params.get("name", "").lower())
+        if user is None:
+            return None
+        comments = self.user_comments[user["name"]]
+        created = [comment["created"] for comment in comments]
+
+        before = _to_int(params.get("before"))
+        after = _to_int(params.get("after"))
+        if after is not None:
+            index = bisect.bisect_right(created, after)
+            page = comments[index:index + COMMENTS_PAGE_SIZE]
+            has_older, has_newer = index > 0, index + COMMENTS_PAGE_SIZE < len(comments)
+        else:
+            end = bisect.bisect_left(created, before) if before is not None else len(comments)
+            page = list(reversed(comments[max(0, end - COMMENTS_PAGE_SIZE):end]))
+            has_older, has_newer = end > COMMENTS_PAGE_SIZE, end < len(comments)
+
+        return {"comments": page, "hasOlder": has_older, "hasNewer": has_newer,
+                "user": {"id": user["id"], "name": user["name"], "mark": user["mark"]}}
+
+    def get_inbox(self, params: dict) -> dict:
+        older = _to_int(params.get("older"))
+        messages = [message for message in reversed(self.messages) if older is None or message["created"] < older]
+        return {"messages": messages[:COMMENTS_PAGE_SIZE], "atEnd": len(messages) <= COMMENTS_PAGE_SIZE}
+
+    def get_messages_with_user(self, params: dict) -> dict:
+        other = params.get("with", "")
+        older = _to_int(params.get("older"))
+        messages = []
+        for message in reversed(self.messages):
+            if message["name"] == other and (older is None or message["id"] < older):
+                messages.append({"id": message["id"], "created": message["created"], "name": other, "sent": 0,
+                                 "message": message["message"], "mark": message["mark"]})
+        return {"messages": messages, "with": {"name": other}, "atEnd": True}
+
+
+def _to_int(value, default=None):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.server.simulator.handle(self, "GET")
+
+    def do_POST(self):
+        self.server.simulator.handle(self, "POST")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Simulator:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, dataset: Dataset = None,
+                 latency: float or tuple = 0.0, error_rate: float = 0.0, too_many_requests_rate: float = 0.0,
+                 retry_after: float = 0.1, rate_limit: float = None, stall_rate: float = 0.0, stall: float = 1.0,
+                 seed: int = 0, **dataset_kwargs):
+        """
+        Local http server answering like the pr0gramm api
+
+        Implements items/get (older, newer, id, promoted, tags, user, collection), items/info, profile/info,
+        profile/comments, inbox/all, inbox/messages, user/captcha, user/login and the vote and tag endpoints.
+
+        Parameters
+        ----------
+        :param host: str
+        :param port: int
+                     0 picks a free port, see :Simulator.base_url
+        :param dataset: :Dataset
+                        if None a :Dataset is created with 'seed' and 'dataset_kwargs'
+        :param latency: float or (float, float)
+                        seconds every response is delayed, or a range for a random delay
+        :param error_rate: float
+                           fraction of requests answered with 500
+        :param too_many_requests_rate: float
+                                       fraction of requests answered with 429 and a Retry-After header
+        :param retry_after: float
+                            value of the Retry-After header
+        :param rate_limit: float
+                           requests per second the server accepts, additional requests are answered with 429
+                           None for no limit
+        :param stall_rate: float
+                           fraction of requests delayed by an additional 'stall' seconds (tail latency)
+        :param stall: float
+        :param seed: int
+                     seed for the dataset and the injected errors
+        """
+        self.dataset = dataset if dataset is not None else Dataset(seed=seed, **dataset_kwargs)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.too_many_requests_rate = too_many_requests_rate
+        self.retry_after = retry_after
+        self.rate_limit = rate_limit
+        self.stall_rate = stall_rate
+        self.stall = stall
+
+        self.requests = Counter()
+        self.__lock = threading.Lock()
+        self.__random = random.Random(seed)
+        self.__allowance = rate_limit or 0.0
+        self.__last = time.monotonic()
+        self.__sessions = {}
+
+        self.__server = ThreadingHTTPServer((host, port), _Handler)
+        self.__server.daemon_threads = True
+        self.__server.simulator = self
+        self.__thread = None
+
+    @property
+    def base_url(self) -> str:
+        """
+        Pass this as base_url to :Api
+        """
+        host, port = self.__server.server_address[:2]
+        return "http://%s:%d/" % (host, port)
+
+    def start(self):
+        """
+        Starts serving in a background thread
+
+        :return: self
+        """
+        self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops the server
+
+        :return: None
+        """
+        self.__server.shutdown()
+        self.__server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def __rate_limited(self) -> float:
+        """
+        :return: float
+                 0 if the request is allowed, else seconds until the next request is allowed
+        """
+        now = time.monotonic()
+        self.__allowance = min(self.rate_limit, self.__allowance + (now - self.__last) * self.rate_limit)
+        self.__last = now
+        if self.__allowance < 1:
+            return (1 - self.__allowance) / self.rate_limit
+        self.__allowance -= 1
+        return 0.0
+
+    def handle(self, handler: BaseHTTPRequestHandler, method: str):
+        url = parse.urlsplit(handler.path)
+        endpoint = url.path.strip("/")
+        if endpoint.startswith("api/"):
+            endpoint = endpoint[4:]
+        params = {key: values[0] for key, values in parse.parse_qs(url.query).items()}
+        if method == "POST":
+            length = int(handler.headers.get("Content-Length", 0))
+            body = handler.rfile.read(length).decode("utf-8")
+            params.update({key: values[0] for key, values in parse.parse_qs(body).items()})
+
+        with self.__lock:
+            self.requests[endpoint] += 1
+            chance = self.__random.random()
+            stalled = self.__random.random() < self.stall_rate
+            wait = self.__rate_limited() if self.rate_limit else 0.0
+
+        latency = self.latency
+        if isinstance(latency, (tuple, list)):
+            with self.__lock:
+                latency = self.__random.uniform(*latency)
+        if stalled:
+            latency += self.stall
+        if latency:
+            time.sleep(latency)
+
+        if wait:
+            return self.__send(handler, 429, {"error": "tooManyRequests"}, {"Retry-After": "%.3f" % wait})
+        if chance < self.too_many_requests_rate:
+            return self.__send(handler, 429, {"error": "tooManyRequests"}, {"Retry-After": str(self.retry_after)})
+        if chance < self.too_many_requests_rate + self.error_rate:
+            return self.__send(handler, 500, {"error": "simulated"})
+
+        user = self.__logged_in_user(handler)
+        headers = {}
+        status = 200
+        if method == "GET" and endpoint == "items/get":
+            response = self.dataset.get_items(params)
+        elif method == "GET" and endpoint == "items/info":
+            response = self.dataset.get_item_info(params)
+        elif method == "GET" and endpoint == "profile/info":
+            response = self.dataset.get_user(params)
+        elif method == "GET" and endpoint == "profile/comments":
+            response = self.dataset.get_user_comments(params)
+        elif endpoint in ("inbox/all", "inbox/messages", "items/ratelimited", "items/vote", "comments/vote",
+                          "tags/vote", "tags/add", "items/delete") and user is None:
+            response, status = {"error": "forbidden", "code": 403}, 403
+        elif method == "GET" and endpoint == "inbox/all":
+            response = self.dataset.get_inbox(params)
+        elif method == "GET" and endpoint == "inbox/messages":
+            response = self.dataset.get_messages_with_user(params)
+        elif method == "GET" and endpoint == "items/ratelimited":
+            response = {"left": 12}
+        elif method == "GET" and endpoint == "user/captcha":
+            response = {"token": "%032x" % random.getrandbits(128), "captcha": CAPTCHA}
+        elif method == "POST" and endpoint == "user/login":
+            session = "%032x" % random.getrandbits(128)
+            with self.__lock:
+                self.__sessions[session] = params.get("name", "")
+            me = parse.quote(codec.dumps({"n": params.get("name", ""), "id": session}))
+            response = {"success": True, "identifier": session}
+            headers["Set-Cookie"] = "me=%s; Path=/" % me
+        elif method == "POST" and endpoint in ("items/vote", "comments/vote", "tags/vote", "tags/add",
+                                               "items/delete"):
+            response = {}
+        else:
+            response = None
+
+        if response is None:
+            response, status = {"error": "notFound", "code": 404}, 404
+        response.update({"ts": int(time.time()), "cache": None, "rt": 1, "qc": 1})
+        self.__send(handler, status, response, headers)
+
+    def __logged_in_user(self, handler: BaseHTTPRequestHandler) -> str or None:
+        for cookie in handler.headers.get_all("Cookie", []):
+            for part in cookie.split(";"):
+                name, _, value = part.strip().partition("=")
+                if name == "me":
+                    try:
+                        session = codec.loads(parse.unquote(value))["id"]
+                    except (ValueError, KeyError, TypeError):
+                        return None
+                    with self.__lock:
+                        return self.__sessions.get(session)
+        return None
+
+    @staticmethod
+    def __send(handler: BaseHTTPRequestHandler, status: int, response: dict, headers: dict = None):
+        body = codec.dumps_bytes(response)
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline stand-in for the pr0gramm api")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--posts", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--too-many-requests-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--stall", type=float, default=1.0)
+    args = parser.parse_args()
+
+    simulator = Simulator(args.host, args.port, latency=args.latency, error_rate=args.error_rate,
+                          too_many_requests_rate=args.too_many_requests_rate, rate_limit=args.rate_limit,
+                          stall_rate=args.stall_rate, stall=args.stall, seed=args.seed, posts=args.posts,
+                          users=args.users)
+    print("serving pr0gramm api simulator on %sapi/" % simulator.base_url)
+    try:
+        simulator.start()
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        simulator.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    def __init__(self):
+        """
+        Coalesces identical calls that run at the same time
+
+        While a call for a key is running, other threads calling with the same key wait for it
+        and receive the same result (or exception) instead of running the call again.
+        """
+        self.__lock = threading.Lock()
+        self.__calls = {}
+        self.__coalesced = 0
+
+    def do(self, key, func):
+        """
+        Runs func or waits for the call with the same key that is already running
+
+        :param key: hashable
+                    identifies the call, for example the url and params of a request
+        :param func: function without arguments
+        :return: result of func
+        """
+        with self.__lock:
+            future = self.__calls.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self.__calls[key] = future
+            else:
+                self.__coalesced += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.__lock:
+                del self.__calls[key]
+
+    @property
+    def coalesced(self) -> int:
+        """
+        Number of calls that were answered by a call which was already running
+        """
+        with self.__lock:
+            return self.__coalesced
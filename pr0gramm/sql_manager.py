@@ -79,29 +79,29 @@ class Manager(threading.Thread):
             self.sql_connection.commit()
 
     def insert(self, *args):
+        # subclasses (IndexedPosts, LazyPosts) and the compact records are inserted like their base types
         for i in range(0, len(args)):
-            type = args[i].__class__.__name__
-            if type == 'Post':
+            if isinstance(args[i], (Post, CompactPost)):
                 self.insert_post(args[i])
-            elif type == 'Posts':
+            elif isinstance(args[i], Posts):
                 self.insert_posts(args[i])
-            elif type == 'User':
+            elif isinstance(args[i], User):
                 self.insert_user(args[i])
-            elif type == 'Comment':
+            elif isinstance(args[i], (Comment, CompactComment)):
                 self.insert_comment(args[i])
-            elif type == "Comments":
+            elif isinstance(args[i], Comments):
                 self.insert_comments(args[i])
-            elif type == 'Tag':
+            elif isinstance(args[i], (Tag, CompactTag)):
                 self.insert_tag(args[i])
-            elif type == "Tags":
+            elif isinstance(args[i], Tags):
                 self.insert_tags(args[i])
-            elif type == 'CommentAssignment':
+            elif isinstance(args[i], CommentAssignment):
                 self.insert_comment_assignment(args[i])
-            elif type == 'CommentAssignments':
+            elif isinstance(args[i], CommentAssignments):
                 self.insert_comment_assignments(args[i])
-            elif type == "TagAssignment":
+            elif isinstance(args[i], TagAssignment):
                 self.insert_tag_assignment(args[i])
-            elif type == "TagAssignments":
+            elif isinstance(args[i], TagAssignments):
                 self.insert_tag_assignments(args[i])
             else:
                 raise LookupError
@@ -161,6 +161,31 @@ class Manager(threading.Thread):
         for tag_assignment in tag_assignments:
             self.insert_tag_assignment(tag_assignment)
 
+    def get_max_post_id(self, promoted: bool = False) -> int or None:
+        """
+        Waits until all queued statements are executed and returns the highest stored post id
+
+        :param promoted: bool
+                         if set to True the highest promoted id is returned
+        :return: int or None
+                 None if there are no posts in the database
+        """
+        column = "promoted" if promoted else "id"
+        return self.manual_command("select max(%s) from posts" % column, wait=True)[0][0]
+
+    def get_stored_post_ids(self, ids: list) -> set:
+        """
+        Waits until all queued statements are executed and returns the ids that are stored
+
+        :param ids: list of int
+        :return: set of int
+                 the ids of 'ids' that are in the posts table
+        """
+        if not ids:
+            return set()
+        statement = "select id from posts where id in (" + ",".join("?" * len(ids)) + ")"
+        return {row[0] for row in self.manual_command(statement, list(ids), wait=True)}
+
     def manual_command(self, statement, values=[], wait=False):
         token = uuid.uuid4() if wait else None
         self.sql_queue.put((statement, values, token))
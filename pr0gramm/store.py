@@ -0,0 +1,263 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class PostDelta:
+    def __init__(self, id: int, old_up: int, old_down: int, up: int, down: int, first_seen: float,
+                 last_seen: float, fields: tuple = ()):
+        """
+        Change of a post between two points in time
+
+        Parameters
+        ----------
+        :param id: int
+                   id of the post
+        :param old_up: int
+        :param old_down: int
+                         votes at the start of the change
+        :param up: int
+        :param down: int
+                     votes at the end of the change
+        :param first_seen: float
+                           time the post was stored first
+        :param last_seen: float
+                          time the post was seen last
+        :param fields: tuple of str
+                       keys of the fields that changed
+        """
+        self.id = id
+        self.old_up = old_up
+        self.old_down = old_down
+        self.up = up
+        self.down = down
+        self.first_seen = first_seen
+        self.last_seen = last_seen
+        self.fields = fields
+
+    @property
+    def points(self) -> int:
+        """
+        :return: int
+                 change of up - down
+        """
+        return (self.up - self.down) - (self.old_up - self.old_down)
+
+    def __repr__(self):
+        return "PostDelta(id=%d, up=%d->%d, down=%d->%d)" % (self.id, self.old_up, self.up, self.old_down, self.down)
+
+
+class _Entry:
+    __slots__ = ("post", "first_seen", "last_seen", "first_up", "first_down")
+
+    def __init__(self, post, seen: float):
+        self.post = post
+        self.first_seen = seen
+        self.last_seen = seen
+        self.first_up = post.get("up", 0)
+        self.first_down = post.get("down", 0)
+
+
+class PostStore:
+    def __init__(self, max_posts: int = None, on_evict=None):
+        """
+        In memory store of posts keyed by id
+
+        Adding a post whose id is already stored (upsert) writes only the fields that changed into the
+        stored post and returns a :PostDelta with the old and new votes, so repeated crawls of the same
+        range are merged in O(1) per post instead of appending duplicates. For every post the votes of the
+        first crawl and the times it was first and last seen are kept, see :PostStore.delta. The post
+        object of the first crawl is stored without a copy and changed in place by later upserts.
+
+        If more than 'max_posts' posts are stored the posts that were not seen for the longest time are
+        evicted, on_evict is called with the evicted post and its :PostDelta, for example to write it to
+        a database.
+
+        Example:
+            store = PostStore(max_posts=500000)
+            for posts in api.get_items_iterator(flag=31):
+                for delta in store.upsert_many(posts):
+                    ...
+            rising = sorted(store.deltas(), key=lambda delta: delta.points, reverse=True)
+
+        Parameters
+        ----------
+        :param max_posts: int
+                          Maximum number of stored posts, None for no limit
+        :param on_evict: function
+                         Called with (post, :PostDelta) of every evicted post
+        """
+        self.max_posts = max_posts
+        self.on_evict = on_evict
+
+        self.__lock = threading.Lock()
+        # least recently seen first
+        self.__entries = OrderedDict()
+        self.__inserts = 0
+        self.__updates = 0
+        self.__changes = 0
+        self.__evictions = 0
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.__entries)
+
+    def __contains__(self, item: int):
+        with self.__lock:
+            return item in self.__entries
+
+    def __iter__(self):
+        with self.__lock:
+            posts = [entry.post for entry in self.__entries.values()]
+        return iter(posts)
+
+    def upsert(self, post, seen: float = None) -> PostDelta or None:
+        """
+        Stores a post or updates the stored post with the same id
+
+        :param post: :Post, :CompactPost or dict
+        :param seen: float
+                     time the post was fetched, now if None
+        :return: :PostDelta or None
+                 the change to the stored version, None if the post is new or did not change
+        """
+        seen = time.time() if seen is None else seen
+        evicted = []
+        with self.__lock:
+            delta = self.__upsert(post, seen, evicted)
+        self.__evicted(evicted)
+        return delta
+
+    def upsert_many(self, posts, seen: float = None) -> list:
+        """
+        Stores multiple posts, for example a page of get_items_iterator
+
+        :param posts: iterable of :Post, :CompactPost or dicts
+        :param seen: float
+                     time the posts were fetched, now if None
+        :return: list of :PostDelta
+                 the changes of the posts that were already stored and changed
+        """
+        seen = time.time() if seen is None else seen
+        deltas = []
+        evicted = []
+        with self.__lock:
+            for post in posts:
+                delta = self.__upsert(post, seen, evicted)
+                if delta is not None:
+                    deltas.append(delta)
+        self.__evicted(evicted)
+        return deltas
+
+    def __upsert(self, post, seen: float, evicted: list) -> PostDelta or None:
+        entry = self.__entries.get(post["id"])
+        if entry is None:
+            self.__inserts += 1
+            self.__entries[post["id"]] = _Entry(post, seen)
+            while self.max_posts is not None and len(self.__entries) > self.max_posts:
+                _, cold = self.__entries.popitem(last=False)
+                self.__evictions += 1
+                evicted.append(cold)
+            return None
+
+        self.__updates += 1
+        self.__entries.move_to_end(post["id"])
+        entry.last_seen = max(entry.last_seen, seen)
+        stored = entry.post
+        old_up, old_down = stored.get("up", 0), stored.get("down", 0)
+        fields = tuple(key for key, value in post.items() if stored.get(key, _MISSING) != value)
+        if not fields:
+            return None
+
+        self.__changes += 1
+        for key in fields:
+            stored[key] = post[key]
+        return PostDelta(post["id"], old_up, old_down, stored.get("up", 0), stored.get("down", 0),
+                         entry.first_seen, entry.last_seen, fields)
+
+    def __evicted(self, entries: list):
+        """
+        Calls on_evict outside of the lock, so it can use the store
+
+        :param entries: list of :_Entry
+        :return: None
+        """
+        if self.on_evict is not None:
+            for entry in entries:
+                self.on_evict(entry.post, self.__delta(entry))
+
+    @staticmethod
+    def __delta(entry: _Entry) -> PostDelta:
+        up, down = entry.post.get("up", 0), entry.post.get("down", 0)
+        fields = tuple(key for key, first in (("up", entry.first_up), ("down", entry.first_down))
+                       if entry.post.get(key, 0) != first)
+        return PostDelta(entry.post["id"], entry.first_up, entry.first_down, up, down, entry.first_seen,
+                         entry.last_seen, fields)
+
+    def get(self, item: int, default=None):
+        """
+        :param item: int
+                     id of the post
+        :param default: returned if the post is not stored
+        :return: the stored post
+        """
+        with self.__lock:
+            entry = self.__entries.get(item)
+            return default if entry is None else entry.post
+
+    def delta(self, item: int) -> PostDelta or None:
+        """
+        :param item: int
+                     id of the post
+        :return: :PostDelta or None
+                 change of the votes since the post was first stored, None if the post is not stored
+        """
+        with self.__lock:
+            entry = self.__entries.get(item)
+            return None if entry is None else self.__delta(entry)
+
+    def deltas(self, changed_only: bool = True):
+        """
+        :param changed_only: bool
+                             If set to False the posts whose votes did not change are returned as well
+        :return: list of :PostDelta
+                 changes of the votes since the posts were first stored, least recently seen first
+        """
+        with self.__lock:
+            deltas = [self.__delta(entry) for entry in self.__entries.values()]
+        return [delta for delta in deltas if delta.fields or not changed_only]
+
+    def evict(self, seen_before: float) -> int:
+        """
+        Evicts all posts that were last seen before a time, on_evict is called for every post
+
+        :param seen_before: float
+        :return: int
+                 number of evicted posts
+        """
+        evicted = []
+        with self.__lock:
+            while self.__entries:
+                entry = next(iter(self.__entries.values()))
+                if entry.last_seen >= seen_before:
+                    break
+                self.__entries.popitem(last=False)
+                self.__evictions += 1
+                evicted.append(entry)
+        self.__evicted(evicted)
+        return len(evicted)
+
+    @property
+    def stats(self) -> dict:
+        """
+        posts: stored posts
+        inserts: posts that were stored for the first time
+        updates: posts that were stored again
+        changes: updates that changed at least one field
+        evictions: evicted posts
+        """
+        with self.__lock:
+            return {"posts": len(self.__entries), "inserts": self.__inserts, "updates": self.__updates,
+                    "changes": self.__changes, "evictions": self.__evictions}
@@ -0,0 +1,59 @@
+from pr0gramm.api import Api
+from pr0gramm.sql_manager import Manager
+
+
+def sync_posts(api: Api, manager: Manager, flag: int or str = 1, promoted: int = 0, user: str = None,
+               prefetch: int = 0) -> dict:
+    """
+    Fetches the posts that are newer than the newest post in the database of a :Manager and inserts them
+
+    The crawl starts at the highest stored post id (or promoted id) and pages to newer posts until the
+    newest post is reached, so the number of requests depends on the number of new posts only. Every page
+    is inserted and committed as soon as it arrives, an interrupted sync continues where it stopped the
+    next time. An empty database is filled starting at the oldest post. Posts whose id is already stored
+    (for example by a sync without promoted) are not inserted again, with promoted=1 their promoted id is
+    updated instead.
+
+    Example:
+        manager = Manager("pr0gramm.db")
+        sync_posts(api, manager, flag=31)
+
+    Parameters
+    ----------
+    :param api: :Api
+    :param manager: :Manager
+    :param flag: int or str
+                 see api.md for details
+    :param promoted: int (0 or 1)
+                     if set to 1 only promoted posts are synced, starting at the highest stored promoted id
+    :param user: str
+                 only sync the uploads of this user
+    :param prefetch: int
+                     number of pages fetched in the background while a page is inserted
+    :return: dict
+             start: id (or promoted id) the sync started after
+             newest: highest id (or promoted id) in the database after the sync
+             pages: pages with new posts
+             posts: inserted posts
+             updated: posts that were already stored and got their promoted id
+    """
+    start = manager.get_max_post_id(promoted == 1) or 0
+    stats = {"start": start, "newest": start, "pages": 0, "posts": 0, "updated": 0}
+
+    for posts in api.get_items_iterator(item=start, flag=flag, promoted=promoted, older=False, user=user,
+                                        prefetch=prefetch):
+        stored = manager.get_stored_post_ids([post["id"] for post in posts])
+        new = [post for post in posts if post["id"] not in stored]
+        manager.insert_posts(new)
+        if promoted == 1:
+            for post in posts:
+                if post["id"] in stored:
+                    manager.manual_command("update posts set promoted = ? where id = ?", [post["promoted"], post["id"]])
+            stats["updated"] += len(stored)
+        manager.manual_command("commit")
+        stats["pages"] += 1
+        stats["posts"] += len(new)
+
+    # the statements are executed in order, so this waits until all posts are written
+    stats["newest"] = manager.get_max_post_id(promoted == 1) or 0
+    return stats
@@ -0,0 +1,188 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Thread safe token bucket
+
+        Parameters
+        ----------
+        :param rate: float
+                     Tokens added per second
+        :param burst: int
+                      Maximum number of tokens that can be saved up
+        """
+        self.rate = float(rate)
+        self.burst = max(1, burst)
+        self.__tokens = float(self.burst)
+        self.__last = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Takes one token, sleeping until it is available
+
+        :return: float
+                 seconds waited for the token
+        """
+        with self.__lock:
+            now = time.monotonic()
+            self.__tokens = min(self.burst, self.__tokens + (now - self.__last) * self.rate)
+            self.__last = now
+            # the token is reserved right away, so waiting threads are served in order
+            self.__tokens -= 1
+            wait = -self.__tokens / self.rate if self.__tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class RetryPolicy:
+    def __init__(self, max_retries: int = 5, backoff_factor: float = 0.5, max_backoff: float = 60.0,
+                 status_codes: tuple = (429, 503), retry_errors: bool = True):
+        """
+        Decides if and when a request is retried
+
+        Parameters
+        ----------
+        :param max_retries: int
+                            How often a request is retried
+        :param backoff_factor: float
+                               Base of the exponential backoff in seconds
+        :param max_backoff: float
+                            Maximum time in seconds to wait before a retry
+        :param status_codes: tuple
+                             Status codes of responses that are retried, for example (429, 500, 502, 503, 504)
+        :param retry_errors: bool
+                             If set to True get requests are also retried after connection errors and timeouts
+                             Post requests are never retried after errors, they might have reached the server
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.status_codes = tuple(status_codes)
+        self.retry_errors = retry_errors
+
+    def delay(self, attempt: int, retry_after: str = None) -> float:
+        """
+        Jittered exponential backoff, never shorter than the 'Retry-After' of the server
+
+        :param attempt: int
+                        number of the retry, starting at 0
+        :param retry_after: str
+                            value of the Retry-After header, if the server sent one
+        :return: float
+                 seconds to wait before the retry
+        """
+        delay = random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+        server_delay = Throttle.parse_retry_after(retry_after)
+        if server_delay is not None:
+            # never retry before the server allows it
+            delay = max(min(self.max_backoff, server_delay), delay)
+        return delay
+
+
+class Throttle:
+    def __init__(self, requests_per_second: float = None, burst: int = 1, max_retries: int = 5,
+                 backoff_factor: float = 0.5, max_backoff: float = 60.0):
+        """
+        Rate limit and backoff for requests of an :Api object
+
+        Parameters
+        ----------
+        :param requests_per_second: float or None
+                                    Requests per second allowed by the token bucket
+                                    None disables the token bucket
+        :param burst: int
+                      Number of requests that can be made at once after being idle
+        :param max_retries: int
+                            How often a request is retried after a 429 or 503 response
+        :param backoff_factor: float
+                               Base of the exponential backoff in seconds
+        :param max_backoff: float
+                            Maximum time in seconds to wait before a retry
+        """
+        self.bucket = TokenBucket(requests_per_second, burst) if requests_per_second else None
+        self.retry_policy = RetryPolicy(max_retries, backoff_factor, max_backoff)
+
+        self.__lock = threading.Lock()
+        self.__requests = 0
+        self.__retries = 0
+        self.__throttled_time = 0.0
+        self.__backoff_time = 0.0
+
+    def wait(self):
+        """
+        Waits until the next request can be made
+
+        :return: None
+        """
+        waited = self.bucket.acquire() if self.bucket is not None else 0.0
+        with self.__lock:
+            self.__requests += 1
+            self.__throttled_time += waited
+
+    @property
+    def max_retries(self) -> int:
+        return self.retry_policy.max_retries
+
+    def backoff(self, attempt: int, retry_after: str = None, policy: RetryPolicy = None) -> float:
+        """
+        Sleeps before retrying a request
+
+        :param attempt: int
+                        number of the retry, starting at 0
+        :param retry_after: str
+                            value of the Retry-After header, if the server sent one
+        :param policy: :RetryPolicy
+                       policy of the endpoint, self.retry_policy if None
+        :return: float
+                 seconds slept
+        """
+        delay = (policy or self.retry_policy).delay(attempt, retry_after)
+
+        with self.__lock:
+            self.__retries += 1
+            self.__backoff_time += delay
+
+        time.sleep(delay)
+        return delay
+
+    @staticmethod
+    def parse_retry_after(retry_after: str) -> float or None:
+        """
+        Parses a Retry-After header which can either be seconds or a http date
+
+        :param retry_after: str
+        :return: float or None
+                 seconds to wait, None if the header is missing or invalid
+        """
+        if not retry_after:
+            return None
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError, IndexError):
+            return None
+
+    @property
+    def stats(self) -> dict:
+        """
+        Counters of the throttle
+
+        requests: requests that passed the token bucket (including retries)
+        retries: requests that were retried (after a retried status code, a connection error or a timeout)
+        throttled_time: seconds spent waiting for the token bucket
+        backoff_time: seconds spent waiting before retries
+        """
+        with self.__lock:
+            return {"requests": self.__requests, "retries": self.__retries,
+                    "throttled_time": self.__throttled_time, "backoff_time": self.__backoff_time}
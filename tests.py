@@ -1,10 +1,20 @@
 # coding=utf-8
+import asyncio
+import copy
+import json
+import threading
 import time
 import unittest
+
+import requests
 from os import remove
 from pr0gramm import *
+from pr0gramm import codec
 from time import sleep
+from pr0gramm.simulator import PAGE_SIZE, Dataset, Simulator
 from pr0gramm.sql_manager import Manager
+from pr0gramm.pipeline import Pipeline
+from pr0gramm.sync import sync_posts
 from pr0gramm.api_exceptions import NotLoggedInException
 
 
@@ -12,6 +22,16 @@ class Pr0grammApiTests(unittest.TestCase):
     login = False
     USERNAME = ''
     PASSWORD = ''
+    # set ONLINE to run the tests against pr0gramm.com instead of the offline simulator
+    ONLINE = os.environ.get('ONLINE', False)
+    BASE_URL = "https://pr0gramm.com/"
+    simulator = None
+
+    @classmethod
+    def setUpClass(cls):
+        if not cls.ONLINE:
+            cls.simulator = Simulator().start()
+            cls.BASE_URL = cls.simulator.base_url
 
     def setUp(self):
         """
@@ -179,10 +199,12 @@ class Pr0grammApiTests(unittest.TestCase):
         self.test_posts = Posts(json_str=posts)
         self.test_post = self.test_posts[0]
 
-        self.api = Api(self.USERNAME, self.PASSWORD, "./")
+        self.api = Api(self.USERNAME, self.PASSWORD, "./", requests_per_second=5, burst=5, base_url=self.BASE_URL)
 
     @classmethod
     def tearDownClass(cls):
+        if cls.simulator is not None:
+            cls.simulator.stop()
         try:
             remove("./%s.json" % cls.USERNAME)
             remove("./pr0gramm.db")
@@ -193,7 +215,7 @@ class Pr0grammApiTests(unittest.TestCase):
             pass
 
     def test_getUrl(self):
-        api = Api("", "", "./doesNotExist")
+        api = Api("", "", "./doesNotExist", base_url=self.BASE_URL)
         assert api.get_items("2504967")
 
     def test_login1(self):
@@ -209,7 +231,7 @@ class Pr0grammApiTests(unittest.TestCase):
     def test_login2(self):
         if not self.login:
             return
-        api = Api("", "", "./temp")
+        api = Api("", "", "./temp", base_url=self.BASE_URL)
         try:
             api.get_inbox()
             assert False
@@ -224,7 +246,7 @@ class Pr0grammApiTests(unittest.TestCase):
         except FileNotFoundError:
             pass
         # Login anon
-        api = Api("", "", no_login=True)
+        api = Api("", "", no_login=True, base_url=self.BASE_URL)
         img, token = api.get_captcha("tmp.png")
         webbrowser.open(img)
         captcha = input("?: ")
@@ -240,14 +262,14 @@ class Pr0grammApiTests(unittest.TestCase):
             remove("anonymous.json")
         except FileNotFoundError:
             pass
-        api = Api(self.USERNAME, self.PASSWORD, no_login=True)
+        api = Api(self.USERNAME, self.PASSWORD, no_login=True, base_url=self.BASE_URL)
         img, token = api.get_captcha("tmp.png")
         webbrowser.open(img)
         captcha = input("?: ")
         # Login normally
         assert api.login(token=token, captcha_content=captcha)
         # Login only with cookie
-        api = Api(self.USERNAME, "", no_login=True)
+        api = Api(self.USERNAME, "", no_login=True, base_url=self.BASE_URL)
         assert api.login(cookie_only=True)
         try:
             remove("%s.json" % self.USERNAME)
@@ -263,7 +285,7 @@ class Pr0grammApiTests(unittest.TestCase):
         assert json.loads(msg)["messages"] == []
 
     def test_get_items1(self):
-        api = Api(tmp_dir="./doesNotExist")
+        api = Api(tmp_dir="./doesNotExist", base_url=self.BASE_URL)
         json_str = api.get_items(2525097, older=None)
         posts_obj = Posts(json_str)
         for elem in posts_obj:
@@ -376,7 +398,6 @@ class Pr0grammApiTests(unittest.TestCase):
         assert len(response_parsed["items"]) > 0
 
         for i in range(0, 10):
-            sleep(0.2)  # avoid 503 errors
             post_info = self.api.get_item_info(posts[i]["id"])
             post_info = json.loads(post_info)
 
@@ -400,7 +421,6 @@ class Pr0grammApiTests(unittest.TestCase):
         posts = Posts(self.api.get_items(id))
 
         for i in range(0, 5):
-            sleep(0.2)  # avoid 503 errors
             posts.extend(Posts(self.api.get_items(id)))
             id = posts.minId()
 
@@ -416,11 +436,721 @@ class Pr0grammApiTests(unittest.TestCase):
         for posts in self.api:
             all_posts.extend(posts)
             counter += 1
-            sleep(0.2)  # avoid 503 errors
             if counter >= 5:
                 break
         assert len(all_posts) > 0
 
+    def test_session_pool(self):
+        api = Api(no_login=True, pool_connections=2, pool_maxsize=4, keep_alive=False)
+        adapter = api.session.get_adapter(api.api_url)
+        assert adapter is api.session.get_adapter("http://localhost/")
+        assert adapter._pool_connections == 2
+        assert adapter._pool_maxsize == 4
+        assert api.session.headers["Connection"] == "close"
+
+    def test_async_api_concurrency(self):
+        class SlowApi:
+            running = 0
+            max_running = 0
+            lock = threading.Lock()
+
+            def get_item_info(self, item, flag=1):
+                with self.lock:
+                    SlowApi.running += 1
+                    SlowApi.max_running = max(SlowApi.max_running, SlowApi.running)
+                sleep(0.01)
+                with self.lock:
+                    SlowApi.running -= 1
+                return '{"tags": [], "comments": []}'
+
+        async def fetch_all(async_api):
+            return await asyncio.gather(*[async_api.get_item_info(i) for i in range(20)])
+
+        async_api = AsyncApi(api=SlowApi(), concurrency=3)
+        results = asyncio.run(fetch_all(async_api))
+        # nothing is bound to the first event loop
+        results += asyncio.run(fetch_all(async_api))
+        async_api.close()
+        assert len(results) == 40
+        assert SlowApi.max_running == 3
+        assert AsyncApi.calculate_flag(sfw=True, nsfw=True) == 3
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(rate=50, burst=2)
+        start = time.monotonic()
+        waited = sum(bucket.acquire() for _ in range(12))
+        elapsed = time.monotonic() - start
+        assert elapsed >= 0.18
+        assert waited >= 0.18
+
+    def test_throttle_retry_after(self):
+        assert Throttle.parse_retry_after("3") == 3.0
+        assert Throttle.parse_retry_after(None) is None
+        assert Throttle.parse_retry_after("soon") is None
+        assert Throttle.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+        throttle = Throttle(max_retries=2, backoff_factor=0.01)
+        throttle.backoff(0, "0")
+        throttle.wait()
+        assert throttle.stats["retries"] == 1
+        assert throttle.stats["requests"] == 1
+        assert throttle.stats["throttled_time"] == 0
+
+    def test_memory_cache(self):
+        cache = MemoryCache(max_entries=2, max_bytes=1024)
+        key1 = Cache.make_key("items/info", {"itemId": 1, "flags": 1})
+        assert key1 == Cache.make_key("items/info", {"flags": 1, "itemId": 1})
+        cache.set(key1, b"1", 60)
+        cache.set("2", b"2", 60)
+        assert cache.get(key1) == b"1"
+        cache.set("3", b"3", 60)  # evicts "2", key1 was used more recently
+        assert cache.get("2") is None
+        cache.set("4", b"4", -1)
+        assert cache.get("4") is None
+        cache.invalidate(key=key1)
+        assert cache.get(key1) is None
+        assert cache.stats["hits"] == 1
+        assert cache.stats["misses"] == 3
+        assert cache.stats["evictions"] == 2
+
+        cache.set("big", b"x" * 1020, 60)
+        assert cache.stats["entries"] == 1
+
+    def test_sqlite_cache(self):
+        cache = SqliteCache("pr0gramm_cache.db", max_entries=2)
+        try:
+            cache.set("a", b"1", 60)
+            cache.set("b", b"2", 60)
+            cache.set("c", b"3", 60)
+            assert cache.stats["entries"] == 2
+            assert cache.get("c") == b"3"
+            cache.invalidate(prefix="c")
+            assert cache.get("c") is None
+            cache.invalidate()
+            assert cache.stats["entries"] == 0
+        finally:
+            cache.close()
+            os.remove("pr0gramm_cache.db")
+
+    def test_api_cache(self):
+        api = Api(no_login=True, cache="memory", cache_ttl={"items/info": 60})
+        key = Cache.make_key(api.item_info_url, {"itemId": 1, "flags": 1})
+        api.cache.set(key, b'{"tags": [], "comments": []}', 60)
+        assert api.get_item_info(1) == '{"tags": [], "comments": []}'
+        api.invalidate_cache("items/info", {"itemId": 1, "flags": 1})
+        assert api.cache.stats["entries"] == 0
+
+        # new uploads must show up on the newest page
+        with Simulator(posts=200) as simulator:
+            api = Api(no_login=True, base_url=simulator.base_url, cache="memory")
+            newest = api.get_newest_image(flag=31)
+            simulator.dataset.upload(1)
+            assert api.get_newest_image(flag=31) != newest
+
+    def test_single_flight(self):
+        single_flight = SingleFlight()
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def fetch():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return b"response"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(single_flight.do("key", fetch)))]
+        threads[0].start()
+        started.wait(5)
+        for _ in range(4):
+            thread = threading.Thread(target=lambda: results.append(single_flight.do("key", fetch)))
+            thread.start()
+            threads.append(thread)
+        while single_flight.coalesced < 4:
+            sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == [b"response"] * 5
+        assert single_flight.do("key", lambda: b"new") == b"new"
+
+    def test_item_info(self):
+        info = ItemInfo(2525097, json_obj={"comments": [dict(self.test_comment)], "tags": [dict(self.test_tag)]})
+        assert info.error is None
+        assert info.comments[0]["id"] == 25767939
+        assert info.comments[0].comment_assignment is info.comment_assignments[0]
+        assert info.comment_assignments[0].post == 2525097
+        assert info.comment_assignments[0].comment == 25767939
+        assert info.tags[0]["tag"] == "schmuserkadser"
+        assert info.tag_assignments[0].post == 2525097
+        assert info.tag_assignments[0].id == 22802916
+
+    def test_get_item_info_many(self):
+        class FakeApi(Api):
+            def get_item_info(self, item, flag=1):
+                if item == 3:
+                    raise NotLoggedInException()
+                sleep(0.001 * (item % 10))
+                return json.dumps({"comments": [{"id": item * 10}], "tags": []})
+
+        api = FakeApi(no_login=True)
+        infos = list(api.get_item_info_many(self.test_posts + [1, 2, 3, 4, 5], workers=2))
+        assert [info.post for info in infos] == [2525097, 2546035, 1, 2, 3, 4, 5]
+        assert isinstance(infos[4].error, NotLoggedInException)
+        assert infos[2].comments[0]["id"] == 10
+        assert all(info.error is None for info in infos if info.post != 3)
+
+        infos = list(api.get_item_info_many(range(1, 10), workers=4, ordered=False))
+        assert sorted(info.post for info in infos) == list(range(1, 10))
+
+    def test_simulator_iterator(self):
+        with Simulator(posts=1000) as simulator:
+            api = Api(no_login=True, base_url=simulator.base_url)
+            all_posts = Posts()
+            for posts in api.get_items_iterator(flag=31):
+                all_posts.extend(posts)
+
+            # the iterator starts with the posts older than the newest one
+            assert [post["id"] for post in all_posts] == [post["id"] for post in simulator.dataset.posts[-2::-1]]
+
+    def test_simulator_errors(self):
+        with Simulator(posts=200, too_many_requests_rate=0.5, retry_after=0.001) as simulator:
+            api = Api(no_login=True, base_url=simulator.base_url, max_retries=20, backoff_factor=0.001)
+            for i in range(5):
+                assert Posts(api.get_items(100 + i))
+            assert api.throttle.stats["retries"] > 0
+            assert simulator.requests["items/get"] == api.throttle.stats["requests"]
+
+        with Simulator(posts=200, error_rate=1) as simulator:
+            api = Api(no_login=True, base_url=simulator.base_url)
+            assert json.loads(api.get_items(100))["error"] == "simulated"
+
+    def test_parsed_mode(self):
+        with Simulator(posts=500) as simulator:
+            api = Api(no_login=True, parsed=True, base_url=simulator.base_url)
+            newest = api.get_newest_image()
+            assert isinstance(newest, Post)
+            assert newest["id"] == simulator.dataset.posts[-1]["id"]
+
+            posts = api.get_items(newest["id"])
+            assert isinstance(posts, Posts)
+            assert posts.maxId() < newest["id"]
+            assert posts.json["atStart"] is False
+
+            info = api.get_item_info(newest["id"])
+            assert isinstance(info, ItemInfo)
+            assert [tag["id"] for tag in info.tags] == [tag["id"] for tag in simulator.dataset.tags[newest["id"]]]
+
+            assert api.get_user_info("itssme")["name"] == "itssme"
+            assert isinstance(api.get_user_comments("itssme"), Comments)
+            assert len(list(api.get_items_iterator())) > 0
+
+            api.parsed = False
+            assert Post(api.get_newest_image()) == newest
+
+    def test_codecs(self):
+        for name, json_codec in codec.CODECS.items():
+            data = json_codec.dumps_bytes(self.test_post)
+            assert json_codec.loads(data) == self.test_post
+            assert json_codec.dumps(self.test_post) == json.dumps(self.test_post)
+
+        previous = codec.get_codec()
+        try:
+            for name in codec.CODECS:
+                codec.set_codec(name)
+                # the str api is unchanged by the backend
+                assert Post(json_obj={"id": 1, "tags": "\u00e4"}).to_json() == '{"id": 1, "tags": "\\u00e4"}'
+            codec.set_codec("json")
+            assert Post(self.test_post.to_json_bytes()) == self.test_post
+            assert Posts(json.dumps({"items": [self.test_post]}).encode("utf-8"))[0] == self.test_post
+        finally:
+            codec.set_codec(previous)
+
+    def test_timeouts_and_retries(self):
+        histogram = LatencyHistogram()
+        for i in range(1, 101):
+            histogram.record(i / 1000)
+        assert 0.045 < histogram.percentile(50) < 0.055
+        assert 0.09 < histogram.percentile(95) < 0.1
+        assert histogram.percentile(100) == 0.1
+
+        with Simulator(posts=200, latency=0.3) as simulator:
+            api = Api(no_login=True, base_url=simulator.base_url, timeout=0.05,
+                      retry_policies={"items/get": RetryPolicy(max_retries=2, backoff_factor=0.001)})
+            start = time.monotonic()
+            with self.assertRaises(requests.Timeout):
+                api.get_items(100)
+            assert time.monotonic() - start < 0.3
+            assert api.throttle.stats["retries"] == 2
+
+            api.timeouts["items/get"] = 1
+            assert Posts(api.get_items(100))
+
+        with Simulator(posts=200, error_rate=0.5) as simulator:
+            policy = RetryPolicy(max_retries=20, backoff_factor=0.001, status_codes=(500,))
+            api = Api(no_login=True, base_url=simulator.base_url, retry_policies={"items/get": policy})
+            for i in range(5):
+                assert Posts(api.get_items(100 + i))
+            assert api.latency["items/get"].count == simulator.requests["items/get"]
+
+    def test_hedged_requests(self):
+        def pool_threads():
+            return sum(thread.name.startswith("ThreadPoolExecutor") for thread in threading.enumerate())
+
+        with Simulator(posts=200, latency=0.005, stall_rate=0.05, stall=2) as simulator:
+            threads = pool_threads()
+            with Api(no_login=True, base_url=simulator.base_url, hedge=True, hedge_min_samples=10) as api:
+                slowest = 0
+                for i in range(60):
+                    start = time.monotonic()
+                    assert Posts(api.get_items(100 + i))
+                    if i >= 10:
+                        slowest = max(slowest, time.monotonic() - start)
+                assert pool_threads() > threads
+
+            assert api.hedge_stats["hedged"] > 0
+            assert api.hedge_stats["won"] > 0
+            assert slowest < 1
+            # the thread pool of the hedged requests is shut down with the session
+            assert pool_threads() == threads
+
+    def test_request_hooks(self):
+        with Simulator(posts=200) as simulator:
+            api = Api(no_login=True, base_url=simulator.base_url, cache="memory", cache_ttl={"items/get": 60})
+            # the connections are only timed while hooks are registered
+            assert not isinstance(api.session.get_adapter(api.items_url), TimingAdapter)
+            events = []
+            api.add_hook(events.append)
+            assert isinstance(api.session.get_adapter(api.items_url), TimingAdapter)
+
+            api.get_items(100)
+            api.get_items(100)
+            api.get_item_info(100)
+
+            first, cached, info = events
+            assert (first.method, first.endpoint, first.status) == ("GET", "items/get", 200)
+            assert first.params["older"] == 100
+            assert first.bytes > 0 and not first.cache_hit
+            assert first.dns is not None and first.connect is not None
+            assert 0 <= first.wait <= first.total
+            assert cached.cache_hit and cached.bytes == first.bytes
+            assert info.endpoint == "items/info" and info.connect is None  # the connection was reused
+
+            stats = api.latency_stats
+            assert stats["items/get"]["count"] == 1
+            assert stats["items/info"]["p50"] <= stats["items/info"]["p99"]
+
+            api.remove_hook(events.append)
+            api.add_hook(lambda event: 1 / 0)
+            with self.assertWarns(UserWarning):
+                api.get_items(101)
+            assert len(events) == 3
+
+        api = Api(no_login=True, base_url=simulator.base_url, retry_policies={"items/get": RetryPolicy(0)})
+        events = []
+        api.add_hook(events.append)
+        with self.assertRaises(requests.ConnectionError):
+            api.get_items(100)
+        assert events[0].status is None and isinstance(events[0].error, requests.ConnectionError)
+
+    def test_prefetch_iterator(self):
+        with Simulator(posts=1000, latency=0.03) as simulator:
+            api = Api(no_login=True, base_url=simulator.base_url)
+            start = time.monotonic()
+            expected = []
+            for posts in api.get_items_iterator(item=900, flag=31):
+                expected.extend(post["id"] for post in posts)
+                sleep(0.03)
+            sequential = time.monotonic() - start
+
+            start = time.monotonic()
+            ids = []
+            for posts in api.get_items_iterator(item=900, flag=31, prefetch=2):
+                ids.extend(post["id"] for post in posts)
+                sleep(0.03)
+            assert ids == expected
+            assert time.monotonic() - start < sequential * 0.8
+
+            user = simulator.dataset.users[0]["name"]
+            comments = [comment["id"] for page in api.get_user_comments_iterator(user, flag=31, prefetch=3)
+                        for comment in page]
+            assert len(comments) == len(simulator.dataset.user_comments[user])
+            assert comments == [comment["id"] for page in api.get_user_comments_iterator(user, flag=31)
+                                for comment in page]
+
+            # stopping early cancels the prefetching
+            requests_before = simulator.requests["items/get"]
+            for i, posts in enumerate(api.get_items_iterator(item=900, flag=31, prefetch=3)):
+                if i == 1:
+                    break
+            sleep(0.3)
+            assert simulator.requests["items/get"] - requests_before <= 2 + 3
+
+    def test_crawler(self):
+        with Simulator(posts=2000) as simulator:
+            api = Api(no_login=True, base_url=simulator.base_url)
+            crawler = Crawler(api, flag=31, workers=4)
+            ids = [post["id"] for posts in crawler for post in posts]
+            assert sorted(ids, reverse=True) == [post["id"] for post in reversed(simulator.dataset.posts)]
+            assert crawler.stats["shards"] == 16
+            assert crawler.stats["posts"] == len(ids)
+
+            lazy_api = Api(no_login=True, base_url=simulator.base_url, lazy=True)
+            promoted = [post["promoted"] for posts in Crawler(lazy_api, flag=31, promoted=1, workers=3, shards=5)
+                        for post in posts]
+            assert sorted(promoted) == sorted(post["promoted"] for post in simulator.dataset.posts
+                                              if post["promoted"])
+
+            first_id = simulator.dataset.posts[0]["id"]
+            ids = [post["id"] for posts in Crawler(api, flag=31, newest=first_id + 1000, oldest=first_id + 500)
+                   for post in posts]
+            assert sorted(ids) == [post["id"] for post in simulator.dataset.posts
+                                   if first_id + 500 <= post["id"] < first_id + 1000]
+
+    def test_checkpoints(self):
+        with Simulator(posts=1000) as simulator:
+            api = Api(no_login=True, base_url=simulator.base_url)
+            pages = list(api.get_items_iterator(flag=31))
+            expected = [post["id"] for posts in pages for post in posts]
+            user = simulator.dataset.users[0]["name"]
+            comment_pages = list(api.get_user_comments_iterator(user, flag=31))
+
+            for checkpoint in (FileCheckpoint("pr0gramm_checkpoint.json"), SqliteCheckpoint("pr0gramm_checkpoint.db")):
+                try:
+                    ids = []
+                    for i, posts in enumerate(api.get_items_iterator(flag=31, checkpoint=checkpoint)):
+                        if i == 2:
+                            break  # the crawl dies while the third page is processed
+                        ids.extend(post["id"] for post in posts)
+
+                    requests_before = simulator.requests["items/get"]
+                    resumed = api.get_items_iterator(flag=31, checkpoint=checkpoint)
+                    ids.extend(post["id"] for posts in resumed for post in posts)
+                    assert ids == expected
+                    # the processed pages are not fetched again
+                    assert simulator.requests["items/get"] - requests_before == len(pages) - 2 + 1
+                    assert list(api.get_items_iterator(flag=31, checkpoint=checkpoint)) == []
+
+                    with self.assertRaises(ValueError):
+                        iter(api.get_items_iterator(flag=1, checkpoint=checkpoint,
+                                                    checkpoint_name=resumed.checkpoint_name))
+
+                    comments = iter(api.get_user_comments_iterator(user, flag=31, checkpoint=checkpoint))
+                    assert next(comments) == comment_pages[0]
+                    next(comments)
+                    comments = iter(api.get_user_comments_iterator(user, flag=31, checkpoint=checkpoint))
+                    assert next(comments) == comment_pages[1]
+                finally:
+                    if isinstance(checkpoint, SqliteCheckpoint):
+                        checkpoint.close()
+                    remove(checkpoint.file_name)
+
+    def test_streams(self):
+        with Simulator(posts=1000) as simulator:
+            api = Api(no_login=True, base_url=simulator.base_url)
+            posts = simulator.dataset.posts
+
+            stream = list(api.get_posts_stream(flag=31, limit=130))
+            assert [post["id"] for post in stream] == [post["id"] for post in posts[-2:-132:-1]]
+            assert isinstance(stream[0], Post)
+            # the newest post and two pages
+            assert simulator.requests["items/get"] == 1 + 2
+
+            # until_created is reached on the second page, the third page is never requested
+            until = posts[-200]["created"]
+            stream = list(api.get_posts_stream(flag=31, until_created=until))
+            assert [post["id"] for post in stream] == [post["id"] for post in posts[-2:-201:-1]]
+            assert simulator.requests["items/get"] == 3 + 1 + 2
+
+            stream = list(api.get_posts_stream(item=posts[100]["id"], flag=31, older=False, until_id=posts[400]["id"],
+                                               predicate=lambda post: post["up"] > post["down"]))
+            # like on pr0gramm the posts of a page are sorted from new to old in both directions
+            assert sorted(post["id"] for post in stream) == [post["id"] for post in posts[101:401]
+                                                             if post["up"] > post["down"]]
+            assert simulator.requests["items/get"] == 6 + 3
+
+            user = simulator.dataset.users[0]["name"]
+            comments = simulator.dataset.user_comments[user]
+            stream = list(api.get_user_comments_stream(user, flag=31, until_created=comments[-40]["created"]))
+            assert [comment["id"] for comment in stream] == [comment["id"] for comment in comments[-1:-41:-1]]
+            # the first page already reaches until_created
+            assert simulator.requests["profile/comments"] == 1
+
+    def test_seek(self):
+        with Simulator(posts=20000) as simulator:
+            api = Api(no_login=True, base_url=simulator.base_url, lazy=True)
+            posts = [post for post in simulator.dataset.posts if post["flags"] & 31]
+            seeker = Seeker(api, flag=31)
+
+            for post in (posts[5000], posts[0], posts[12345], posts[-1]):
+                assert seeker.seek(post["created"]) == post["id"]
+                assert seeker.seek(post["created"] - 1) == post["id"]
+            assert seeker.seek(posts[-1]["created"] + 1) is None
+            assert seeker.seek(0) == posts[0]["id"]
+
+            # paging from the newest post would take about 125 requests
+            probes = seeker.stats["probes"]
+            assert probes < 40
+            assert len(seeker.index) == seeker.stats["indexed"]
+
+            # answered from the index
+            assert seeker.seek(posts[5000]["created"]) == posts[5000]["id"]
+            assert seeker.stats["probes"] == probes
+
+            page = next(iter(api.get_items_iterator(item=seeker.seek(posts[7000]["created"]), flag=31)))
+            assert [post["id"] for post in page] == [post["id"] for post in posts[6999:6879:-1]]
+
+            # posts are promoted after their upload, the promoted ids do not grow with created
+            promoted = sorted((post for post in posts if post["promoted"]), key=lambda post: post["promoted"])
+            assert any(older["created"] > newer["created"] for older, newer in zip(promoted, promoted[1:]))
+            seeker = Seeker(api, flag=31, promoted=1)
+            for created in (promoted[500]["created"], promoted[1500]["created"] + 1):
+                result = seeker.seek(created)
+                before = [post["promoted"] for post in promoted if post["created"] < created]
+                # no post created before is missed, and the cursor is not further up than needed
+                assert max(before) < result and result in [post["promoted"] for post in promoted]
+                assert result - max(before) <= PAGE_SIZE
+            assert seeker.seek(0) == promoted[0]["promoted"]
+            assert seeker.seek(promoted[-1]["created"] + 10 ** 6) is None
+
+    def test_comment_harvester(self):
+        with Simulator(posts=2000, users=10) as simulator:
+            api = Api(no_login=True, base_url=simulator.base_url)
+            users = [user["name"] for user in simulator.dataset.users]
+
+            harvester = CommentHarvester(api, users, flag=31, workers=4)
+            pages = list(harvester)
+            for user in users:
+                comments = [comment for page in pages if page.user == user for comment in page.comments]
+                assert [comment["id"] for comment in comments] == \
+                       [comment["id"] for comment in reversed(simulator.dataset.user_comments[user])]
+            page = pages[0]
+            assert [(assignment.post, assignment.comment) for assignment in page.comment_assignments] == \
+                   [(comment["itemId"], comment["id"]) for comment in page.comments]
+            assert harvester.stats["users"] == len(users)
+            assert harvester.stats["comments"] == sum(len(page.comments) for page in pages)
+
+            # users that were active more recently are fetched first
+            newest = harvester.newest
+            pages = list(CommentHarvester(api, newest, flag=31, workers=1))
+            assert list(dict.fromkeys(page.user for page in pages)) == sorted(users, key=newest.get, reverse=True)
+
+            since = dict(newest)
+            since[users[0]] = simulator.dataset.user_comments[users[0]][-3]["created"]
+            harvester = CommentHarvester(api, newest, flag=31, since=since)
+            pages = list(harvester)
+            assert [page.user for page in pages] == [users[0]]
+            assert len(pages[0].comments) == 2
+            assert harvester.stats["pages"] == len(users)
+
+            pages = list(CommentHarvester(api, ["nobody"]))
+            assert pages[0].user == "nobody" and pages[0].error is not None
+
+    def test_follower(self):
+        with Simulator(posts=500) as simulator:
+            api = Api(no_login=True, base_url=simulator.base_url)
+            posts = simulator.dataset.posts
+
+            # the posts after 'item' are paged without waiting
+            lazy_api = Api(no_login=True, base_url=simulator.base_url, lazy=True)
+            follower = Follower(lazy_api, item=posts[99]["id"], flag=31, min_interval=10, max_interval=10)
+            start = time.monotonic()
+            seen = []
+            for page in follower:
+                assert isinstance(page, LazyPosts)
+                seen += [post["id"] for post in page]
+                if len(seen) == 400:
+                    break
+            assert sorted(seen) == [post["id"] for post in posts[100:]]
+            assert follower.item == posts[-1]["id"]
+            assert simulator.requests["items/get"] == 4 and time.monotonic() - start < 5
+
+            follower = Follower(api, flag=31, min_interval=0.05, max_interval=0.4, posts_per_poll=50)
+
+            def upload():
+                sleep(0.3)
+                uploaded.extend(post["id"] for post in simulator.dataset.upload(250))
+                sleep(0.3)
+                uploaded.extend(post["id"] for post in simulator.dataset.upload(10))
+
+            uploaded = []
+            thread = threading.Thread(target=upload)
+            thread.start()
+            seen = []
+            for page in follower:
+                seen += [post["id"] for post in page]
+                if len(seen) == 260:
+                    follower.stop()
+            thread.join()
+            assert sorted(seen) == uploaded
+
+            stats = follower.stats
+            assert stats["posts"] == 260 and stats["rate"] > 0
+            # mostly empty polls, the wait is backed off between the uploads
+            assert stats["requests"] < 40
+
+            follower = Follower(api, flag=31, min_interval=0.01, max_interval=0.08)
+            thread = threading.Timer(0.5, follower.stop)
+            thread.start()
+            for _ in follower:
+                pass
+            thread.join()
+            assert follower.interval == 0.08 and follower.stats["posts"] == 0
+
+    def test_compact_items(self):
+        compact = self.test_posts.compact()
+        assert isinstance(compact, Posts) and isinstance(compact[0], CompactPost)
+        assert not hasattr(compact, "json")
+        for post, record in zip(self.test_posts, compact):
+            assert record == post
+            assert codec.loads(record.to_json()) == codec.loads(post.to_json())
+            assert record["thumb"] == post["thumb"] and record["fullsize"] == post["fullsize"]
+        assert compact[0].to_json() == self.test_post.to_json()
+        assert compact.maxId() == self.test_posts.maxId()
+
+        # unknown keys go to the overflow dict
+        assert compact[1]["deleted"] == 0 and "deleted" in compact[1] and "deleted" not in compact[0]
+        assert compact[0].get("deleted", 1) == 1
+        with self.assertRaises(KeyError):
+            _ = compact[0]["deleted"]
+
+        # the user name is shared, the thumb is stored relative to the image
+        other = CompactPost(json_obj=self.test_posts.json["items"][1])
+        assert compact[0]["user"] is other["user"]
+        assert compact[0].thumb == "\x00.jpg"
+        compact[0]["image"] = "2018/01/01/other.mp4"
+        assert compact[0]["thumb"] == self.test_post["thumb"]
+
+        comment = CompactComment(self.test_comment.to_json(), comment_assignment=CommentAssignment(1, 2))
+        assert comment == self.test_comment and comment.comment_assignment.post == 1
+        assert CompactTag(json_obj=self.test_tag).to_json_bytes() == self.test_tag.to_json_bytes()
+
+    def test_indexed_posts(self):
+        dataset = Dataset(posts=1000)
+        pages = [Posts(json_obj={"items": dataset.posts[i:i + 120]}) for i in range(0, 1000, 100)]
+        posts = IndexedPosts()
+        # overlapping pages from new to old
+        for page in reversed(pages):
+            posts.extend(page)
+            assert [post["id"] for post in posts.range("id")] == sorted(post["id"] for post in posts)
+        assert len(posts) == 1000 and len({post["id"] for post in posts}) == 1000
+
+        for attr in ("id", "promoted", "created"):
+            assert posts.min(attr) == min(post[attr] for post in posts)
+            assert posts.max(attr) == max(post[attr] for post in posts)
+        assert posts.minId() == dataset.posts[0]["id"]
+
+        post = dataset.posts[500]
+        assert posts.get_by_id(post["id"]) == post and post["id"] in posts and -1 not in posts
+        assert [p["id"] for p in posts.range("created", post["created"], dataset.posts[600]["created"])] == \
+               [p["id"] for p in dataset.posts[500:600]]
+        assert [p["id"] for p in posts.sorted_by("up", reverse=True)][0] == \
+               max(dataset.posts[:1000], key=lambda p: p["up"])["id"]
+
+        # a newer version of a post replaces the stored one
+        newer = Post(json_obj=dict(post, promoted=10 ** 6))
+        posts.append(newer)
+        assert len(posts) == 1000 and posts.get_by_id(post["id"]) is newer and posts.max("promoted") == 10 ** 6
+
+        removed = posts.pop(posts.index(newer))
+        assert removed is newer and posts.get_by_id(post["id"]) is None
+        assert posts.max("promoted") == max(p["promoted"] for p in posts)
+
+    def test_column_batches(self):
+        from pr0gramm.columnar import numpy
+        posts = Posts(json_obj={"items": Dataset(posts=500).posts})
+        users = {}
+        for post in posts:
+            group = users.setdefault(post["user"], {"count": 0, "sum": 0})
+            group["count"] += 1
+            group["sum"] += post["up"] - post["down"]
+
+        for use_numpy in (False, True) if numpy is not None else (False,):
+            batch = posts.columns(use_numpy)
+            assert len(batch) == 500 and batch.sum_points() == posts.sumPoints()
+            assert batch.sum("up") == sum(post["up"] for post in posts)
+            assert batch.row(3) == {key: posts[3][key] for key in batch.row(3)}
+            assert batch.group_by("user") == users
+
+            sfw = batch.filter_flags(1)
+            assert [row["id"] for row in sfw.rows()] == [post["id"] for post in posts if post["flags"] & 1]
+            top = batch.top(5)
+            assert list(top.column("score")) == sorted((post["up"] - post["down"] for post in posts), reverse=True)[:5]
+            assert len(batch.top(0)) == 0
+
+            # extending keeps the numpy columns returned earlier valid
+            ids = batch.column("id")
+            batch.extend(self.test_posts)
+            assert len(ids) == (500 if use_numpy else 502) and len(batch) == 502
+            assert batch.max("id") == self.test_posts.maxId()
+            assert batch.row(-1)["user"] == "itssme"
+
+        comments = Comments(json_obj={"comments": [self.test_comment, dict(self.test_comment, id=1, up=7)]})
+        assert comments.columns(False).group_by("name", "up") == {"Doryani": {"count": 2, "sum": 9}}
+        with self.assertRaises(TypeError):
+            Tags().columns()
+
+    def test_lazy_posts(self):
+        posts = LazyPosts(codec.dumps(self.test_posts.json))
+        assert len(posts) == 2 and posts.json["atEnd"]
+        # the cursor helpers do not create posts
+        assert posts.minId() == 2525097 and posts.maxDate() == 1525977077 and posts.maxPromotedId() == 0
+        assert posts.sumPoints() == self.test_posts.sumPoints()
+        assert not any(isinstance(post, Post) for post in list.__iter__(posts))
+
+        assert isinstance(posts[-1], Post) and posts[-1] == self.test_posts[1] and posts[-1] is posts[1]
+        assert not isinstance(list.__getitem__(posts, 0), Post)
+        assert list(posts) == self.test_posts and posts == self.test_posts and self.test_post in posts
+        assert [post["id"] for post in reversed(posts)] == [2546035, 2525097]
+
+        posts = LazyPosts(json_obj=self.test_posts.json)
+        assert [post["id"] for post in posts.filter(lambda item: item["up"] > 150)] == [2525097]
+        assert not isinstance(list.__getitem__(posts, 1), Post)
+        posts.insert(0, Post(json_obj=dict(self.test_post, id=1)))
+        assert [post["id"] for post in posts] == [1, 2525097, 2546035] and posts.minId() == 1
+
+        # the decoded items never leave the list as dicts
+        posts = LazyPosts(json_obj=self.test_posts.json)
+        for other in (Posts() + posts, posts + [], posts[:], posts.copy(), copy.copy(posts), [posts.pop()]):
+            assert other and all(isinstance(post, Post) for post in other)
+        assert json.loads(json.dumps(posts)) == self.test_posts[:1]
+
+        api = Api(no_login=True, base_url=self.BASE_URL, lazy=True)
+        pages = api.get_items_iterator(item=10 ** 6, flag=31)
+        for count, page in enumerate(pages):
+            assert isinstance(page, LazyPosts)
+            if count == 2:
+                break
+        api = Api(no_login=True, base_url=self.BASE_URL, lazy=True, parsed=True)
+        assert isinstance(api.get_items(10 ** 6, flag=31), LazyPosts)
+
+    def test_post_store(self):
+        evicted = []
+        store = PostStore(max_posts=2, on_evict=lambda post, delta: evicted.append((post["id"], delta.points)))
+        assert store.upsert_many(self.test_posts, seen=100) == [] and len(store) == 2
+
+        # a later crawl with changed votes updates the stored post
+        recrawl = Post(json_obj=dict(self.test_post, up=self.test_post["up"] + 10, down=self.test_post["down"] + 1))
+        stored = store.get(self.test_post["id"])
+        delta = store.upsert(recrawl, seen=200)
+        assert delta.fields == ("up", "down") and delta.old_up == 197 and delta.up == 207 and delta.points == 9
+        assert store.get(self.test_post["id"]) is stored and stored["up"] == 207
+        assert store.upsert(Post(json_obj=recrawl), seen=300) is None
+
+        delta = store.delta(self.test_post["id"])
+        assert (delta.old_up, delta.up, delta.first_seen, delta.last_seen) == (197, 207, 100, 300)
+        assert [delta.id for delta in store.deltas()] == [self.test_post["id"]]
+        assert len(store.deltas(changed_only=False)) == 2
+
+        # the post that was not seen for the longest time is evicted first
+        store.upsert(Post(json_obj=dict(self.test_post, id=1)), seen=400)
+        assert evicted == [(2546035, 0)] and 2546035 not in store and self.test_post["id"] in store
+        assert store.evict(seen_before=350) == 1 and evicted[-1] == (self.test_post["id"], 9)
+        assert store.stats == {"posts": 1, "inserts": 3, "updates": 2, "changes": 1, "evictions": 2}
+
     @staticmethod
     def test_calculate_flags():
         assert Api.calculate_flag(sfw=True) == 1
@@ -439,8 +1169,11 @@ class Pr0grammApiTests(unittest.TestCase):
     def test_database_manager(self):
         manager = Manager("pr0gramm.db")
         manager.insert(self.test_post)
+        # subclasses and compact records are inserted like their base types
+        manager.insert(LazyPosts(json_obj={"items": [self.test_posts[1]]}),
+                       CompactPost(json_obj=dict(self.test_post, id=1)))
         manager.safe_to_disk()
-        assert manager.manual_command("select * from posts;", wait=True)
+        assert len(manager.manual_command("select * from posts;", wait=True)) == 3
         manager.safe_to_disk()
         os.remove("pr0gramm.db")
 
@@ -464,11 +1197,99 @@ class Pr0grammApiTests(unittest.TestCase):
         time.sleep(1)
         os.remove("pr0gramm.db")
 
+    def test_sync_posts(self):
+        with Simulator(posts=500) as simulator:
+            api = Api(no_login=True, base_url=simulator.base_url)
+            manager = Manager("pr0gramm_sync.db")
+            try:
+                posts = Posts()
+                posts.extend(Post(json_obj=post) for post in simulator.dataset.posts[:300])
+                manager.insert(posts)
+
+                stats = sync_posts(api, manager, flag=31)
+                assert stats["start"] == simulator.dataset.posts[299]["id"]
+                assert stats["newest"] == simulator.dataset.posts[-1]["id"]
+                assert stats["posts"] == 200
+                # two pages with posts and the empty page after the newest post
+                assert simulator.requests["items/get"] == 3
+                assert manager.manual_command("select count(*) from posts", wait=True)[0][0] == 500
+
+                stats = sync_posts(api, manager, flag=31)
+                assert stats["posts"] == 0 and simulator.requests["items/get"] == 4
+
+                # all posts are stored already (with promoted 0), only their promoted ids are written
+                manager.manual_command("update posts set promoted = 0")
+                stats = sync_posts(api, manager, flag=31, promoted=1)
+                promoted = [post for post in simulator.dataset.posts if post["promoted"]]
+                assert stats["posts"] == 0 and stats["updated"] == len(promoted)
+                assert stats["newest"] == max(post["promoted"] for post in promoted)
+                assert manager.manual_command("select count(*) from posts", wait=True)[0][0] == 500
+            finally:
+                os.remove("pr0gramm_sync.db")
+
+    def test_pipeline(self):
+        with Simulator(posts=500) as simulator:
+            api = Api(no_login=True, base_url=simulator.base_url)
+            manager = Manager("pr0gramm_pipeline.db")
+            try:
+                pipeline = Pipeline(api, flag=31, manager=manager, hydration=4, queue_size=16)
+                stats = pipeline.run()
+                for stage in ("listing", "hydration", "parsing", "writing"):
+                    assert stats[stage]["items"] == 499
+                assert simulator.requests["items/info"] == 499
+                assert manager.manual_command("select count(*) from posts", wait=True)[0][0] == 499
+                assignments = sum(len(comments) for comments in list(simulator.dataset.comments.values())[:-1])
+                # the schema inserts an assignment without post
+                assert manager.manual_command("select count(*) from comment_assignments where post is not null",
+                                              wait=True)[0][0] == assignments
+
+                posts = simulator.dataset.posts
+                records = list(Pipeline(api, item=posts[300]["id"], flag=31, listing=2, hydration=2))
+                with self.assertRaises(ValueError):
+                    Pipeline(api, listing=0)
+                assert sorted(post["id"] for post, _ in records) == [post["id"] for post in posts[:300]]
+                post, info = records[0]
+                assert isinstance(info, ItemInfo) and info.post == post["id"] and info.error is None
+                assert [comment["id"] for comment in info.comments] == \
+                       [comment["id"] for comment in simulator.dataset.comments[post["id"]]]
+
+                # stopping early stops all stages
+                pipeline = Pipeline(api, flag=31, hydration=2, queue_size=4)
+                for _ in pipeline:
+                    break
+                assert pipeline.stats["hydration"]["items"] < 20
+            finally:
+                os.remove("pr0gramm_pipeline.db")
+
+    def test_pipeline_checkpoint(self):
+        with Simulator(posts=1000) as simulator:
+            api = Api(no_login=True, base_url=simulator.base_url)
+            manager = Manager("pr0gramm_pipeline.db")
+            checkpoint = FileCheckpoint("pr0gramm_pipeline.json")
+            try:
+                pipeline = Pipeline(api, flag=31, checkpoint=checkpoint, manager=manager, hydration=4,
+                                    queue_size=64, commit_every=50)
+                for count, _ in enumerate(pipeline):
+                    if count == 300:
+                        break
+                # every post before the stored cursor was written, the listed posts after it were not lost
+                cursor = checkpoint.load(pipeline.checkpoint_name)["cursor"]
+                written = {row[0] for row in manager.manual_command("select id from posts", wait=True)}
+                newest = simulator.dataset.posts[-1]["id"]
+                assert {post["id"] for post in simulator.dataset.posts if cursor <= post["id"] < newest} <= written
+                assert pipeline.stats["listing"]["items"] > len(written)
+
+                Pipeline(api, flag=31, checkpoint=checkpoint, manager=manager, hydration=4).run()
+                written = {row[0] for row in manager.manual_command("select id from posts", wait=True)}
+                assert written == {post["id"] for post in simulator.dataset.posts[:-1]}
+            finally:
+                os.remove("pr0gramm_pipeline.db")
+                os.remove("pr0gramm_pipeline.json")
+
     def test_items_by_tag_iterator(self):
         all_posts = Posts()
         for posts in self.api.get_items_by_tag_iterator("SFC"):
             all_posts.extend(posts)
-            sleep(0.2)  # avoid 503 errors
 
         upvotes = 0
         downvotes = 0
@@ -550,7 +1371,7 @@ class Pr0grammApiTests(unittest.TestCase):
         os.remove("pr0gramm.db")
 
     def test_ratelimit_nologin(self):
-        api = Api()  # DO NOT use the self.api here since it could be logged in!
+        api = Api(base_url=self.BASE_URL)  # DO NOT use the self.api here since it could be logged in!
         try:
             api.ratelimit
             assert False
@@ -569,7 +1390,7 @@ class Pr0grammApiTests(unittest.TestCase):
 
 
 if __name__ == '__main__':
-    # for testing with login call like: USERNAME="itssme" PASSWORD="1234" LOGIN="true" python3 tests.py
+    # for testing with login call like: USERNAME="itssme" PASSWORD="1234" LOGIN="true" ONLINE="true" python3 tests.py
     Pr0grammApiTests.login = os.environ.get('LOGIN', Pr0grammApiTests.login)
     Pr0grammApiTests.USERNAME = os.environ.get('USERNAME', Pr0grammApiTests.USERNAME)
     Pr0grammApiTests.PASSWORD = os.environ.get('PASSWORD', Pr0grammApiTests.PASSWORD)